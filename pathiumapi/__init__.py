@@ -9,15 +9,24 @@ from ._core import (
     __version__,
     Request,
     Response,
+    StreamingResponse,
     Route,
     Router,
     Pathium,
+    State,
     HTTPError,
     logging_middleware_factory,
     error_middleware,
+    add_health,
 )
 
 from .validation import validate_body
+from .params import Query, Header
+from .concurrency import ThreadPool, ProcessPool
+from .background import BackgroundTasks, BackgroundQueue
+from .websockets import WebSocket, WebSocketDisconnect
+from .broadcast import Broadcast
+from .sse import EventSourceResponse
 
 # Import optional auth helpers lazily — if PyJWT is not installed we expose
 # placeholder functions that raise clear runtime errors when invoked. This
@@ -36,13 +45,26 @@ __all__ = [
     "__version__",
     "Request",
     "Response",
+    "StreamingResponse",
     "Route",
     "Router",
     "Pathium",
+    "State",
     "HTTPError",
     "logging_middleware_factory",
     "error_middleware",
+    "add_health",
     "validate_body",
+    "Query",
+    "Header",
+    "ThreadPool",
+    "ProcessPool",
+    "BackgroundTasks",
+    "BackgroundQueue",
+    "WebSocket",
+    "WebSocketDisconnect",
+    "Broadcast",
+    "EventSourceResponse",
     "jwt_middleware_factory",
     "create_token",
 ]
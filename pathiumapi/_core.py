@@ -1,17 +1,25 @@
 """Core types and helpers for PathiumAPI.
 
 This module exposes the primary API surface used by applications:
-- `Request`, `Response` — request and response helpers
+- `Request`, `Response`, `StreamingResponse` — request and response helpers
 - `Route`, `Router` — routing primitives
-- `Pathium` — the minimal ASGI application object
+- `Pathium` — the minimal ASGI application object (HTTP, WebSocket, lifespan)
 - `HTTPError`, `logging_middleware_factory`, `error_middleware`
-- OpenAPI generation helpers: `add_openapi()`, `add_docs()`
+- OpenAPI generation helpers: `openapi_spec()`, `add_openapi()`, `add_docs()`
 """
 
 import re
 __version__ = "0.2.0"
+import asyncio
+import functools
+import inspect
 import json
+import logging
+import time
 from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
     Callable,
     Dict,
     Any,
@@ -21,6 +29,14 @@ from typing import (
     Coroutine,
 )
 
+from .deadlines import deadline_from_headers, reset_deadline, set_deadline
+from .timing import TIMINGS_KEY, Timings, middleware_name, timed_layer
+
+logger = logging.getLogger("pathiumapi")
+
+# router "method" under which `Pathium.websocket()` routes are registered
+WEBSOCKET = "WEBSOCKET"
+
 Scope = Dict[str, Any]
 # ASGI-style callables use Coroutines (async def) so annotate with Coroutine
 Receive = Callable[[], Coroutine[Any, Any, Dict[str, Any]]]
@@ -34,29 +50,26 @@ Middleware = Callable[
 ]
 
 
-class Request:
-    """Represents an incoming HTTP request.
+class HTTPConnection:
+    """Scope accessors shared by `Request` and `WebSocket`.
 
     Attributes:
-        scope: The ASGI scope dictionary for the request.
-        _receive: The ASGI receive callable.
-        _body: Cached request body bytes (filled on first read).
-
-    Typical usage in handlers:
-
-        async def handler(req: Request):
-            data = await req.json()
-            params = req.query_params
+        scope: The ASGI scope dictionary for the connection.
     """
-    def __init__(self, scope: Scope, receive: Receive):
-        assert scope['type'] == 'http'
+    def __init__(self, scope: Scope):
         self.scope = scope
-        self._receive = receive
-        self._body: Optional[bytes] = None
+        self._headers: Optional[Dict[str, str]] = None
+        self._query: Optional[Dict[str, str]] = None
 
     @property
-    def method(self) -> str:
-        return self.scope['method'].upper()
+    def app(self) -> Any:
+        """The `Pathium` application serving this connection."""
+        return self.scope.get("app")
+
+    @property
+    def state(self) -> Any:
+        """Shortcut for `req.app.state`."""
+        return self.scope["app"].state
 
     @property
     def path(self) -> str:
@@ -64,13 +77,21 @@ class Request:
 
     @property
     def headers(self) -> Dict[str, str]:
-        hdrs: Dict[str, str] = {}
-        for k, v in self.scope["headers"]:
-            hdrs[k.decode().lower()] = v.decode()
-        return hdrs
+        # parsed once per request; handlers and injected params share it
+        if self._headers is None:
+            hdrs: Dict[str, str] = {}
+            for k, v in self.scope["headers"]:
+                hdrs[k.decode().lower()] = v.decode()
+            self._headers = hdrs
+        return self._headers
 
     @property
     def query_params(self) -> Dict[str, str]:
+        if self._query is None:
+            self._query = self._parse_query()
+        return self._query
+
+    def _parse_query(self) -> Dict[str, str]:
         raw = self.scope.get('query_string', b"") or b""
         qs = raw.decode()
         params: Dict[str, str] = {}
@@ -88,7 +109,61 @@ class Request:
 
         return params
 
+
+class Request(HTTPConnection):
+    """Represents an incoming HTTP request.
+
+    Attributes:
+        scope: The ASGI scope dictionary for the request.
+        _receive: The ASGI receive callable.
+        _body: Cached request body bytes (filled on first read).
+
+    Typical usage in handlers:
+
+        async def handler(req: Request):
+            data = await req.json()
+            params = req.query_params
+    """
+    def __init__(self, scope: Scope, receive: Receive):
+        assert scope['type'] == 'http'
+        super().__init__(scope)
+        self._receive = receive
+        self._body: Optional[bytes] = None
+        self._streamed = False
+        # `BackgroundTasks` injected into the handler, if it asked for one
+        self.background: Any = None
+
+    @property
+    def method(self) -> str:
+        return self.scope['method'].upper()
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """Yield the request body chunk by chunk without buffering it.
+
+        If the body was already read with `body()` it is yielded as a single
+        chunk. Once streamed, the body cannot be read again.
+        """
+        if self._body is not None:
+            if self._body:
+                yield self._body
+            return
+        if self._streamed:
+            raise RuntimeError("Request body has already been streamed")
+        self._streamed = True
+        more = True
+        while more:
+            msg = await self._receive()
+            if msg['type'] == "http.request":
+                chunk = msg.get("body", b"")
+                if chunk:
+                    yield chunk
+                more = msg.get("more_body", False)
+            else:
+                more = False
+
     async def body(self) -> bytes:
+        if self._streamed:
+            raise RuntimeError("Request body has already been streamed")
         if self._body is None:
             chunks = []
             more = True
@@ -114,6 +189,7 @@ class Response:
 
     Construct with text, bytes, or a Python object (dict/list) to return JSON.
     Use `Response.json(obj)` as a convenience helper to create a JSON response.
+    `background` (a `BackgroundTasks`) runs after the response has been sent.
     """
     def __init__(
         self,
@@ -121,9 +197,11 @@ class Response:
         status: int = 200,
         headers: Optional[List[Tuple[str, str]]] = None,
         media_type: Optional[str] = None,
+        background: Any = None,
     ):
         self.status = status
         self.headers = headers or []
+        self.background = background
         self.body_bytes: bytes
 
         if isinstance(content, (dict, list)):
@@ -155,8 +233,121 @@ class Response:
         data: Any,
         status: int = 200,
         headers: Optional[List[Tuple[str, str]]] = None,
+        background: Any = None,
     ):
-        return cls(data, status=status, headers=headers or [])
+        return cls(data, status=status, headers=headers or [], background=background)
+
+
+async def _iterate(content: Any) -> AsyncIterator[Any]:
+    if hasattr(content, "__aiter__"):
+        async for chunk in content:
+            yield chunk
+        return
+    # plain iterators may block (files, DB cursors): step them on a thread
+    it = iter(content)
+    done = object()
+    while True:
+        chunk = await asyncio.to_thread(next, it, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+async def _wait_disconnect(receive: Receive) -> bool:
+    """Return True once the client disconnects.
+
+    Returns False for servers that keep handing out completed request
+    messages instead of blocking until the client goes away.
+    """
+    body_done = False
+    while True:
+        msg = await receive()
+        if msg["type"] == "http.disconnect":
+            return True
+        if msg["type"] == "http.request" and not msg.get("more_body"):
+            if body_done:
+                return False
+            body_done = True
+
+
+class StreamingResponse(Response):
+    """A response whose body is sent chunk by chunk as it is produced.
+
+    `content` is an async or plain iterable of `bytes`/`str` chunks; plain
+    iterators are advanced on a worker thread. While streaming, the
+    connection is watched for `http.disconnect`: the iterator is cancelled
+    and closed as soon as the client goes away and `disconnected` is set.
+
+    Example:
+
+        @app.get("/export")
+        async def export(req):
+            async def rows():
+                async for row in db.stream("select * from orders"):
+                    yield json.dumps(row) + "\n"
+            return StreamingResponse(rows(), media_type="application/x-ndjson")
+    """
+    def __init__(
+        self,
+        content: AsyncIterable[Any] | Iterable[Any],
+        status: int = 200,
+        headers: Optional[List[Tuple[str, str]]] = None,
+        media_type: Optional[str] = None,
+        background: Any = None,
+    ):
+        super().__init__(None, status=status, headers=headers, media_type=media_type, background=background)
+        self.body_iterator = content
+        self.disconnected = False
+
+    def chunks(self) -> AsyncIterator[Any]:
+        """Return the async iterator of body chunks; subclasses may reformat."""
+        return _iterate(self.body_iterator)
+
+    async def _send_chunks(self, chunks: AsyncIterator[Any], send: Send) -> None:
+        async for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    async def _close(self, chunks: AsyncIterator[Any]) -> None:
+        await chunks.aclose()  # type: ignore[attr-defined]
+        close = getattr(self.body_iterator, "aclose", None) or getattr(self.body_iterator, "close", None)
+        if close is None:
+            return
+        try:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        except (RuntimeError, ValueError):
+            pass  # still running on a worker thread or in another task
+
+    async def stream(self, receive: Receive, send: Send) -> None:
+        """Send the body to `send`, stopping early on client disconnect."""
+        chunks = self.chunks()
+        sender = asyncio.ensure_future(self._send_chunks(chunks, send))
+        listener = asyncio.ensure_future(_wait_disconnect(receive))
+        try:
+            await asyncio.wait({sender, listener}, return_when=asyncio.FIRST_COMPLETED)
+            if not sender.done() and listener.result():
+                self.disconnected = True
+                sender.cancel()
+            try:
+                await sender
+            except asyncio.CancelledError:
+                if not self.disconnected:
+                    raise
+            except Exception:
+                # headers are already sent: end the body instead of a 500
+                logger.exception("Streaming response failed")
+        finally:
+            listener.cancel()
+            if sender.done():
+                await self._close(chunks)
+            else:
+                # cancellation closes the iterators as it unwinds
+                sender.cancel()
+        if not self.disconnected:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
 
 
 class Route:
@@ -173,6 +364,38 @@ class Route:
         # converters: mapping name -> callable to convert string to typed value
         self.param_names, self.regex, self.converters = self._compile(path)
         self.handler = handler
+        # executor running the handler (a `ThreadPool` or `ProcessPool`);
+        # None runs the handler coroutine on the event loop
+        self.executor: Any = None
+        # seconds the handler may run before answering 504 (None: app default)
+        self.timeout: Optional[float] = None
+        # compiled call plan, see `prepare()`
+        self.invoke: Optional[Callable[['Request', Dict[str, Any]], Any]] = None
+        # call plan recording phase timings, compiled on first timed request
+        self.timed_invoke: Optional[Callable[['Request', Dict[str, Any]], Any]] = None
+
+    def prepare(self, timed: bool = False) -> Callable[['Request', Dict[str, Any]], Any]:
+        """Compile the handler signature into the route's call plan.
+
+        `Pathium.route()` calls this at registration time; the plan injects
+        path/query/header params, the validated body and the `Request`.
+        `timed=True` compiles the variant used while request timing is on.
+        """
+        from .params import compile_handler
+
+        call = None
+        if self.executor is not None:
+            call = functools.partial(self.executor.run, self.handler)
+        allow_request = getattr(self.executor, "accepts_request", True)
+        invoke = compile_handler(
+            self.handler, self.param_names, call, allow_request, timed=timed, websocket=self.method == WEBSOCKET
+        )
+        if timed:
+            self.timed_invoke = invoke
+        else:
+            self.invoke = invoke
+            self.timed_invoke = None
+        return invoke
 
     def _compile(
         self, path: str
@@ -239,22 +462,78 @@ class Router:
     """
     def __init__(self):
         self.routes: List[Route] = []
-
-    def add(self, method: str, path: str, handler: Handler):
-        self.routes.append(Route(method, path, handler))
+        # lookup tables built by `compile()`
+        self._static: Optional[Dict[Tuple[str, str], Route]] = None
+        self._dynamic: Dict[str, List[Route]] = {}
+
+    def add(self, method: str, path: str, handler: Handler) -> Route:
+        route = Route(method, path, handler)
+        self.routes.append(route)
+        self._static = None
+        return route
+
+    def compile(self) -> None:
+        """Build the lookup tables used by `find()`.
+
+        Routes without parameters go into a `(method, path)` dict; the rest
+        are scanned per method in registration order. A static route that an
+        earlier parameterised route already matches stays in the scan so the
+        first-registered-wins behaviour is unchanged. Called lazily by
+        `find()` and eagerly by `Pathium.warmup()`.
+        """
+        static: Dict[Tuple[str, str], Route] = {}
+        dynamic: Dict[str, List[Route]] = {}
+        for r in self.routes:
+            earlier = dynamic.setdefault(r.method, [])
+            if r.param_names or any(d.regex.match(r.path) for d in earlier):
+                earlier.append(r)
+            else:
+                static.setdefault((r.method, r.path), r)
+        self._static, self._dynamic = static, dynamic
 
     def find(
         self,
         method: str,
         path: str,
     ) -> Tuple[Optional[Route], Dict[str, str]]:
-        for r in self.routes:
+        if self._static is None:
+            self.compile()
+        method = method.upper()
+        r = self._static.get((method, path))  # type: ignore[union-attr]
+        if r is not None:
+            return r, {}
+        for r in self._dynamic.get(method, ()):
             params = r.matches(method, path)
             if params is not None:
                 return r, params
         return None, {}
 
 
+class State:
+    """Attribute namespace for app-wide resources, available as `app.state`.
+
+    Example:
+
+        @app.on_startup
+        async def connect():
+            app.state.db = await create_pool(DSN)
+    """
+    def __init__(self, **values: Any):
+        self.__dict__.update(values)
+
+    def __repr__(self) -> str:
+        return f"State({self.__dict__!r})"
+
+
+def _is_coroutine_handler(func: Callable[..., Any]) -> bool:
+    while isinstance(func, functools.partial):
+        func = func.func
+    if inspect.iscoroutinefunction(func):
+        return True
+    call = getattr(func, "__call__", None)
+    return not inspect.isfunction(func) and inspect.iscoroutinefunction(call)
+
+
 class Pathium:
     """Minimal ASGI application with routing and middleware support.
 
@@ -266,53 +545,229 @@ class Pathium:
         async def get_item(req, id: int):
             return Response.json({"id": id})
     """
-    def __init__(self):
+    def __init__(
+        self,
+        thread_pool: Any = None,
+        process_pool: Any = None,
+        background_queue: Any = None,
+        shutdown_timeout: Optional[float] = 30.0,
+        warmup_on_startup: bool = True,
+        warmup_requests: Optional[List[Any]] = None,
+        timeout: Optional[float] = None,
+        honor_deadline_headers: bool = True,
+        server_timing: bool = False,
+        on_timing: Optional[Callable[[Scope, Timings], None]] = None,
+    ):
+        from .concurrency import ThreadPool
+
         self.router = Router()
+        # app-wide resources set up by startup hooks
+        self.state = State()
+        self._startup: List[Callable[[], Any]] = []
+        self._shutdown: List[Callable[[], Any]] = []
+        # seconds `shutdown()` waits for in-flight requests and queued
+        # background tasks
+        self.shutdown_timeout = shutdown_timeout
+        # requests/websockets currently inside the app, including inline
+        # background tasks; `draining` is set once shutdown has begun
+        self.in_flight = 0
+        self.draining = False
+        # default handler timeout in seconds (routes may override); incoming
+        # `X-Request-Deadline` / `grpc-timeout` headers can shorten it
+        self.timeout = timeout
+        self.honor_deadline_headers = honor_deadline_headers
+        # per-phase request timing (see `pathiumapi.timing`): sent as a
+        # `Server-Timing` header and/or passed to `on_timing(scope, timings)`
+        self.server_timing = server_timing
+        self.on_timing = on_timing
+        self._timed = False
+        # `warmup()` runs after the startup hooks unless disabled
+        self.warmup_on_startup = warmup_on_startup
+        self.warmup_requests = warmup_requests
+        self.warmup_report: Optional[Dict[str, Any]] = None
+        # cached OpenAPI document builder, set by `add_openapi()`
+        self.openapi: Optional[Callable[[], Dict[str, Any]]] = None
         self._middleware: List[Middleware] = []
-
-    def route(self, method: str, path: str):
+        self._ws_middleware: List[Middleware] = []
+        self._app: Optional[Callable[[Scope, Receive, Send], Coroutine[Any, Any, None]]] = None
+        self._ws_app: Optional[Callable[[Scope, Receive, Send], Coroutine[Any, Any, None]]] = None
+        # runs plain `def` handlers off the event loop
+        self.thread_pool = thread_pool or ThreadPool()
+        # runs `executor="process"` routes; created on first use
+        self.process_pool = process_pool
+        # optional `BackgroundQueue` bounding post-response work; without one
+        # background tasks run inline after the response is sent
+        self.background_queue = background_queue
+
+    def route(self, method: str, path: str, executor: Any = None, timeout: Optional[float] = None):
+        """Register a handler for `method` and `path`.
+
+        `async def` handlers run on the event loop. Plain `def` handlers run
+        on the app's bounded `thread_pool`; pass `executor=ThreadPool(...)` to
+        give a route its own pool. `executor="process"` (or a `ProcessPool`)
+        runs CPU-bound handlers in the app's worker processes. `timeout`
+        (seconds) overrides the app's handler timeout for this route.
+        """
         def decorator(func: Handler):
-            self.router.add(method, path, func)
+            from .concurrency import ProcessPool, ThreadPool
+
+            route = self.router.add(method, path, func)
+            route.timeout = timeout
+            if executor == "process":
+                if self.process_pool is None:
+                    self.process_pool = ProcessPool()
+                route.executor = self.process_pool
+            elif isinstance(executor, ProcessPool):
+                route.executor = executor
+            elif _is_coroutine_handler(func):
+                if executor is not None:
+                    raise TypeError(f"{path}: async handlers run on the event loop; use a plain def to set an executor")
+            elif executor is None or executor == "thread":
+                route.executor = self.thread_pool
+            elif isinstance(executor, ThreadPool) or hasattr(executor, "run"):
+                route.executor = executor
+            else:
+                raise ValueError(f"{path}: unknown executor {executor!r}")
+            route.prepare()
+            # let marker decorators stacked above this one refresh the plan
+            try:
+                func.__dict__.setdefault("__pathium_routes__", []).append(route)
+            except AttributeError:
+                pass
             return func
         return decorator
 
-    def get(self, path: str): return self.route("GET", path)
-    def post(self, path: str): return self.route("POST", path)
-    def put(self, path: str): return self.route("PUT", path)
-    def patch(self, path: str): return self.route("PATCH", path)
-    def delete(self, path: str): return self.route("DELETE", path)
+    def get(self, path: str, **options: Any): return self.route("GET", path, **options)
+    def post(self, path: str, **options: Any): return self.route("POST", path, **options)
+    def put(self, path: str, **options: Any): return self.route("PUT", path, **options)
+    def patch(self, path: str, **options: Any): return self.route("PATCH", path, **options)
+    def delete(self, path: str, **options: Any): return self.route("DELETE", path, **options)
+
+    def websocket(self, path: str):
+        """Register an `async def` WebSocket handler for `path`.
+
+        The handler receives a `WebSocket` plus path/query/header params.
+        """
+        def decorator(func: Handler):
+            if not _is_coroutine_handler(func):
+                raise TypeError(f"{path}: websocket handlers must be async")
+            return self.route(WEBSOCKET, path)(func)
+        return decorator
+
+    def use(self, mw: Middleware, websocket: bool = False):
+        """Add middleware to the HTTP stack.
 
-    def use(self, mw: Middleware):
+        Middleware only sees `websocket` scopes when added with
+        `websocket=True`, so HTTP-only middleware needs no changes.
+        """
         self._middleware.append(mw)
+        if websocket:
+            self._ws_middleware.append(mw)
+        self._app = self._ws_app = None
 
-    async def __call__(self, scope: Scope, receive: Receive, send: Send):
-        if scope["type"] != "http":
-            start_msg = {
-                "type": "http.response.start",
-                "status": 404,
-                "headers": [],
-            }
-            await send(start_msg)
-            not_found = {"type": "http.response.body", "body": b"Not Found"}
-            await send(not_found)
+    def _build_app(self) -> Callable[[Scope, Receive, Send], Coroutine[Any, Any, None]]:
+        app: Callable[
+            [Scope, Receive, Send], Coroutine[Any, Any, None]
+        ] = self._endpoint
+        self._timed = bool(self.server_timing or self.on_timing)
+        if self._timed:
+            app = timed_layer("", app)
+        for mw in reversed(self._middleware):
+            app = mw(app)
+            if self._timed:
+                app = timed_layer(middleware_name(mw), app)
+        self._app = app
+        return app
+
+    def _build_ws_app(self) -> Callable[[Scope, Receive, Send], Coroutine[Any, Any, None]]:
+        app: Callable[
+            [Scope, Receive, Send], Coroutine[Any, Any, None]
+        ] = self._ws_endpoint
+        for mw in reversed(self._ws_middleware):
+            app = mw(app)
+        self._ws_app = app
+        return app
+
+    async def _ws_endpoint(self, scope: Scope, receive: Receive, send: Send) -> None:
+        from .validation import RequestValidationError
+        from .websockets import WebSocket, WebSocketDisconnect
+
+        ws = WebSocket(scope, receive, send)
+        route, params = self.router.find(WEBSOCKET, ws.path)
+        if route is None:
+            # closing before accept rejects the handshake (HTTP 403)
+            await send({"type": "websocket.close", "code": 1000})
+            return
+        scope["route"] = route
+        scope["path_params"] = params
+        try:
+            invoke = route.invoke or route.prepare()
+            await invoke(ws, params)  # type: ignore[arg-type]
+        except WebSocketDisconnect:
+            pass
+        except RequestValidationError:
+            # bad path/query/header params: a policy violation, not a crash
+            if not ws.closed:
+                await ws.close(1008)
             return
+        except Exception:
+            logger.exception("websocket handler for %s failed", route.path)
+            if not ws.closed:
+                await ws.close(1011)
+            return
+        if not ws.closed:
+            await ws.close(1000)
 
-        async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    async def _endpoint(self, scope: Scope, receive: Receive, send: Send) -> None:
+        timings: Optional[Timings] = scope.get(TIMINGS_KEY)
+        if timings is None:
             req = Request(scope, receive)
             route, params = self.router.find(req.method, req.path)
-            if route is None:
+        else:
+            # only body reads count as `read`, not the disconnect listener
+            # of streaming responses
+            req = Request(scope, timings.timed_receive(receive))
+            send = timings.timed_send(send)
+            started = time.perf_counter_ns()
+            route, params = self.router.find(req.method, req.path)
+            timings.since("routing", started)
+        serialize_start = 0
+        token = None
+        try:
+            if route is None or route.method == WEBSOCKET:
                 resp = Response("Not Found", status=404)
             else:
+                # the matched route for outer middleware (metrics, logging),
+                # so they can label by path template without re-matching
+                scope["route"] = route
+                scope["path_params"] = params
                 try:
-                    resp = await route.handler(req, **params)
+                    if timings is None:
+                        invoke = route.invoke or route.prepare()
+                    else:
+                        invoke = route.timed_invoke or route.prepare(timed=True)
+                    deadline = deadline_from_headers(scope["headers"]) if self.honor_deadline_headers else None
+                    budget = route.timeout if route.timeout is not None else self.timeout
+                    if budget is not None:
+                        limit = time.monotonic() + budget
+                        deadline = limit if deadline is None else min(deadline, limit)
+                    if deadline is None:
+                        resp = await invoke(req, params)
+                    else:
+                        token = set_deadline(deadline)
+                        resp = await self._invoke_before(deadline, invoke, req, params)
+                    if timings is not None:
+                        serialize_start = time.perf_counter_ns()
                     if not isinstance(resp, Response):
                         resp = Response(resp)
                 except HTTPError as he:
+                    req.background = None
                     resp = Response.json(
                         {"detail": he.detail},
                         status=he.status,
                     )
                 except Exception:
+                    req.background = None
                     resp = Response.json(
                         {"detail": "Internal Server Error"},
                         status=500,
@@ -321,6 +776,11 @@ class Pathium:
             headers: List[Tuple[bytes, bytes]] = []
             for k, v in resp.headers:
                 headers.append((k.encode(), v.encode()))
+            if timings is not None:
+                if serialize_start:
+                    timings.since("serialize", serialize_start)
+                if self.server_timing:
+                    headers.append((b"server-timing", timings.server_timing().encode()))
 
             start_msg = {
                 "type": "http.response.start",
@@ -328,18 +788,280 @@ class Pathium:
                 "headers": headers,
             }
             await send(start_msg)
-            body_msg = {
-                "type": "http.response.body",
-                "body": resp.body_bytes,
-            }
-            await send(body_msg)
+            if isinstance(resp, StreamingResponse):
+                await resp.stream(receive, send)
+            else:
+                body_msg = {
+                    "type": "http.response.body",
+                    "body": resp.body_bytes,
+                }
+                await send(body_msg)
+
+            # background work outlives the request, so it must not inherit
+            # (or, queued, pin for good) the request's deadline
+            if token is not None:
+                reset_deadline(token)
+                token = None
+            tasks = resp.background
+            if req.background is not None and req.background is not tasks:
+                if tasks is None:
+                    tasks = req.background
+                else:
+                    tasks.extend(req.background)
+            if tasks:
+                if self.background_queue is not None:
+                    await self.background_queue.submit(tasks)
+                else:
+                    await tasks()
+        finally:
+            if token is not None:
+                reset_deadline(token)
+
+    @staticmethod
+    async def _invoke_before(deadline: float, invoke: Callable[..., Any], req: 'Request', params: Dict[str, Any]) -> Any:
+        # cancel the handler at `deadline` (a time.monotonic() value)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise HTTPError(504, "Deadline exceeded")
+        cm = asyncio.timeout(remaining)
+        try:
+            async with cm:
+                return await invoke(req, params)
+        except TimeoutError:
+            if not cm.expired():
+                raise
+            raise HTTPError(504, "Request timed out") from None
+
+    async def drain_background(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to `timeout` seconds for queued background tasks.
+
+        Returns False when the deadline passed and pending work was cancelled.
+        """
+        if self.background_queue is None:
+            return True
+        return await self.background_queue.drain(timeout)
+
+    def on_startup(self, func: Callable[[], Any]) -> Callable[[], Any]:
+        """Register a hook run once per worker on ASGI `lifespan.startup`.
+
+        Hooks may be sync or async and run in registration order; use them to
+        open connection pools or warm caches and store them on `app.state`.
+        """
+        self._startup.append(func)
+        return func
+
+    def on_shutdown(self, func: Callable[[], Any]) -> Callable[[], Any]:
+        """Register a hook run on ASGI `lifespan.shutdown`."""
+        self._shutdown.append(func)
+        return func
+
+    async def startup(self) -> None:
+        """Run startup hooks, start the process pool workers and warm up."""
+        for hook in self._startup:
+            result = hook()
+            if inspect.isawaitable(result):
+                await result
+        if self.process_pool is not None:
+            await asyncio.to_thread(self.process_pool.warm)
+        if self.warmup_on_startup:
+            await self.warmup(self.warmup_requests)
+
+    async def warmup(self, requests: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Do the work first requests would otherwise pay for lazily.
+
+        Steps: import the optional validation/OpenAPI modules, compile the
+        router tables, call plans and middleware stack, build the validators
+        referenced by `__validated_model__`, `__validated_query_model__` and
+        `__response_model__`, generate the OpenAPI document, then replay
+        `requests` through the full ASGI stack. Each request is a path, a
+        `(method, path)` tuple or a dict with `method`, `path`,
+        `query_string`, `headers` and `body` keys; replays run real handlers.
+
+        Runs automatically on lifespan startup. Returns (and stores as
+        `app.warmup_report`) `{"steps": {name: seconds}, "replayed": [...]}`.
+        """
+        steps: Dict[str, float] = {}
+        started = last = time.perf_counter()
+
+        def mark(step: str) -> None:
+            nonlocal last
+            now = time.perf_counter()
+            steps[step] = now - last
+            last = now
+
+        from . import openapi_pydantic, params, validation  # noqa: F401
+        mark("imports")
+
+        self.router.compile()
+        for r in self.router.routes:
+            r.prepare()
+        self._build_app()
+        mark("routes")
+
+        for r in self.router.routes:
+            validation.warm_validators(r.handler)
+        mark("validators")
+
+        if self.openapi is not None:
+            self.openapi()
+        else:
+            openapi_spec(self)
+        mark("openapi")
+
+        replayed: List[Tuple[str, str, int]] = []
+        for item in requests or ():
+            replayed.append(await self._replay(item))
+        if requests:
+            mark("replay")
+
+        steps["total"] = time.perf_counter() - started
+        self.warmup_report = {"steps": steps, "replayed": replayed}
+        logger.info("warmup finished in %.1f ms: %s", steps["total"] * 1000,
+                    ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in steps.items() if k != "total"))
+        return self.warmup_report
+
+    async def _replay(self, item: Any) -> Tuple[str, str, int]:
+        if isinstance(item, str):
+            item = {"path": item}
+        elif isinstance(item, tuple):
+            item = {"method": item[0], "path": item[1]}
+        method = item.get("method", "GET").upper()
+        body = item.get("body", b"")
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        elif isinstance(body, str):
+            body = body.encode()
+        query = item.get("query_string", b"")
+        scope: Scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "path": item["path"],
+            "query_string": query.encode() if isinstance(query, str) else query,
+            "headers": [(k.lower().encode(), v.encode()) for k, v in item.get("headers", {}).items()],
+            "client": ("127.0.0.1", 0),
+        }
+        pending = [{"type": "http.request", "body": body}]
+        status = 0
 
-        app: Callable[
-            [Scope, Receive, Send], Coroutine[Any, Any, None]
-        ] = endpoint
-        for mw in reversed(self._middleware):
-            app = mw(app)
-        await app(scope, receive, send)
+        async def receive() -> Dict[str, Any]:
+            return pending.pop() if pending else {"type": "http.disconnect"}
+
+        async def send(msg: Dict[str, Any]) -> None:
+            nonlocal status
+            if msg["type"] == "http.response.start":
+                status = msg["status"]
+
+        try:
+            await self(scope, receive, send)
+        except HTTPError as he:
+            status = he.status
+        except Exception:
+            logger.exception("warmup request %s %s failed", method, item["path"])
+            status = 500
+        return method, item["path"], status
+
+    def start_draining(self) -> None:
+        """Report `draining` from `health()` so load balancers stop routing here.
+
+        Called by the built-in server when it receives SIGTERM, before it
+        stops accepting connections, and by `shutdown()`.
+        """
+        self.draining = True
+
+    def health(self) -> Dict[str, Any]:
+        """Return `{"status": "ok" | "draining", "in_flight": n, "background": n}`."""
+        return {
+            "status": "draining" if self.draining else "ok",
+            "in_flight": self.in_flight,
+            "background": self.background_queue.pending if self.background_queue is not None else 0,
+        }
+
+    async def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to `timeout` seconds for in-flight requests to finish.
+
+        Returns False if requests were still running at the deadline.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.in_flight:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def shutdown(self) -> None:
+        """Drain requests and background work, run shutdown hooks, stop the pools.
+
+        In-flight requests and queued background tasks share the
+        `shutdown_timeout` budget; servers normally finish (or cancel)
+        requests before sending lifespan shutdown, so the wait is usually
+        immediate.
+        """
+        self.start_draining()
+        deadline = None if self.shutdown_timeout is None else time.monotonic() + self.shutdown_timeout
+        if not await self.wait_idle(self.shutdown_timeout):
+            logger.warning("shutdown: %d requests still in flight", self.in_flight)
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        await self.drain_background(remaining)
+        for hook in self._shutdown:
+            result = hook()
+            if inspect.isawaitable(result):
+                await result
+        await asyncio.to_thread(self.thread_pool.shutdown)
+        if self.process_pool is not None:
+            await asyncio.to_thread(self.process_pool.shutdown)
+
+    async def _lifespan(self, scope: Scope, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as exc:
+                    await send({"type": "lifespan.startup.failed", "message": repr(exc)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                try:
+                    await self.shutdown()
+                except Exception as exc:
+                    await send({"type": "lifespan.shutdown.failed", "message": repr(exc)})
+                    return
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        scope_type = scope["type"]
+        if scope_type == "lifespan":
+            await self._lifespan(scope, receive, send)
+            return
+        scope["app"] = self
+        timings = None
+        if scope_type == "websocket":
+            app = self._ws_app or self._build_ws_app()
+        elif scope_type == "http":
+            # the middleware stack is built once and reused until `use()` changes it
+            app = self._app or self._build_app()
+            if self._timed:
+                timings = scope[TIMINGS_KEY] = Timings()
+        else:
+            return
+        self.in_flight += 1
+        try:
+            await app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            if timings is not None:
+                self._report_timings(scope, timings)
+
+    def _report_timings(self, scope: Scope, timings: Timings) -> None:
+        timings.finish()
+        if self.on_timing is not None:
+            try:
+                self.on_timing(scope, timings)
+            except Exception:
+                logger.exception("on_timing hook failed")
 
 
 class HTTPError(Exception):
@@ -361,6 +1083,9 @@ def logging_middleware_factory(
  ) -> Middleware:
     """Return a middleware that logs request method and path.
 
+    The logger is called inline on the event loop; for production access
+    logs use `pathiumapi.accesslog.add_access_log`.
+
     Example:
         app.use(logging_middleware_factory(print))
     """
@@ -463,16 +1188,19 @@ def _route_to_openapi_entry(route: Route) -> Dict[str, Any]:
 
     # Attach requestBody / response schema $ref if handler declares Pydantic models
     try:
-        from .openapi_pydantic import is_pydantic_model, model_to_schema
+        from .openapi_pydantic import is_pydantic_model, model_to_schema, schema_ref
 
         handler = route.handler
-        # request body via validate_body exposes __validated_model__ on wrapper
+        # request body via validate_body exposes __validated_model__ on wrapper;
+        # bulk bodies (list[Model]) are documented as arrays of the model
         validated = getattr(handler, "__validated_model__", None)
-        if validated and is_pydantic_model(validated):
+        body_schema = schema_ref(validated) if validated is not None else None
+        if body_schema:
+            media_type = getattr(handler, "__validated_media_type__", "application/json")
             op["requestBody"] = {
                 "content": {
-                    "application/json": {
-                        "schema": {"$ref": f"#/components/schemas/{validated.__name__}"}
+                    media_type: {
+                        "schema": body_schema
                     }
                 },
                 "required": True,
@@ -515,6 +1243,8 @@ def _route_to_openapi_entry(route: Route) -> Dict[str, Any]:
 def _openapi_paths(router: Router) -> Dict[str, Any]:
     paths: Dict[str, Any] = {}
     for r in router.routes:
+        if r.method == WEBSOCKET:
+            continue
         # Pathium already uses {name} style compatible with OpenAPI
         p = r.path
         entry = _route_to_openapi_entry(r)
@@ -549,53 +1279,86 @@ def _swagger_ui_html(openapi_url: str) -> str:
 """ % (openapi_url)
 
 
+def openapi_spec(app: Pathium, title: str = "Pathium API", version: str = __version__) -> Dict[str, Any]:
+    """Build the OpenAPI document for `app` as a dict."""
+    spec: Dict[str, Any] = {
+        "openapi": "3.0.0",
+        "info": {"title": title, "version": version},
+        "paths": _openapi_paths(app.router),
+    }
+
+    # Try to include Pydantic-generated component schemas when available
+    try:
+        from .openapi_pydantic import model_to_schema, is_pydantic_model, referenced_models
+
+        components: Dict[str, Any] = {"schemas": {}}
+        # Scan route handlers for annotated Pydantic models in parameters
+        for r in app.router.routes:
+            handler = r.handler
+            # Check annotated types on the handler func
+            ann = getattr(handler, "__annotations__", {})
+            for name, typ in ann.items():
+                if is_pydantic_model(typ):
+                    components["schemas"][typ.__name__] = model_to_schema(typ)
+
+            # Check for validated request body exposed by `validate_body`
+            validated = getattr(handler, "__validated_model__", None)
+            for model in referenced_models(validated):
+                components["schemas"][model.__name__] = model_to_schema(model)
+            # Check for validated query model exposed by `validate_query`
+            qvalidated = getattr(handler, "__validated_query_model__", None)
+            if qvalidated and is_pydantic_model(qvalidated):
+                components["schemas"][qvalidated.__name__] = model_to_schema(qvalidated)
+
+        if components["schemas"]:
+            spec["components"] = components
+    except Exception:
+        # Pydantic may be missing; ignore and return basic spec
+        pass
+
+    return spec
+
+
 def add_openapi(app: Pathium, path: str = "/openapi.json", title: str = "Pathium API", version: str = __version__) -> None:
     """Register a route that serves a minimal OpenAPI JSON spec for `app`.
 
+    The document is generated on first use (or by `app.warmup()`) and
+    regenerated only when routes are added afterwards.
+
     Usage:
         add_openapi(app)
     """
-    async def _openapi_handler(req: Request):
-        spec = {
-            "openapi": "3.0.0",
-            "info": {"title": title, "version": version},
-            "paths": _openapi_paths(app.router),
-        }
+    cache: Dict[str, Any] = {}
 
-        # Try to include Pydantic-generated component schemas when available
-        try:
-            from .openapi_pydantic import model_to_schema, is_pydantic_model
-
-            components: Dict[str, Any] = {"schemas": {}}
-            # Scan route handlers for annotated Pydantic models in parameters
-            for r in app.router.routes:
-                handler = r.handler
-                # Check annotated types on the handler func
-                ann = getattr(handler, "__annotations__", {})
-                for name, typ in ann.items():
-                    if is_pydantic_model(typ):
-                        components["schemas"][typ.__name__] = model_to_schema(typ)
-
-                # Check for validated request body exposed by `validate_body`
-                validated = getattr(handler, "__validated_model__", None)
-                if validated and is_pydantic_model(validated):
-                    components["schemas"][validated.__name__] = model_to_schema(validated)
-                # Check for validated query model exposed by `validate_query`
-                qvalidated = getattr(handler, "__validated_query_model__", None)
-                if qvalidated and is_pydantic_model(qvalidated):
-                    components["schemas"][qvalidated.__name__] = model_to_schema(qvalidated)
-
-            if components["schemas"]:
-                spec["components"] = components
-        except Exception:
-            # Pydantic may be missing; ignore and return basic spec
-            pass
+    def build() -> Dict[str, Any]:
+        if cache.get("routes") != len(app.router.routes):
+            cache["spec"] = openapi_spec(app, title, version)
+            cache["body"] = json.dumps(cache["spec"]).encode()
+            cache["routes"] = len(app.router.routes)
+        return cache["spec"]
 
-        return Response.json(spec)
+    async def _openapi_handler(req: Request):
+        build()
+        return Response(cache["body"], media_type="application/json; charset=utf-8")
 
+    app.openapi = build
     app.get(path)(_openapi_handler)
 
 
+def add_health(app: Pathium, path: str = "/health") -> None:
+    """Register a health check at `path` for load balancers.
+
+    Answers 200 with `app.health()` normally and 503 once the app is
+    draining, so the balancer stops sending new requests during shutdown.
+    """
+    async def _health_handler(req: Request):
+        info = app.health()
+        info["in_flight"] -= 1  # not counting this request
+        return Response.json(info, status=503 if app.draining else 200)
+
+    app.get(path)(_health_handler)
+
+
 def add_docs(app: Pathium, path: str = "/docs", openapi_url: str = "/openapi.json") -> None:
     """Register a simple Swagger UI page at `path` that points to `openapi_url`.
 
@@ -0,0 +1,213 @@
+"""Non-blocking access log.
+
+`add_access_log(app)` records one entry per HTTP request: client, method,
+path, route template, HTTP version, status, response bytes and latency. The
+middleware only appends a tuple to a bounded queue; a writer thread formats
+entries and writes them in batches, so a slow disk never stalls the event
+loop. When the queue is full new entries are dropped and counted in
+`AccessLog.dropped` instead of blocking.
+
+Formats:
+
+- `"json"`: one JSON object per line
+- `"common"`: Common Log Format
+  (`127.0.0.1 - - [10/Oct/2026:13:55:36 +0000] "GET /items?page=2 HTTP/1.1" 200 2326`)
+
+Request fields in the common format have quotes and backslashes escaped with
+a backslash and control characters written as `\\xHH`, as Apache and nginx do. The path is
+percent-decoded, so otherwise a `%0a` or `%22` in a URL could forge lines or
+fields.
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import deque
+from typing import IO, Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from ._core import Pathium, Receive, Scope, Send
+
+FORMATS = ("json", "common")
+
+# (timestamp, client, method, path, query, http version, route, status, bytes, latency)
+Entry = Tuple[float, str, str, str, bytes, str, Optional[str], int, int, float]
+
+
+def format_json(entry: Entry) -> str:
+    ts, client, method, path, query, version, route, status, size, latency = entry
+    return json.dumps({
+        "time": ts,
+        "client": client,
+        "method": method,
+        "path": path,
+        "query": query.decode("latin-1"),
+        "http_version": version,
+        "route": route,
+        "status": status,
+        "bytes": size,
+        "latency_ms": round(latency * 1000, 3),
+    }, separators=(",", ":")) + "\n"
+
+
+_ESCAPES = {c: f"\\x{c:02x}" for c in (*range(0x20), 0x7f)}
+_ESCAPES.update({ord('"'): '\\"', ord("\\"): "\\\\"})
+
+
+def _escape(value: str) -> str:
+    return value.translate(_ESCAPES)
+
+
+def format_common(entry: Entry) -> str:
+    ts, client, method, path, query, version, route, status, size, latency = entry
+    target = f"{path}?{query.decode('latin-1')}" if query else path
+    when = time.strftime("%d/%b/%Y:%H:%M:%S +0000", time.gmtime(ts))
+    request = _escape(f"{method} {target} HTTP/{version}")
+    return f'{_escape(client) or "-"} - - [{when}] "{request}" {status} {size or "-"}\n'
+
+
+_FORMATTERS: Dict[str, Callable[[Entry], str]] = {"json": format_json, "common": format_common}
+
+
+class AccessLog:
+    """Bounded access-log queue drained by a writer thread.
+
+    Args:
+        sink: a path (opened for appending) or a text stream with `write()`.
+            Defaults to stdout.
+        format: `"json"` or `"common"`.
+        max_queue: entries buffered before new ones are dropped.
+        batch_size: entries that wake the writer early.
+        flush_interval: seconds between writes otherwise.
+    """
+    def __init__(
+        self,
+        sink: Union[str, IO[str], None] = None,
+        format: str = "json",
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}, not {format!r}")
+        self.sink = sink
+        self.format = _FORMATTERS[format]
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: Deque[Entry] = deque()
+        self.dropped = 0
+        self.written = 0
+        self._stream: Optional[IO[str]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._closing = False
+
+    def start(self) -> None:
+        """Open the sink and start the writer thread (done on first entry)."""
+        if self._thread is not None:
+            return
+        self._closing = False
+        if isinstance(self.sink, str):
+            self._stream = open(self.sink, "a", encoding="utf-8")
+        else:
+            self._stream = self.sink or sys.stdout
+        self._thread = threading.Thread(target=self._run, name="pathium-access-log", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Write the remaining entries and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._closing = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        if isinstance(self.sink, str) and self._stream is not None:
+            self._stream.close()
+        self._stream = None
+
+    def record(self, entry: Entry) -> None:
+        queue = self.queue
+        if len(queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        queue.append(entry)
+        if self._thread is None:
+            self.start()
+        elif len(queue) == self.batch_size:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closing
+            self._write_batch()
+            if closing:
+                return
+
+    def _write_batch(self) -> None:
+        queue = self.queue
+        lines: List[str] = []
+        fmt = self.format
+        while queue:
+            lines.append(fmt(queue.popleft()))
+        if not lines or self._stream is None:
+            return
+        try:
+            self._stream.write("".join(lines))
+            self._stream.flush()
+            self.written += len(lines)
+        except Exception:  # pragma: no cover - a broken sink must not kill the thread
+            self.dropped += len(lines)
+
+    def middleware(self, app: Callable[[Scope, Receive, Send], Any]) -> Callable[[Scope, Receive, Send], Any]:
+        async def inner(scope: Scope, receive: Receive, send: Send) -> None:
+            if scope.get("type") != "http":
+                await app(scope, receive, send)
+                return
+
+            status = 500
+            size = 0
+            start = time.perf_counter()
+
+            def send_wrapper(msg: Dict[str, Any]):
+                nonlocal status, size
+                if msg["type"] == "http.response.start":
+                    status = msg["status"]
+                else:
+                    size += len(msg.get("body", b""))
+                return send(msg)
+
+            try:
+                await app(scope, receive, send_wrapper)
+            finally:
+                client = scope.get("client")
+                route = scope.get("route")
+                self.record((
+                    time.time(),
+                    client[0] if client else "",
+                    scope.get("method", ""),
+                    scope.get("path", ""),
+                    scope.get("query_string", b""),
+                    scope.get("http_version", "1.1"),
+                    route.path if route is not None else None,
+                    status,
+                    size,
+                    time.perf_counter() - start,
+                ))
+
+        return inner
+
+
+def add_access_log(app: Pathium, **options: Any) -> AccessLog:
+    """Log every request of `app`; keyword arguments go to `AccessLog`.
+
+    The writer starts with the app and is flushed and stopped on shutdown.
+    """
+    log = AccessLog(**options)
+    app.use(log.middleware)
+    app.on_startup(log.start)
+    app.on_shutdown(lambda: asyncio.to_thread(log.close))
+    return log
@@ -0,0 +1,127 @@
+"""Background tasks that run after the response has been sent.
+
+Attach a `BackgroundTasks` to a `Response` (or declare a `BackgroundTasks`
+handler parameter) to defer work such as audit logging or webhook fan-out
+until after the final `http.response.body` message, keeping it out of the
+client-visible latency.
+
+By default the tasks run in the request's own coroutine right after the
+body is sent. Apps that expect bursts can bound the work with a
+`BackgroundQueue`: a fixed number of worker coroutines consume a bounded
+queue, and `Pathium.drain_background()` waits for queued work at shutdown.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("pathiumapi.background")
+
+
+class BackgroundTasks:
+    """An ordered list of callables to run after the response is sent.
+
+    Example:
+
+        @app.post("/orders")
+        async def create_order(req, tasks: BackgroundTasks):
+            order = await save(await req.json())
+            tasks.add_task(send_receipt, order.id)
+            return Response.json({"id": order.id}, status=201)
+
+    Coroutine functions are awaited; plain functions run in a worker thread.
+    A failing task is logged and does not prevent the remaining tasks.
+    """
+    def __init__(self) -> None:
+        self.tasks: List[Tuple[Callable[..., Any], Tuple[Any, ...], dict]] = []
+
+    def add_task(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        self.tasks.append((func, args, kwargs))
+
+    def extend(self, other: "BackgroundTasks") -> None:
+        self.tasks.extend(other.tasks)
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    async def __call__(self) -> None:
+        for func, args, kwargs in self.tasks:
+            try:
+                if inspect.iscoroutinefunction(func):
+                    await func(*args, **kwargs)
+                else:
+                    await asyncio.to_thread(functools.partial(func, *args, **kwargs))
+            except Exception:
+                logger.exception("Background task %r failed", func)
+
+
+class BackgroundQueue:
+    """Bounded queue of background work consumed by a fixed worker pool.
+
+    Args:
+        max_size: queued `BackgroundTasks` before submitters wait for room.
+            Submission happens after the response is sent, so back-pressure
+            delays the request coroutine, never the client.
+        workers: number of worker coroutines (started on first submit).
+
+    Example:
+
+        app = Pathium(background_queue=BackgroundQueue(max_size=1000, workers=4))
+    """
+    def __init__(self, max_size: int = 1000, workers: int = 4):
+        self.max_size = max_size
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: Set[asyncio.Task] = set()
+        self.submitted = 0
+        self.completed = 0
+
+    def _start(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.max_size)
+            loop = asyncio.get_running_loop()
+            for _ in range(self.workers):
+                # a fresh context: the first submitter's contextvars (its
+                # deadline, say) must not leak into every later task
+                self._workers.add(loop.create_task(self._worker(self._queue), context=contextvars.Context()))
+        return self._queue
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            tasks = await queue.get()
+            try:
+                await tasks()
+            finally:
+                self.completed += 1
+                queue.task_done()
+
+    async def submit(self, tasks: BackgroundTasks) -> None:
+        """Queue `tasks`, waiting for room when the queue is full."""
+        self.submitted += 1
+        await self._start().put(tasks)
+
+    @property
+    def pending(self) -> int:
+        return self.submitted - self.completed
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to `timeout` seconds for queued work, then stop the workers.
+
+        Returns True when every queued task finished, False if the deadline
+        passed and remaining work was cancelled.
+        """
+        queue, self._queue = self._queue, None
+        if queue is None:
+            return True
+        drained = True
+        try:
+            await asyncio.wait_for(queue.join(), timeout)
+        except asyncio.TimeoutError:
+            drained = False
+        workers, self._workers = self._workers, set()
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        return drained
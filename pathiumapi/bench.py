@@ -0,0 +1,341 @@
+"""Micro-benchmarks for the framework's hot paths (`pathiumapi bench`).
+
+Everything runs in-process: ASGI cases drive a `Pathium` app through a
+minimal fake server (a scope plus in-memory `receive` / `send`), so the
+numbers isolate framework overhead from sockets and HTTP parsing (see
+`scripts/server_bench.py` for the server itself).
+
+Suites:
+
+- `router/<n>/...`: `Router.find` with n routes, half static and half
+  parameterised: static hit, dynamic hit, miss
+- `middleware/...`: a full request through the shipped middleware, one at
+  a time and all together
+- `json/parse/<items>`, `json/encode/<items>`: `Request.json()` and
+  `Response.json()` at several payload sizes
+- `validate/<items>`: a request through a `validate_body` route
+- `openapi/...`: building the OpenAPI document
+
+Each case runs in batches sized to take about a millisecond; ops/sec is
+total operations over total time. `batch_p50_ns` / `batch_p99_ns` are
+percentiles of the per-batch average time per operation, in nanoseconds:
+they show how steady the throughput was (GC pauses, a noisy neighbour),
+not the tail latency of single operations, which a millisecond batch
+averages away. Use `pathiumapi loadtest` for per-request latencies.
+Results are JSON; `compare()` (or `pathiumapi bench --compare old.json`)
+reports changes against a previous run and flags regressions beyond a
+threshold.
+"""
+import asyncio
+import inspect
+import json
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ._core import Pathium, Request, Response, Router, __version__, openapi_spec
+
+Case = Tuple[str, Callable[[], Any]]
+
+ROUTE_COUNTS = (10, 100, 1000)
+PAYLOAD_ITEMS = (1, 100, 1000)
+_BATCH_NS = 1_000_000
+_JWT_SECRET = "pathiumapi-benchmark-secret-0123456789"
+
+
+def _payload(items: int) -> List[Dict[str, Any]]:
+    return [{"id": i, "name": f"item-{i}", "price": i * 1.5, "tags": ["a", "b"]} for i in range(items)]
+
+
+def _request(app: Any, method: str, path: str, headers: List[Tuple[bytes, bytes]], body: bytes = b"") -> Callable[[], Any]:
+    """An async callable sending one request to `app` through a fake server."""
+    message = {"type": "http.request", "body": body, "more_body": False}
+
+    async def receive() -> Dict[str, Any]:
+        return message
+
+    async def send(msg: Dict[str, Any]) -> None:
+        pass
+
+    async def call() -> None:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "path": path,
+            "query_string": b"",
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+        }
+        await app(scope, receive, send)
+
+    return call
+
+
+def router_cases() -> Iterator[Case]:
+    async def handler(req: Request) -> Response:
+        return Response(b"")
+
+    for n in ROUTE_COUNTS:
+        router = Router()
+        for i in range(n // 2):
+            router.add("GET", f"/s{i}/info", handler)
+            router.add("GET", f"/d{i}/{{id:int}}", handler)
+        router.compile()
+        middle = n // 4
+        find = router.find
+        yield f"router/{n}/static_hit", lambda find=find, p=f"/s{middle}/info": find("GET", p)
+        yield f"router/{n}/dynamic_hit", lambda find=find, p=f"/d{middle}/42": find("GET", p)
+        yield f"router/{n}/miss", lambda find=find: find("GET", "/missing/42")
+
+
+def middleware_cases() -> Iterator[Case]:
+    from .middleware import cors_middleware_factory, rate_limit_middleware_factory, security_headers_middleware
+
+    stacks: Dict[str, List[Any]] = {
+        "none": [],
+        "cors": [cors_middleware_factory()],
+        "security": [security_headers_middleware()],
+        "rate_limit": [rate_limit_middleware_factory(requests=2**62)],
+    }
+    headers = [(b"host", b"bench"), (b"origin", b"https://example.com")]
+    try:
+        from .auth import create_token, jwt_middleware_factory
+    except ImportError:  # PyJWT not installed
+        pass
+    else:
+        stacks["jwt"] = [jwt_middleware_factory(_JWT_SECRET)]
+        headers.append((b"authorization", b"Bearer " + create_token({"sub": "bench"}, _JWT_SECRET).encode()))
+    stacks["all"] = [mw for name, mws in stacks.items() for mw in mws]
+
+    for name, mws in stacks.items():
+        app = Pathium(warmup_on_startup=False)
+        for mw in mws:
+            app.use(mw)
+
+        @app.get("/ping")
+        async def ping(req: Request) -> Response:
+            return Response(b"pong")
+
+        yield f"middleware/{name}", _request(app, "GET", "/ping", headers)
+
+
+def json_cases() -> Iterator[Case]:
+    for items in PAYLOAD_ITEMS:
+        payload = _payload(items)
+        body = json.dumps(payload).encode()
+        message = {"type": "http.request", "body": body, "more_body": False}
+
+        async def receive(message: Dict[str, Any] = message) -> Dict[str, Any]:
+            return message
+
+        scope = {"type": "http", "method": "POST", "path": "/", "headers": []}
+
+        async def parse(scope: Dict[str, Any] = scope, receive: Any = receive) -> Any:
+            return await Request(scope, receive).json()
+
+        yield f"json/parse/{items}", parse
+        yield f"json/encode/{items}", lambda payload=payload: Response.json(payload)
+
+
+def validate_cases() -> Iterator[Case]:
+    try:
+        from pydantic import BaseModel
+    except ImportError:  # pydantic not installed
+        return
+    from .validation import validate_body
+
+    class Item(BaseModel):
+        id: int
+        name: str
+        price: float
+        tags: List[str]
+
+    app = Pathium(warmup_on_startup=False)
+
+    @app.post("/items")
+    @validate_body(list[Item])
+    async def create(req: Request, items: list[Item]) -> Response:
+        return Response(b"")
+
+    for items in PAYLOAD_ITEMS:
+        body = json.dumps(_payload(items)).encode()
+        yield f"validate/{items}", _request(app, "POST", "/items", [(b"content-type", b"application/json")], body)
+
+
+def openapi_cases() -> Iterator[Case]:
+    app = Pathium(warmup_on_startup=False)
+    for i in range(50):
+        async def handler(req: Request, id: int, q: Optional[str] = None) -> Response:
+            return Response(b"")
+        app.get(f"/r{i}/{{id:int}}")(handler)
+    yield "openapi/50_routes", lambda: openapi_spec(app)
+
+
+SUITES: List[Callable[[], Iterator[Case]]] = [
+    router_cases, middleware_cases, json_cases, validate_cases, openapi_cases,
+]
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summarise(batches: List[Tuple[int, int]]) -> Dict[str, Any]:
+    ops = sum(n for n, _ in batches)
+    elapsed = sum(ns for _, ns in batches)
+    per_op = sorted(ns / n for n, ns in batches)
+    return {
+        "ops_per_sec": ops / (elapsed / 1e9),
+        "batch_p50_ns": _percentile(per_op, 0.50),
+        "batch_p99_ns": _percentile(per_op, 0.99),
+        "ops": ops,
+        "batches": len(batches),
+    }
+
+
+def measure(fn: Callable[[], Any], min_time: float = 0.5) -> Dict[str, Any]:
+    """Benchmark synchronous `fn` for about `min_time` seconds."""
+    clock = time.perf_counter_ns
+
+    def batch(n: int) -> int:
+        start = clock()
+        for _ in range(n):
+            fn()
+        return clock() - start
+
+    n = 1
+    while batch(n) < _BATCH_NS and n < 1 << 24:
+        n *= 2
+    batches: List[Tuple[int, int]] = []
+    deadline = clock() + int(min_time * 1e9)
+    while clock() < deadline or len(batches) < 5:
+        batches.append((n, batch(n)))
+    return _summarise(batches)
+
+
+async def measure_async(fn: Callable[[], Any], min_time: float = 0.5) -> Dict[str, Any]:
+    """Benchmark coroutine function `fn` for about `min_time` seconds."""
+    clock = time.perf_counter_ns
+
+    async def batch(n: int) -> int:
+        start = clock()
+        for _ in range(n):
+            await fn()
+        return clock() - start
+
+    n = 1
+    while await batch(n) < _BATCH_NS and n < 1 << 24:
+        n *= 2
+    batches: List[Tuple[int, int]] = []
+    deadline = clock() + int(min_time * 1e9)
+    while clock() < deadline or len(batches) < 5:
+        batches.append((n, await batch(n)))
+    return _summarise(batches)
+
+
+def run_benchmarks(
+    filter: Optional[str] = None,
+    min_time: float = 0.5,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run every case whose name contains `filter`; returns the JSON report."""
+    results: Dict[str, Any] = {}
+    for suite in SUITES:
+        for name, fn in suite():
+            if filter and filter not in name:
+                continue
+            if inspect.iscoroutinefunction(fn):
+                result = asyncio.run(measure_async(fn, min_time))
+            else:
+                result = measure(fn, min_time)
+            results[name] = result
+            if progress is not None:
+                progress(name, result)
+    return {
+        "meta": {
+            "pathiumapi": __version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "time": time.time(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.10,
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Compare two reports by ops/sec.
+
+    Returns one row per case present in both and the names of cases whose
+    throughput dropped by more than `threshold` (a fraction).
+    """
+    rows: List[Dict[str, Any]] = []
+    regressions: List[str] = []
+    old_results, new_results = baseline["results"], current["results"]
+    for name, new in new_results.items():
+        old = old_results.get(name)
+        if old is None:
+            continue
+        change = new["ops_per_sec"] / old["ops_per_sec"] - 1.0
+        old_p99 = old.get("batch_p99_ns")
+        rows.append({
+            "name": name,
+            "baseline": old["ops_per_sec"],
+            "current": new["ops_per_sec"],
+            "change": change,
+            "batch_p99_change": new["batch_p99_ns"] / old_p99 - 1.0 if old_p99 else 0.0,
+        })
+        if change < -threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def format_result(name: str, result: Dict[str, Any]) -> str:
+    return (
+        f"{name:<32} {result['ops_per_sec']:>14,.0f} ops/s"
+        f"  batch p50 {result['batch_p50_ns'] / 1000:>9.2f} us  p99 {result['batch_p99_ns'] / 1000:>9.2f} us"
+    )
+
+
+def format_comparison(rows: List[Dict[str, Any]], regressions: List[str]) -> str:
+    lines = [f"{'benchmark':<32} {'baseline':>14} {'current':>14} {'change':>8}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["name"] in regressions else ""
+        lines.append(
+            f"{row['name']:<32} {row['baseline']:>14,.0f} {row['current']:>14,.0f} {row['change']:>+8.1%}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main(
+    filter: Optional[str] = None,
+    min_time: float = 0.5,
+    output: Optional[str] = None,
+    baseline: Optional[str] = None,
+    threshold: float = 0.10,
+) -> int:
+    """Run the suite for the CLI; returns 1 when `baseline` shows a regression."""
+    report = run_benchmarks(filter, min_time, lambda name, r: print(format_result(name, r), file=sys.stderr))
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    if baseline is None:
+        return 0
+    with open(baseline, encoding="utf-8") as fh:
+        old = json.load(fh)
+    if old.get("meta", {}).get("python") != report["meta"]["python"]:
+        print(f"warning: baseline ran on Python {old.get('meta', {}).get('python')}", file=sys.stderr)
+    rows, regressions = compare(old, report, threshold)
+    print(format_comparison(rows, regressions), file=sys.stderr)
+    return 1 if regressions else 0
@@ -0,0 +1,484 @@
+"""In-process pub/sub hub for fanning out events to WebSocket/SSE clients.
+
+A `Broadcast` keeps topic channels with one bounded queue per subscriber.
+Each published message is wrapped in a `Message` whose text/bytes encoding
+is computed once and shared by every subscriber, so fan-out to thousands of
+sockets costs one serialization. When a subscriber falls behind, its queue
+policy decides what happens:
+
+- `"drop_oldest"`: discard the oldest queued message (default)
+- `"drop_newest"`: discard the incoming message
+- `"disconnect"`: close the subscription; the consumer sees
+  `SubscriptionClosed` and should drop the client
+
+Example:
+
+    hub = Broadcast()
+
+    @app.websocket("/ws/{room}")
+    async def room(ws: WebSocket, room: str):
+        await ws.accept()
+        async with hub.subscribe(room) as sub:
+            async for msg in sub:
+                await ws.send_text(msg.text)
+
+    @app.post("/rooms/{room}")
+    async def post(req, room: str):
+        await hub.publish(room, await req.json())
+        return Response("", status=202)
+
+Delivery goes through a pluggable `BroadcastBackend`. `MemoryBackend` (the
+default) delivers in-process; `LocalBrokerBackend` connects every worker of
+a multi-process deployment to a small broker (`serve_broker()`), standing
+in for Redis or NATS in development and single-host setups.
+"""
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Set
+
+logger = logging.getLogger("pathiumapi.broadcast")
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+DISCONNECT = "disconnect"
+_POLICIES = (DROP_OLDEST, DROP_NEWEST, DISCONNECT)
+_UNDECODED: Any = object()
+
+
+class SubscriptionClosed(Exception):
+    """Raised by `Subscription.get()` once the subscription is closed.
+
+    `slow_consumer` is True when the `disconnect` policy closed it.
+    """
+    def __init__(self, slow_consumer: bool = False):
+        self.slow_consumer = slow_consumer
+        super().__init__("slow consumer disconnected" if slow_consumer else "subscription closed")
+
+
+class Message:
+    """A published event shared by all subscribers of a topic.
+
+    `data` is the published object; `text` and `bytes` are its JSON (or
+    plain string) encoding, computed on first access and then cached.
+
+    A message received through a broker only carries the text; its `data`
+    is decoded from it on first access: the JSON value, or the text itself
+    when it is not JSON. A published string that happens to be valid JSON
+    (`"42"`) therefore arrives decoded; publish objects rather than
+    pre-encoded strings if that matters.
+    """
+    __slots__ = ("topic", "_data", "_text", "_bytes")
+
+    def __init__(self, topic: str, data: Any = None, text: Optional[str] = None):
+        self.topic = topic
+        self._data = _UNDECODED if data is None and text is not None else data
+        self._text = text
+        self._bytes: Optional[bytes] = None
+
+    @property
+    def data(self) -> Any:
+        if self._data is _UNDECODED:
+            try:
+                self._data = json.loads(self._text)  # type: ignore[arg-type]
+            except ValueError:
+                self._data = self._text
+        return self._data
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._data if isinstance(self._data, str) else json.dumps(self._data)
+        return self._text
+
+    @property
+    def bytes(self) -> bytes:
+        if self._bytes is None:
+            self._bytes = self.text.encode()
+        return self._bytes
+
+
+class Subscription:
+    """A subscriber's bounded queue on one topic.
+
+    Use as an async context manager and iterate it, or call `get()`.
+    """
+    def __init__(self, hub: "Broadcast", topic: str, max_queue: int, policy: str):
+        if policy not in _POLICIES:
+            raise ValueError(f"unknown policy {policy!r}; expected one of {_POLICIES}")
+        self.hub = hub
+        self.topic = topic
+        self.max_queue = max_queue
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self.slow_consumer = False
+        self._items: Deque[Message] = deque()
+        self._waiter: Optional[asyncio.Future] = None
+
+    def _offer(self, msg: Message) -> None:
+        if self.closed:
+            return
+        if len(self._items) >= self.max_queue:
+            if self.policy == DROP_OLDEST:
+                self._items.popleft()
+                self.dropped += 1
+            elif self.policy == DROP_NEWEST:
+                self.dropped += 1
+                return
+            else:
+                self.slow_consumer = True
+                self.hub._remove(self)
+                self._close()
+                return
+        self._items.append(msg)
+        self._wake()
+
+    def _wake(self) -> None:
+        w = self._waiter
+        if w is not None and not w.done():
+            w.set_result(None)
+
+    def _close(self) -> None:
+        self.closed = True
+        self._items.clear()
+        self._wake()
+
+    async def get(self) -> Message:
+        """Wait for the next message; raises `SubscriptionClosed` when closed."""
+        while not self._items:
+            if self.closed:
+                raise SubscriptionClosed(self.slow_consumer)
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._items.popleft()
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Message:
+        try:
+            return await self.get()
+        except SubscriptionClosed:
+            raise StopAsyncIteration from None
+
+    async def __aenter__(self) -> "Subscription":
+        await self.hub._add(self)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.hub.unsubscribe(self)
+
+
+class BroadcastBackend(ABC):
+    """Transport interface between a `Broadcast` hub and other workers.
+
+    `connect()` receives the hub's delivery callback `(topic, text)`; the
+    backend calls it for every message published on a subscribed topic,
+    including messages this worker published itself.
+    """
+    @abstractmethod
+    async def connect(self, deliver: Callable[[str, str], None]) -> None: ...
+
+    @abstractmethod
+    async def disconnect(self) -> None: ...
+
+    @abstractmethod
+    async def subscribe(self, topic: str) -> None: ...
+
+    @abstractmethod
+    async def unsubscribe(self, topic: str) -> None: ...
+
+    @abstractmethod
+    async def publish(self, topic: str, text: str) -> None: ...
+
+
+class MemoryBackend(BroadcastBackend):
+    """Single-process backend: the hub delivers messages directly."""
+    local = True
+
+    async def connect(self, deliver: Callable[[str, str], None]) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        pass
+
+    async def subscribe(self, topic: str) -> None:
+        pass
+
+    async def unsubscribe(self, topic: str) -> None:
+        pass
+
+    async def publish(self, topic: str, text: str) -> None:  # pragma: no cover - hub short-circuits
+        pass
+
+
+class Broadcast:
+    """Topic-based pub/sub hub with per-subscriber bounded queues.
+
+    Args:
+        backend: a `BroadcastBackend` (default: `MemoryBackend()`).
+        max_queue: default per-subscriber queue bound.
+        policy: default overflow policy (`drop_oldest`, `drop_newest`,
+            `disconnect`).
+
+    Non-memory backends must be connected first, e.g. from a startup hook:
+    `app.on_startup(hub.connect)` / `app.on_shutdown(hub.disconnect)`.
+    """
+    def __init__(self, backend: Optional[BroadcastBackend] = None, max_queue: int = 100, policy: str = DROP_OLDEST):
+        if policy not in _POLICIES:
+            raise ValueError(f"unknown policy {policy!r}; expected one of {_POLICIES}")
+        self.backend = backend or MemoryBackend()
+        self.max_queue = max_queue
+        self.policy = policy
+        self._topics: Dict[str, Set[Subscription]] = {}
+        # backend unsubscribes still in flight; a new subscription to the
+        # topic waits for them so the backend never sees SUB before UNSUB
+        self._unsubscribing: Dict[str, "asyncio.Task[None]"] = {}
+        self.published = 0
+
+    async def connect(self) -> None:
+        await self.backend.connect(self._deliver_text)
+
+    async def disconnect(self) -> None:
+        for subs in list(self._topics.values()):
+            for sub in list(subs):
+                sub._close()
+        self._topics.clear()
+        await self.backend.disconnect()
+
+    def subscribe(self, topic: str, max_queue: Optional[int] = None, policy: Optional[str] = None) -> Subscription:
+        """Return a subscription to enter with `async with`."""
+        return Subscription(self, topic, max_queue or self.max_queue, policy or self.policy)
+
+    async def _add(self, sub: Subscription) -> None:
+        pending = self._unsubscribing.get(sub.topic)
+        if pending is not None:
+            await asyncio.wait({pending})
+        subs = self._topics.get(sub.topic)
+        if subs is None:
+            subs = self._topics[sub.topic] = set()
+            await self.backend.subscribe(sub.topic)
+        subs.add(sub)
+
+    def _remove(self, sub: Subscription) -> Optional["asyncio.Task[None]"]:
+        """Detach `sub`; returns the backend unsubscribe when it was the topic's last subscriber.
+
+        Called synchronously from delivery, so the unsubscribe runs as a task
+        that later subscriptions to the topic wait for.
+        """
+        subs = self._topics.get(sub.topic)
+        if not subs or sub not in subs:
+            return None
+        subs.discard(sub)
+        if subs:
+            return None
+        del self._topics[sub.topic]
+        if getattr(self.backend, "local", False):
+            return None
+        task = self._unsubscribing[sub.topic] = asyncio.ensure_future(self.backend.unsubscribe(sub.topic))
+        task.add_done_callback(lambda t, topic=sub.topic: self._unsubscribed(topic, t))
+        return task
+
+    def _unsubscribed(self, topic: str, task: "asyncio.Task[None]") -> None:
+        if self._unsubscribing.get(topic) is task:
+            del self._unsubscribing[topic]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("unsubscribing from %r failed: %r", topic, task.exception())
+
+    async def unsubscribe(self, sub: Subscription) -> None:
+        task = self._remove(sub)
+        sub._close()
+        if task is not None:
+            await asyncio.wait({task})
+
+    async def publish(self, topic: str, data: Any) -> None:
+        """Publish `data` (JSON-serializable or str) to `topic`."""
+        self.published += 1
+        msg = data if isinstance(data, Message) else Message(topic, data)
+        if getattr(self.backend, "local", False):
+            self._deliver(msg)
+        else:
+            await self.backend.publish(topic, msg.text)
+
+    def _deliver_text(self, topic: str, text: str) -> None:
+        self._deliver(Message(topic, text=text))
+
+    def _deliver(self, msg: Message) -> None:
+        subs = self._topics.get(msg.topic)
+        if not subs:
+            return
+        for sub in list(subs):
+            sub._offer(msg)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return topic/subscriber counts and drops per topic."""
+        return {
+            "published": self.published,
+            "topics": {
+                topic: {"subscribers": len(subs), "dropped": sum(s.dropped for s in subs)}
+                for topic, subs in self._topics.items()
+            },
+        }
+
+
+# --- local broker -----------------------------------------------------------
+#
+# Frames are `<op> <topic> <length>\n<payload>` where op is SUB, UNSUB or PUB
+# and payload holds `length` UTF-8 bytes (empty for SUB/UNSUB).
+
+async def _read_frame(reader: asyncio.StreamReader):
+    header = await reader.readline()
+    if not header:
+        return None
+    op, topic, length = header.decode().split(" ")
+    payload = await reader.readexactly(int(length)) if int(length) else b""
+    return op, topic, payload
+
+
+def _frame(op: str, topic: str, payload: bytes = b"") -> bytes:
+    if " " in topic or "\n" in topic:
+        raise ValueError("broker topics cannot contain spaces or newlines")
+    return f"{op} {topic} {len(payload)}\n".encode() + payload
+
+
+async def serve_broker(
+    host: str = "127.0.0.1",
+    port: int = 7766,
+    max_buffer: int = 8 * 1024 * 1024,
+) -> asyncio.AbstractServer:
+    """Start a minimal TCP broker relaying published messages to subscribers.
+
+    Run it once per host (e.g. in the master process or its own process)
+    and point every worker's `LocalBrokerBackend` at it. A subscriber whose
+    unsent backlog exceeds `max_buffer` bytes has stopped reading: it is
+    disconnected instead of growing the broker's memory, and reconnects.
+    """
+    subscribers: Dict[str, Set[asyncio.StreamWriter]] = {}
+
+    def drop(writer: asyncio.StreamWriter) -> None:
+        for subs in subscribers.values():
+            subs.discard(writer)
+        writer.transport.abort()  # frees the backlog instead of flushing it
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        topics: Set[str] = set()
+        try:
+            while True:
+                frame = await _read_frame(reader)
+                if frame is None:
+                    break
+                op, topic, payload = frame
+                if op == "SUB":
+                    subscribers.setdefault(topic, set()).add(writer)
+                    topics.add(topic)
+                elif op == "UNSUB":
+                    subscribers.get(topic, set()).discard(writer)
+                    topics.discard(topic)
+                elif op == "PUB":
+                    data = _frame("PUB", topic, payload)
+                    for w in list(subscribers.get(topic, ())):
+                        w.write(data)
+                        if w.transport.get_write_buffer_size() > max_buffer:
+                            logger.warning("broker: disconnecting a subscriber more than %d bytes behind", max_buffer)
+                            drop(w)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            for topic in topics:
+                subscribers.get(topic, set()).discard(writer)
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+class LocalBrokerBackend(BroadcastBackend):
+    """Backend sharing topics between workers through `serve_broker()`.
+
+    When the broker connection is lost or sends a malformed frame, the
+    backend reconnects (waiting `reconnect_delay` seconds, doubling up to
+    30) and subscribes to its topics again. Messages published by others in
+    the meantime are lost; publishing meanwhile raises `ConnectionError`.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 7766, reconnect_delay: float = 0.5):
+        self.host = host
+        self.port = port
+        self.reconnect_delay = reconnect_delay
+        self._topics: Set[str] = set()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def connect(self, deliver: Callable[[str, str], None]) -> None:
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._reader_task = asyncio.ensure_future(self._run(reader, deliver))
+
+    async def _run(self, reader: asyncio.StreamReader, deliver: Callable[[str, str], None]) -> None:
+        while True:
+            await self._read(reader, deliver)
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            delay = self.reconnect_delay
+            while True:
+                await asyncio.sleep(delay)
+                try:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                except OSError as exc:
+                    logger.warning("reconnecting to the broker failed: %r", exc)
+                    delay = min(delay * 2, 30.0)
+                    continue
+                for topic in self._topics:
+                    writer.write(_frame("SUB", topic))
+                self._writer = writer
+                break
+
+    async def _read(self, reader: asyncio.StreamReader, deliver: Callable[[str, str], None]) -> None:
+        try:
+            while True:
+                frame = await _read_frame(reader)
+                if frame is None:
+                    logger.warning("the broker closed the connection; reconnecting")
+                    return
+                _, topic, payload = frame
+                deliver(topic, payload.decode())
+        except (asyncio.IncompleteReadError, ConnectionError) as exc:
+            logger.warning("lost the broker connection (%r); reconnecting", exc)
+        except ValueError as exc:
+            logger.error("malformed frame from the broker (%s); reconnecting", exc)
+
+    async def _send(self, data: bytes) -> None:
+        if self._writer is None:
+            if self._reader_task is None:
+                raise RuntimeError("LocalBrokerBackend is not connected; call Broadcast.connect() first")
+            raise ConnectionError("lost the broker connection; reconnecting")
+        self._writer.write(data)
+        await self._writer.drain()
+
+    async def disconnect(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._topics.clear()
+
+    async def subscribe(self, topic: str) -> None:
+        frame = _frame("SUB", topic)
+        if self._reader_task is not None:
+            self._topics.add(topic)  # sent again after a reconnect
+        if self._writer is not None or self._reader_task is None:
+            await self._send(frame)
+
+    async def unsubscribe(self, topic: str) -> None:
+        self._topics.discard(topic)
+        if self._writer is not None:
+            await self._send(_frame("UNSUB", topic))
+
+    async def publish(self, topic: str, text: str) -> None:
+        await self._send(_frame("PUB", topic, text.encode()))
@@ -26,38 +26,61 @@ def new_project(name: str) -> None:
     print(f"Created project {name}")
 
 
-def run_app(path: str = ".") -> None:
-    # Try to find an ASGI app in examples/app.py or app.py
+def load_app(path: str = "."):
+    """Import and return the ASGI app named by `path`.
+
+    `path` is either `module:attribute` (importable from the current folder)
+    or a folder containing `app.py` or `examples/app.py` exposing `app`.
+    """
+    import importlib
+    import importlib.util
+
+    if ":" in path and not Path(path).exists():
+        module_name, _, attr = path.partition(":")
+        sys.path.insert(0, os.getcwd())
+        return getattr(importlib.import_module(module_name), attr)
+
     p = Path(path)
-    candidates = [p / "app.py", p / "examples" / "app.py"]
-    target = None
-    for c in candidates:
-        if c.exists():
-            target = c
-            break
+    candidates = [p] if p.is_file() else [p / "app.py", p / "examples" / "app.py"]
+    target = next((c for c in candidates if c.exists()), None)
     if target is None:
+        return None
+    # make sibling modules (e.g. generated `routes/`) importable
+    sys.path.insert(0, str(target.parent.resolve()))
+    spec = importlib.util.spec_from_file_location(target.stem, target)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[target.stem] = module
+    spec.loader.exec_module(module)
+    return getattr(module, "app")
+
+
+def run_app(
+    path: str = ".",
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = 1,
+    reuse_port: bool = False,
+    graceful_timeout: float = 30.0,
+) -> None:
+    """Serve the app found at `path` with the built-in HTTP server.
+
+    With `workers > 1` the app is imported once and served by forked worker
+    processes (see `pathiumapi.prefork`).
+    """
+    import logging
+
+    app = load_app(path)
+    if app is None:
         print("No app.py found in the current folder or examples/. Create one with `pathiumapi new <name>`." )
         return
-    # Attempt to run with uvicorn if available
-    else:
-        tpl = textwrap.dedent(f"""
-            from pathiumapi import Response
-
-            def register(app):
-                @app.{method}("{route_path}")
-                async def {name}(req):
-                    return Response.json({{"message": "Hello from {name}", "path": "{route_path}"}})
-
-        """)
-        target.write_text(tpl)
-        print(f"Created route stub: {target}")
-        # adding the app's parent directory to sys.path and importing by name.
-        module = target.with_suffix("").name
-        import sys
-        sys.path.insert(0, str(target.parent.resolve()))
-
-    print(f"Running {module}:app with uvicorn")
-    uvicorn.run(f"{module}:app", host="127.0.0.1", port=8000)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    if workers > 1:
+        from . import prefork
+        sys.exit(prefork.run(
+            app, host=host, port=port, workers=workers, reuse_port=reuse_port, graceful_timeout=graceful_timeout,
+        ))
+    from .server import run
+    run(app, host=host, port=port, graceful_timeout=graceful_timeout)
 
 
 def generate_route(name: str, route_path: str, method: str = "get", app_file: str = "app.py") -> None:
@@ -170,7 +193,34 @@ def main(argv=None):
     p_new.add_argument("name")
 
     p_run = sub.add_parser("run", help="Run a PathiumAPI app in the current folder")
-    p_run.add_argument("path", nargs="?", default=".")
+    p_run.add_argument("path", nargs="?", default=".", help="Folder with app.py, a file, or module:attribute")
+    p_run.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    p_run.add_argument("--port", type=int, default=8000, help="Port to bind (default: 8000)")
+    p_run.add_argument("--workers", type=int, default=1, help="Worker processes to fork (default: 1)")
+    p_run.add_argument("--reuse-port", action="store_true", help="Give each worker its own SO_REUSEPORT socket")
+    p_run.add_argument("--graceful-timeout", type=float, default=30.0,
+                       help="Seconds to let in-flight requests finish on shutdown (default: 30)")
+
+    p_bench = sub.add_parser("bench", help="Benchmark the framework's hot paths (JSON report)")
+    p_bench.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this")
+    p_bench.add_argument("--min-time", type=float, default=0.5, help="Seconds per benchmark (default: 0.5)")
+    p_bench.add_argument("--output", "-o", default=None, help="Write the JSON report here instead of stdout")
+    p_bench.add_argument("--compare", dest="baseline", default=None,
+                         help="Baseline report to compare against; exits 1 on a regression")
+    p_bench.add_argument("--threshold", type=float, default=0.10,
+                         help="Throughput drop counted as a regression (default: 0.10)")
+
+    p_load = sub.add_parser("loadtest", help="Send concurrent requests to an app in-process or to a URL")
+    p_load.add_argument("target", nargs="?", default=".",
+                        help="App (folder, file or module:attribute) to call in-process, or an http(s) URL")
+    p_load.add_argument("--path", default="/", help="Path to request on an in-process app (default: /)")
+    p_load.add_argument("--requests", "-n", type=int, default=1000, help="Total requests (default: 1000)")
+    p_load.add_argument("--concurrency", "-c", type=int, default=10, help="Requests in flight (default: 10)")
+    p_load.add_argument("--method", "-X", default="GET", help="HTTP method (default: GET)")
+    p_load.add_argument("--header", "-H", action="append", dest="headers", default=[],
+                        help="Request header as 'name: value' (repeatable)")
+    p_load.add_argument("--data", "-d", default=None, help="Request body")
+    p_load.add_argument("--json", action="store_true", dest="as_json", help="Print the report as JSON")
 
     p_gen = sub.add_parser("generate", help="Generate scaffolding (routes, middleware, etc.)")
     p_gen_sub = p_gen.add_subparsers(dest="what")
@@ -185,7 +235,15 @@ def main(argv=None):
     if args.cmd == "new":
         new_project(args.name)
     elif args.cmd == "run":
-        run_app(args.path)
+        run_app(args.path, args.host, args.port, args.workers, args.reuse_port, args.graceful_timeout)
+    elif args.cmd == "bench":
+        from . import bench
+        sys.exit(bench.main(args.filter, args.min_time, args.output, args.baseline, args.threshold))
+    elif args.cmd == "loadtest":
+        from . import loadtest
+        sys.exit(loadtest.main(
+            args.target, args.path, args.requests, args.concurrency, args.method, args.headers, args.data, args.as_json,
+        ))
     elif args.cmd == "generate":
         if getattr(args, "what", None) == "route":
             generate_route(args.name, args.route_path, args.method, args.app_file)
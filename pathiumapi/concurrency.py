@@ -0,0 +1,364 @@
+"""Executors for running blocking handler code off the event loop.
+
+`Pathium.route()` runs plain `def` handlers on a `ThreadPool` so blocking
+client libraries do not stall every other request served by the loop. The
+pool is bounded: once `max_workers` calls are running and `queue_limit` more
+are waiting, further calls are rejected with a 503 instead of queueing
+without limit.
+
+CPU-bound routes can opt into a `ProcessPool` (`executor="process"`) to
+escape the GIL; large byte buffers travel through shared memory instead of
+being pickled through the pool's pipe.
+"""
+import asyncio
+import contextvars
+import inspect
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ._core import HTTPError, Response
+
+
+def _timed_call(
+    submitted: float,
+    ctx: contextvars.Context,
+    func: Callable[..., Any],
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+) -> Tuple[float, bool, Any]:
+    # Runs in the worker thread: report queue wait and capture the outcome so
+    # metrics are updated on the event loop thread without locks.
+    wait = time.perf_counter() - submitted
+    try:
+        return wait, True, ctx.run(func, *args, **kwargs)
+    except BaseException as exc:  # re-raised on the loop thread
+        return wait, False, exc
+
+
+class ThreadPool:
+    """Bounded thread pool for synchronous handlers.
+
+    Args:
+        max_workers: number of worker threads (default: `min(32, cpu + 4)`).
+        queue_limit: calls allowed to wait for a free worker before new calls
+            are rejected with `HTTPError(503)`.
+        name: thread name prefix.
+
+    The caller's `contextvars` are copied into the worker thread. Queue wait
+    time (submit -> start) is tracked and reported by `stats()`.
+
+    Example:
+
+        app = Pathium(thread_pool=ThreadPool(max_workers=8, queue_limit=64))
+
+        @app.get("/report", executor=ThreadPool(max_workers=2))
+        def report(req):
+            return legacy_client.fetch()
+    """
+    def __init__(self, max_workers: Optional[int] = None, queue_limit: int = 100, name: str = "pathium"):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.queue_limit = queue_limit
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # submitted calls that have not finished yet (running + queued)
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run `func(*args, **kwargs)` on the pool and return its result."""
+        if self.pending >= self.max_workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPError(503, "Server busy")
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        fut = self.executor.submit(_timed_call, time.perf_counter(), ctx, func, args, kwargs)
+        self.pending += 1
+        self.submitted += 1
+        # decrement when the thread finishes, even if the awaiting request
+        # was cancelled, so the bound reflects threads actually in use
+        def done(_: Any) -> None:
+            try:
+                loop.call_soon_threadsafe(self._finished)
+            except RuntimeError:  # loop already closed
+                pass
+
+        fut.add_done_callback(done)
+        wait, ok, value = await asyncio.wrap_future(fut)
+        self.wait_count += 1
+        self.wait_total += wait
+        if wait > self.wait_max:
+            self.wait_max = wait
+        if not ok:
+            raise value
+        return value
+
+    def _finished(self) -> None:
+        self.pending -= 1
+        self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool utilisation and queue-wait metrics."""
+        return {
+            "max_workers": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.max_workers),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_avg_seconds": self.wait_total / (self.wait_count or 1),
+            "wait_max_seconds": self.wait_max,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads; a later `run()` starts a fresh executor."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+class _SharedBuffer:
+    """Picklable reference to bytes placed in a shared memory block."""
+    __slots__ = ("name", "size")
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+    def __getstate__(self) -> Tuple[str, int]:
+        return self.name, self.size
+
+    def __setstate__(self, state: Tuple[str, int]) -> None:
+        self.name, self.size = state
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Only the creating side should track the block; before Python 3.13
+    # attaching registers it with the resource tracker as well.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+        return shm
+
+
+def _to_shared(data: bytes, blocks: List[shared_memory.SharedMemory]) -> _SharedBuffer:
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    shm.buf[:len(data)] = data
+    blocks.append(shm)
+    return _SharedBuffer(shm.name, len(data))
+
+
+def _from_shared(ref: _SharedBuffer, unlink: bool = False) -> bytes:
+    # the side that unlinks takes over tracking of the block
+    shm = shared_memory.SharedMemory(name=ref.name) if unlink else _attach(ref.name)
+    try:
+        return bytes(shm.buf[:ref.size])
+    finally:
+        shm.close()
+        if unlink:
+            shm.unlink()
+
+
+def _export(value: Any, threshold: int, blocks: List[shared_memory.SharedMemory]) -> Any:
+    """Replace large bytes (or a large `Response` body) with shared buffers."""
+    if isinstance(value, (bytes, bytearray)) and len(value) >= threshold:
+        return _to_shared(value, blocks)
+    if isinstance(value, Response) and len(value.body_bytes) >= threshold:
+        value.body_bytes = _to_shared(value.body_bytes, blocks)  # type: ignore[assignment]
+    return value
+
+
+def _import(value: Any, unlink: bool = False) -> Any:
+    if isinstance(value, _SharedBuffer):
+        return _from_shared(value, unlink)
+    if isinstance(value, Response) and isinstance(value.body_bytes, _SharedBuffer):
+        value.body_bytes = _from_shared(value.body_bytes, unlink)
+    return value
+
+
+def _process_call(
+    func: Callable[..., Any],
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+    threshold: int,
+) -> Any:
+    # Runs in the worker process.
+    args = tuple(_import(a) for a in args)
+    kwargs = {k: _import(v) for k, v in kwargs.items()}
+    result = func(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = asyncio.run(_await(result))
+    blocks: List[shared_memory.SharedMemory] = []
+    result = _export(result, threshold, blocks)
+    for shm in blocks:
+        # ownership passes to the parent, which unlinks after reading
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+        shm.close()
+    return result
+
+
+def _release(blocks: List[shared_memory.SharedMemory]) -> None:
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+    blocks.clear()
+
+
+def _discard_result(fut: Any) -> None:
+    try:
+        _import(fut.result(), unlink=True)
+    except Exception:
+        pass
+
+
+async def _await(awaitable: Any) -> Any:
+    return await awaitable
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+class ProcessPool:
+    """Warm process pool for CPU-bound handlers.
+
+    Args:
+        max_workers: number of worker processes (default: CPU count).
+        queue_limit: calls allowed to wait for a free worker before new calls
+            are rejected with `HTTPError(503)`.
+        timeout: seconds to wait for a result before answering 504. The
+            worker finishes the abandoned task in the background, and the
+            task counts towards `max_workers + queue_limit` until it does.
+        shm_threshold: `bytes` arguments and results (including `Response`
+            bodies) at least this large are passed through shared memory
+            instead of being pickled.
+        mp_context: multiprocessing start method (`"fork"`, `"spawn"`, ...).
+
+    Handlers must be importable module-level functions, receive only
+    picklable injected values (not the `Request`) and may be `def` or
+    `async def`.
+
+    Example:
+
+        @app.post("/render", executor="process")
+        def render(spec: ReportSpec):
+            return Response(build_pdf(spec), media_type="application/pdf")
+    """
+    accepts_request = False
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        queue_limit: int = 100,
+        timeout: Optional[float] = None,
+        shm_threshold: int = 1 << 20,
+        mp_context: Optional[str] = None,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.shm_threshold = shm_threshold
+        self.mp_context = mp_context
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            ctx = multiprocessing.get_context(self.mp_context) if self.mp_context else None
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=ctx)
+        return self._executor
+
+    def warm(self) -> None:
+        """Start all worker processes now instead of on the first request."""
+        futures = [self.executor.submit(_noop) for _ in range(self.max_workers)]
+        for f in futures:
+            f.result()
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run `func(*args, **kwargs)` in a worker process and return its result."""
+        if self.pending >= self.max_workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPError(503, "Server busy")
+        blocks: List[shared_memory.SharedMemory] = []
+        try:
+            args = tuple(_export(a, self.shm_threshold, blocks) for a in args)
+            kwargs = {k: _export(v, self.shm_threshold, blocks) for k, v in kwargs.items()}
+            fut = self.executor.submit(_process_call, func, args, kwargs, self.shm_threshold)
+        except BaseException:
+            _release(blocks)
+            raise
+        self.pending += 1
+        self.submitted += 1
+        loop = asyncio.get_running_loop()
+
+        # an abandoned (timed out, cancelled) call keeps its worker busy, so
+        # the slot and the argument blocks are only released once the worker
+        # is done with them
+        def done(_: Any) -> None:
+            try:
+                loop.call_soon_threadsafe(self._finished, blocks)
+            except RuntimeError:  # loop already closed
+                _release(blocks)
+
+        fut.add_done_callback(done)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(fut), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            # release shared memory the abandoned task may still return
+            fut.add_done_callback(_discard_result)
+            raise HTTPError(504, "Handler timed out") from None
+        except asyncio.CancelledError:
+            # request timeout or disconnect: same clean-up as above
+            fut.add_done_callback(_discard_result)
+            raise
+        return _import(result, unlink=True)
+
+    def _finished(self, blocks: List[shared_memory.SharedMemory]) -> None:
+        self.pending -= 1
+        self.completed += 1
+        _release(blocks)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool utilisation metrics."""
+        return {
+            "max_workers": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes; a later `run()` starts a fresh pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,104 @@
+"""Request deadlines shared with outbound calls.
+
+While a handler runs under a timeout (`Pathium(timeout=...)`,
+`@app.get(..., timeout=...)`) or an incoming deadline header, the absolute
+deadline is stored in a contextvar. Code called from the handler can check
+how much time is left and forward the budget to downstream services:
+
+    from pathiumapi.deadlines import deadline_headers, time_remaining
+
+    @app.get("/profile")
+    async def profile(req):
+        async with httpx.AsyncClient() as client:
+            r = await client.get(USERS_URL, headers=deadline_headers(),
+                                 timeout=time_remaining())
+        ...
+
+Incoming deadlines are read from `X-Request-Deadline` (absolute Unix time in
+seconds) and `grpc-timeout` (relative, e.g. `250m`); the earliest wins.
+Malformed or non-finite values are ignored.
+Deadlines are kept as `time.monotonic()` values. Background tasks run
+after the deadline is cleared: they are not bound by the request's budget.
+"""
+import contextvars
+import math
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+DEADLINE_HEADER = "x-request-deadline"
+GRPC_TIMEOUT_HEADER = "grpc-timeout"
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("pathium_deadline", default=None)
+
+_GRPC_UNITS = {"H": 3600.0, "M": 60.0, "S": 1.0, "m": 1e-3, "u": 1e-6, "n": 1e-9}
+
+
+def get_deadline() -> Optional[float]:
+    """Return the current request's deadline (`time.monotonic()` based) or None."""
+    return _deadline.get()
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the current deadline (never negative), or None."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def set_deadline(deadline: Optional[float]) -> contextvars.Token:
+    """Set the deadline for the current context; reset with the returned token."""
+    return _deadline.set(deadline)
+
+
+def reset_deadline(token: contextvars.Token) -> None:
+    _deadline.reset(token)
+
+
+def parse_grpc_timeout(value: str) -> Optional[float]:
+    """Parse a `grpc-timeout` value (`<digits><H|M|S|m|u|n>`) into seconds."""
+    value = value.strip()
+    unit = _GRPC_UNITS.get(value[-1:])
+    digits = value[:-1]
+    if unit is None or not digits.isdigit() or len(digits) > 8:
+        return None
+    return int(digits) * unit
+
+
+def deadline_from_headers(headers: Iterable[Tuple[bytes, bytes]]) -> Optional[float]:
+    """Return the earliest deadline announced by raw ASGI `headers`, or None."""
+    deadline: Optional[float] = None
+    for name, value in headers:
+        if name == b"x-request-deadline":
+            try:
+                seconds = float(value)
+            except ValueError:
+                continue
+            if not math.isfinite(seconds):  # `nan`, `inf`, `1e400`: as malformed
+                continue
+            candidate = time.monotonic() + seconds - time.time()
+        elif name == b"grpc-timeout":
+            seconds = parse_grpc_timeout(value.decode("latin-1"))
+            if seconds is None:
+                continue
+            candidate = time.monotonic() + seconds
+        else:
+            continue
+        if deadline is None or candidate < deadline:
+            deadline = candidate
+    return deadline
+
+
+def deadline_headers() -> Dict[str, str]:
+    """Headers propagating the current deadline to a downstream service.
+
+    Returns an empty dict when no deadline is set.
+    """
+    remaining = time_remaining()
+    if remaining is None:
+        return {}
+    millis = max(0, int(remaining * 1000))
+    return {
+        DEADLINE_HEADER: f"{time.time() + remaining:.3f}",
+        GRPC_TIMEOUT_HEADER: f"{millis}m",
+    }
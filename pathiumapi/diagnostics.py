@@ -0,0 +1,230 @@
+"""Event loop lag and blocking-call detection.
+
+Every `Pathium` handler shares one event loop, so a single handler that
+blocks (a sync driver call, a big `json.dumps`, CPU work in an `async def`)
+stalls every request in the process. `add_loop_monitor(app)` finds them:
+
+- a probe task sleeps `interval` seconds in a loop and records how late it
+  wakes up in a lag histogram
+- a watchdog thread notices when the probe is overdue by `threshold`
+  seconds, grabs the loop thread's stack while it is still blocked and
+  looks up the request whose task is running
+- once the loop recovers the block is reported to `on_block(event)` (by
+  default a log warning) and kept in `LoopMonitor.blocks`
+
+Pass `metrics=` (from `add_metrics`) to export the histogram and a
+per-route block counter on `/metrics`.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from ._core import Pathium, Receive, Scope, Send
+from .metrics import Histogram, Metrics, _label, histogram_lines
+
+logger = logging.getLogger("pathiumapi.diagnostics")
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class BlockedLoop:
+    """One stretch of time during which the event loop was blocked.
+
+    `route` / `method` / `path` identify the request running when the
+    watchdog fired (None if the block came from elsewhere or was too short
+    to catch mid-flight); `stack` is the loop thread's formatted stack at
+    that moment.
+    """
+    __slots__ = ("started", "duration", "method", "path", "route", "stack")
+
+    def __init__(self, started: float):
+        self.started = started
+        self.duration = 0.0
+        self.method: Optional[str] = None
+        self.path: Optional[str] = None
+        self.route: Optional[str] = None
+        self.stack: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def log_block(event: BlockedLoop) -> None:
+    where = f"{event.method} {event.route or event.path}" if event.path else "outside any request"
+    logger.warning(
+        "Event loop blocked for %.0f ms %s%s",
+        event.duration * 1000,
+        where,
+        f"\n{event.stack}" if event.stack else "",
+    )
+
+
+class LoopMonitor:
+    """Measures event loop lag and catches blocking calls.
+
+    Args:
+        interval: seconds between probes.
+        threshold: lag (seconds) reported as a block.
+        on_block: called with each `BlockedLoop` on the loop thread once it
+            recovers; defaults to logging a warning.
+        max_blocks: recent blocks kept in `blocks`.
+        buckets: lag histogram bucket bounds in seconds.
+    """
+    def __init__(
+        self,
+        interval: float = 0.05,
+        threshold: float = 0.1,
+        on_block: Optional[Callable[[BlockedLoop], None]] = None,
+        max_blocks: int = 50,
+        buckets: Any = LAG_BUCKETS,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.on_block = on_block or log_block
+        self.histogram = Histogram(buckets)
+        self.max_lag = 0.0
+        self.blocks: Deque[BlockedLoop] = deque(maxlen=max_blocks)
+        self.block_counts: Counter = Counter()
+        # scope of the request each running task is serving
+        self.requests: Dict["asyncio.Task[Any]", Scope] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._beat = 0.0
+        # block caught by the watchdog, waiting for the loop to recover
+        self._caught: Optional[BlockedLoop] = None
+        self._caught_beat = 0.0
+        self._probe_task: Optional["asyncio.Task[None]"] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._thread_id = 0
+
+    def start(self) -> None:
+        """Start the probe and the watchdog (call from the running loop)."""
+        if self._probe_task is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._probe_task = self.loop.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="pathium-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _probe(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - self._beat - self.interval)
+            self._beat = now
+            self.histogram.observe(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            event, self._caught = self._caught, None
+            if event is None and lag >= self.threshold:
+                event = BlockedLoop(time.time() - lag)
+            if event is not None:
+                event.duration = lag
+                self.blocks.append(event)
+                self.block_counts[event.route or ""] += 1
+                try:
+                    self.on_block(event)
+                except Exception:
+                    logger.exception("on_block hook failed")
+
+    def _watch(self) -> None:
+        check = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(check):
+            beat = self._beat
+            overdue = time.monotonic() - beat - self.interval
+            if overdue < self.threshold or self._caught_beat == beat:
+                continue
+            self._caught_beat = beat
+            self._caught = self._capture(time.time() - overdue)
+
+    def _capture(self, started: float) -> BlockedLoop:
+        event = BlockedLoop(started)
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is not None:
+            event.stack = "".join(traceback.format_stack(frame))
+        task = asyncio.current_task(self.loop) if self.loop is not None else None
+        scope = self.requests.get(task) if task is not None else None  # type: ignore[arg-type]
+        if scope is not None:
+            route = scope.get("route")
+            event.method = scope.get("method")
+            event.path = scope.get("path")
+            event.route = route.path if route is not None else None
+        return event
+
+    def middleware(self, app: Callable[[Scope, Receive, Send], Any]) -> Callable[[Scope, Receive, Send], Any]:
+        requests = self.requests
+
+        async def inner(scope: Scope, receive: Receive, send: Send) -> None:
+            task = asyncio.current_task()
+            if task is None or task in requests:
+                await app(scope, receive, send)
+                return
+            requests[task] = scope
+            try:
+                await app(scope, receive, send)
+            finally:
+                del requests[task]
+
+        return inner
+
+    def stats(self) -> Dict[str, Any]:
+        h = self.histogram
+        return {
+            "probes": h.count,
+            "lag_p50": h.quantile(0.5),
+            "lag_p99": h.quantile(0.99),
+            "lag_max": self.max_lag,
+            "blocks": sum(self.block_counts.values()),
+            "recent": [event.as_dict() for event in self.blocks],
+        }
+
+    def collect(self, prefix: str = "pathium") -> List[str]:
+        """Prometheus exposition lines (see `Metrics.register`)."""
+        lines = [
+            f"# HELP {prefix}_event_loop_lag_seconds Event loop probe lag.",
+            f"# TYPE {prefix}_event_loop_lag_seconds histogram",
+        ]
+        lines += histogram_lines(f"{prefix}_event_loop_lag_seconds", "", self.histogram)
+        lines += [
+            f"# HELP {prefix}_event_loop_blocks_total Event loop blocks by the route running at the time.",
+            f"# TYPE {prefix}_event_loop_blocks_total counter",
+        ]
+        for route, count in sorted(self.block_counts.items()):
+            lines.append(f'{prefix}_event_loop_blocks_total{{route="{_label(route)}"}} {count}')
+        return lines
+
+
+def add_loop_monitor(app: Pathium, metrics: Optional[Metrics] = None, **options: Any) -> LoopMonitor:
+    """Monitor `app`'s event loop while it runs; options go to `LoopMonitor`.
+
+    The monitor starts and stops with the app's lifespan. With `metrics`
+    its figures are added to that registry's `/metrics` output.
+    """
+    monitor = LoopMonitor(**options)
+    app.use(monitor.middleware)
+    app.on_startup(monitor.start)
+    app.on_shutdown(monitor.stop)
+    if metrics is not None:
+        metrics.register(lambda: monitor.collect(metrics.prefix))
+    return monitor
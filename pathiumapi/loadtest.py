@@ -0,0 +1,243 @@
+"""Load generator (`pathiumapi loadtest`).
+
+Sends `requests` requests, `concurrency` at a time, and reports throughput,
+latency percentiles and status counts:
+
+    pathiumapi loadtest app.py --path /items/1 -n 10000 -c 50
+    pathiumapi loadtest http://127.0.0.1:8000/items/1 -n 10000 -c 50
+
+An app (a path as accepted by `pathiumapi run`, or an ASGI callable passed
+to `run_loadtest`) is driven in-process through `AsyncClient`, with its
+lifespan events, so there is no network or HTTP parsing involved. The
+numbers measure handler and middleware cost on one event loop;
+concurrency only overlaps time that handlers spend awaiting. A URL is
+loaded over keep-alive HTTP/1.1 connections, one per concurrent slot.
+"""
+import asyncio
+import json
+import ssl
+import sys
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from .bench import _percentile
+from .testing import AsyncClient
+
+Target = Union[str, Callable[..., Any]]
+
+
+async def _in_process(
+    app: Callable[..., Any],
+    method: str,
+    path: str,
+    headers: Mapping[str, str],
+    body: bytes,
+    requests: int,
+    concurrency: int,
+) -> Tuple[List[float], Counter, int, float]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+    remaining = requests
+    clock = time.perf_counter
+
+    async with AsyncClient(app, raise_server_exceptions=False) as client:
+        async def worker() -> None:
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = clock()
+                try:
+                    response = await client.request(method, path, headers=headers, content=body)
+                except Exception:
+                    errors += 1
+                    continue
+                latencies.append(clock() - start)
+                statuses[response.status_code] += 1
+
+        start = clock()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = clock() - start
+    return latencies, statuses, errors, elapsed
+
+
+async def _read_response(reader: asyncio.StreamReader, head_only: bool) -> Tuple[int, bool]:
+    """Read one response; returns its status and whether the server closes."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head[:-4].split(b"\r\n")
+    status = int(lines[0].split()[1])
+    length: Optional[int] = None
+    chunked = close = False
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"transfer-encoding":
+            chunked = b"chunked" in value
+        elif name == b"connection":
+            close = value == b"close"
+    if head_only or status in (204, 304) or status < 200:
+        return status, close
+    if chunked:
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length is not None:
+        await reader.readexactly(length)
+    else:
+        await reader.read()
+        close = True
+    return status, close
+
+
+async def _over_http(
+    url: str,
+    method: str,
+    headers: Mapping[str, str],
+    body: bytes,
+    requests: int,
+    concurrency: int,
+) -> Tuple[List[float], Counter, int, float]:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"not an http(s) URL: {url}")
+    tls = ssl.create_default_context() if parts.scheme == "https" else None
+    port = parts.port or (443 if tls else 80)
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    lines = [f"{method} {target} HTTP/1.1", f"host: {parts.netloc}"]
+    lines += [f"{k}: {v}" for k, v in headers.items()]
+    if body or method in ("POST", "PUT", "PATCH"):
+        lines.append(f"content-length: {len(body)}")
+    request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+    remaining = requests
+    clock = time.perf_counter
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        writer: Optional[asyncio.StreamWriter] = None
+        try:
+            while remaining > 0:
+                remaining -= 1
+                start = clock()
+                try:
+                    if writer is None:
+                        reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=tls)
+                    writer.write(request)
+                    status, close = await _read_response(reader, method == "HEAD")
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    close = True
+                else:
+                    latencies.append(clock() - start)
+                    statuses[status] += 1
+                if close and writer is not None:
+                    writer.close()
+                    writer = None
+        finally:
+            if writer is not None:
+                writer.close()
+
+    start = clock()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, errors, clock() - start
+
+
+def run_loadtest(
+    target: Target,
+    path: str = "/",
+    requests: int = 1000,
+    concurrency: int = 10,
+    method: str = "GET",
+    headers: Optional[Mapping[str, str]] = None,
+    body: bytes = b"",
+) -> Dict[str, Any]:
+    """Load `target` (an ASGI app, or an http(s) URL) and return the report.
+
+    `path` is requested on an app; a URL carries its own path. Latencies in
+    the report are in milliseconds; requests that raised or could not
+    connect count as `errors` and are left out of the latencies.
+    """
+    method = method.upper()
+    headers = dict(headers or {})
+    concurrency = max(1, min(concurrency, requests))
+    if isinstance(target, str):
+        coro = _over_http(target, method, headers, body, requests, concurrency)
+        name = target
+    else:
+        coro = _in_process(target, method, path, headers, body, requests, concurrency)
+        name = f"app:{path}"
+    latencies, statuses, errors, elapsed = asyncio.run(coro)
+    ms = sorted(s * 1000 for s in latencies) or [0.0]
+    return {
+        "target": name,
+        "method": method,
+        "requests": len(latencies) + errors,
+        "concurrency": concurrency,
+        "errors": errors,
+        "duration": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "status": {str(code): count for code, count in sorted(statuses.items())},
+        "latency_ms": {
+            "min": ms[0],
+            "mean": sum(ms) / len(ms),
+            "p50": _percentile(ms, 0.50),
+            "p90": _percentile(ms, 0.90),
+            "p99": _percentile(ms, 0.99),
+            "max": ms[-1],
+        },
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    latency = report["latency_ms"]
+    status = ", ".join(f"{code}: {count}" for code, count in report["status"].items()) or "-"
+    return "\n".join([
+        f"{report['method']} {report['target']}",
+        f"  requests    {report['requests']} ({report['concurrency']} concurrent), {report['errors']} errors",
+        f"  duration    {report['duration']:.2f} s",
+        f"  throughput  {report['throughput']:,.0f} req/s",
+        f"  latency ms  min {latency['min']:.2f}  p50 {latency['p50']:.2f}  p90 {latency['p90']:.2f}"
+        f"  p99 {latency['p99']:.2f}  max {latency['max']:.2f}",
+        f"  status      {status}",
+    ])
+
+
+def main(
+    target: str = ".",
+    path: str = "/",
+    requests: int = 1000,
+    concurrency: int = 10,
+    method: str = "GET",
+    headers: Optional[List[str]] = None,
+    body: Optional[str] = None,
+    as_json: bool = False,
+) -> int:
+    """Run a load test for the CLI; returns 1 on errors or 5xx responses."""
+    parsed = {}
+    for header in headers or []:
+        name, sep, value = header.partition(":")
+        if not sep:
+            print(f"invalid header {header!r}, expected 'name: value'", file=sys.stderr)
+            return 2
+        parsed[name.strip()] = value.strip()
+    app: Target = target
+    if not target.startswith(("http://", "https://")):
+        from .cli import load_app
+
+        app = load_app(target)
+        if app is None:
+            print(f"No app found at {target}", file=sys.stderr)
+            return 2
+    report = run_loadtest(app, path, requests, concurrency, method, parsed, (body or "").encode())
+    print(json.dumps(report, indent=2) if as_json else format_report(report))
+    failed = report["errors"] or any(code.startswith("5") for code in report["status"])
+    return 1 if failed else 0
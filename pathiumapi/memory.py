@@ -0,0 +1,282 @@
+"""Per-route memory accounting with `tracemalloc`.
+
+`add_memory_profiler(app, secret=...)` adds a middleware and admin routes.
+The middleware does nothing until tracing is started, at runtime or with
+`start=True`:
+
+    POST /_memory/start?frames=1&duration=600   start tracing (for 10 minutes)
+    POST /_memory/stop                          stop tracing
+    GET  /_memory                               per-route allocation table
+    POST /_memory/snapshots                     take a snapshot, returns its id
+    GET  /_memory/snapshots/{id}/top            top allocation sites
+    GET  /_memory/snapshots/{id}/diff/{other}   growth from snapshot id to other
+
+Every admin route requires `X-Memory-Profile: <secret>`. Without a
+`secret` the routes are not mounted, since starting tracing slows the whole
+process; call `profiler.start()` and `profiler.report()` in process instead.
+
+While tracing, each request is tagged with its matched route, and the bytes
+still allocated when it finishes (`net`) are added to that route. A route
+whose net total keeps growing is what retains memory. Requests running
+concurrently share one heap, so a single request's figure also includes
+its neighbours' allocations. The noise averages out over many requests,
+while a leak adds up. `peak` (the highest traced memory above the
+request's starting point) is only recorded for requests that ran alone.
+
+`tracemalloc` slows allocation-heavy code noticeably and stores a traceback
+per allocated block; trace a single worker or a canary, for a window.
+"""
+import asyncio
+import hmac
+import itertools
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ._core import HTTPError, Pathium, Receive, Request, Response, Scope, Send
+from .metrics import UNMATCHED
+
+MAX_FRAMES = 64
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class RouteMemory:
+    """Allocation totals for one route while tracing."""
+    __slots__ = ("requests", "net", "max_net", "peak", "solo")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.net = 0
+        self.max_net = 0
+        self.peak = 0
+        self.solo = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "net_bytes": self.net,
+            "avg_net_bytes": self.net // self.requests if self.requests else 0,
+            "max_net_bytes": self.max_net,
+            "peak_bytes": self.peak,
+            "solo_requests": self.solo,
+        }
+
+
+def _site(stat: Any) -> Dict[str, Any]:
+    frame = stat.traceback[0]
+    return {
+        "file": frame.filename,
+        "line": frame.lineno,
+        "size": stat.size,
+        "count": stat.count,
+        "traceback": [f"{f.filename}:{f.lineno}" for f in stat.traceback],
+    }
+
+
+def _diff_site(stat: Any) -> Dict[str, Any]:
+    site = _site(stat)
+    site["size_diff"] = stat.size_diff
+    site["count_diff"] = stat.count_diff
+    return site
+
+
+class MemoryProfiler:
+    """Attributes traced allocations to routes and keeps snapshots.
+
+    Args:
+        max_snapshots: snapshots kept for diffing (oldest dropped first).
+    """
+    def __init__(self, max_snapshots: int = 5):
+        self.routes: Dict[Tuple[str, str], RouteMemory] = {}
+        self.snapshots: "OrderedDict[int, tracemalloc.Snapshot]" = OrderedDict()
+        self.max_snapshots = max_snapshots
+        self.started: Optional[float] = None
+        self.active = 0
+        self._ids = itertools.count(1)
+        self._stop_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1, duration: Optional[float] = None) -> None:
+        """Start tracing with `frames` per traceback, optionally for `duration` seconds.
+
+        Resets the per-route table. `duration` needs a running event loop.
+        """
+        if self._stop_handle is not None:
+            self._stop_handle.cancel()
+            self._stop_handle = None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.routes = {}
+        self.started = time.time()
+        if duration is not None:
+            self._stop_handle = asyncio.get_running_loop().call_later(duration, self.stop)
+
+    def stop(self) -> None:
+        """Stop tracing; the per-route table and snapshots are kept."""
+        if self._stop_handle is not None:
+            self._stop_handle.cancel()
+            self._stop_handle = None
+        tracemalloc.stop()
+
+    def snapshot(self) -> int:
+        """Take a snapshot and return its id."""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing")
+        snap = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        snap_id = next(self._ids)
+        self.snapshots[snap_id] = snap
+        while len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+        return snap_id
+
+    def top(self, snap_id: int, limit: int = 20, group: str = "lineno") -> List[Dict[str, Any]]:
+        """Largest allocation sites in snapshot `snap_id`."""
+        return [_site(s) for s in self.snapshots[snap_id].statistics(group)[:limit]]
+
+    def diff(self, old_id: int, new_id: int, limit: int = 20, group: str = "lineno") -> List[Dict[str, Any]]:
+        """Allocation sites that grew the most from `old_id` to `new_id`."""
+        stats = self.snapshots[new_id].compare_to(self.snapshots[old_id], group)
+        return [_diff_site(s) for s in stats[:limit]]
+
+    def report(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        rows = sorted(self.routes.items(), key=lambda item: item[1].net, reverse=True)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "started": self.started,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "routes": [dict(method=method, route=route, **m.as_dict()) for (method, route), m in rows],
+        }
+
+    def middleware(self, app: Callable[[Scope, Receive, Send], Any]) -> Callable[[Scope, Receive, Send], Any]:
+        async def inner(scope: Scope, receive: Receive, send: Send) -> None:
+            if scope.get("type") != "http" or not tracemalloc.is_tracing():
+                await app(scope, receive, send)
+                return
+            solo = self.active == 0
+            if solo:
+                tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            self.active += 1
+            try:
+                await app(scope, receive, send)
+            finally:
+                self.active -= 1
+                if tracemalloc.is_tracing():
+                    current, peak = tracemalloc.get_traced_memory()
+                    self._record(scope, current - before, peak - before if solo and self.active == 0 else None)
+
+        return inner
+
+    def _record(self, scope: Scope, net: int, peak: Optional[int]) -> None:
+        route = scope.get("route")
+        key = (scope.get("method", ""), route.path if route is not None else UNMATCHED)
+        m = self.routes.get(key)
+        if m is None:
+            m = self.routes[key] = RouteMemory()
+        m.requests += 1
+        m.net += net
+        if net > m.max_net:
+            m.max_net = net
+        if peak is not None:
+            m.solo += 1
+            if peak > m.peak:
+                m.peak = peak
+
+
+def add_memory_profiler(
+    app: Pathium,
+    path: Optional[str] = "/_memory",
+    start: bool = False,
+    frames: int = 1,
+    secret: Optional[str] = None,
+    header: str = "x-memory-profile",
+    **options: Any,
+) -> MemoryProfiler:
+    """Install a `MemoryProfiler` on `app` with admin routes under `path`.
+
+    `start=True` traces from app startup with `frames` frames per
+    traceback. The routes are only mounted with a `secret`, and answer 403
+    unless the request's `header` carries it. Other keyword arguments go to
+    `MemoryProfiler`.
+    """
+    profiler = MemoryProfiler(**options)
+    app.use(profiler.middleware)
+    if start:
+        app.on_startup(lambda: profiler.start(frames))
+    app.on_shutdown(lambda: profiler.stop() if profiler.tracing else None)
+    if path is None or secret is None:
+        return profiler
+
+    token = secret.encode()
+    name = header.lower().encode()
+
+    def check(req: Request) -> None:
+        for key, value in req.scope.get("headers", ()):
+            if key == name and hmac.compare_digest(value, token):
+                return
+        raise HTTPError(403, "Forbidden")
+
+    def snapshot_or_404(snap_id: int) -> int:
+        if snap_id not in profiler.snapshots:
+            raise HTTPError(404, "Snapshot not found")
+        return snap_id
+
+    async def _report(req: Request):
+        check(req)
+        return Response.json(profiler.report())
+
+    async def _start(req: Request, frames: int = 1, duration: Optional[float] = None):
+        check(req)
+        if not 1 <= frames <= MAX_FRAMES:
+            raise HTTPError(400, f"frames must be between 1 and {MAX_FRAMES}")
+        if duration is not None and duration <= 0:
+            raise HTTPError(400, "duration must be positive")
+        profiler.start(frames, duration)
+        return Response.json(profiler.report())
+
+    async def _stop(req: Request):
+        check(req)
+        if profiler.tracing:
+            profiler.stop()
+        return Response.json(profiler.report())
+
+    async def _snapshot(req: Request):
+        check(req)
+        if not profiler.tracing:
+            raise HTTPError(409, "tracemalloc is not tracing")
+        snap_id = await asyncio.to_thread(profiler.snapshot)
+        return Response.json({"id": snap_id, "snapshots": list(profiler.snapshots)})
+
+    async def _top(req: Request, id: int, limit: int = 20, group: str = "lineno"):
+        check(req)
+        if group not in ("lineno", "filename", "traceback"):
+            raise HTTPError(400, "group must be lineno, filename or traceback")
+        return Response.json(await asyncio.to_thread(profiler.top, snapshot_or_404(id), limit, group))
+
+    async def _diff(req: Request, id: int, other: int, limit: int = 20, group: str = "lineno"):
+        check(req)
+        if group not in ("lineno", "filename", "traceback"):
+            raise HTTPError(400, "group must be lineno, filename or traceback")
+        return Response.json(await asyncio.to_thread(
+            profiler.diff, snapshot_or_404(id), snapshot_or_404(other), limit, group,
+        ))
+
+    app.get(path)(_report)
+    app.post(path + "/start")(_start)
+    app.post(path + "/stop")(_stop)
+    app.post(path + "/snapshots")(_snapshot)
+    app.get(path + "/snapshots/{id:int}/top")(_top)
+    app.get(path + "/snapshots/{id:int}/diff/{other:int}")(_diff)
+    return profiler
@@ -0,0 +1,207 @@
+"""Per-route request metrics in Prometheus text format.
+
+`add_metrics(app)` installs a middleware that records, per method and route
+template (`/items/{id:int}`, never the raw path, so label cardinality stays
+bounded):
+
+- `pathium_requests_total{method, route, status}` by status class (`2xx`)
+- `pathium_request_duration_seconds{method, route}` histogram, measured
+  until the last response body byte is handed to the server
+- `pathium_requests_in_flight` gauge
+
+and serves them at `/metrics`. The route template comes from
+`scope["route"]`, which the endpoint sets from `Router.find`, so nothing is
+matched twice. Requests that match no route are labelled `<unmatched>`, and
+methods outside the standard set are labelled `OTHER`, since both come
+straight from the client.
+
+Recording is a few integer updates on the event loop thread: no locks and
+a bisect over a fixed bucket list.
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ._core import Pathium, Receive, Request, Response, Scope, Send
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+UNMATCHED = "<unmatched>"
+_STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (per-bucket counts, cumulated on export)."""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # one slot per bucket plus the +Inf overflow
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        out, total = [], 0
+        for c in self.counts:
+            total += c
+            out.append(total)
+        return out
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket containing quantile `q` (0..1)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, cum in zip(self.buckets, self.cumulative()):
+            if cum >= rank:
+                return bound
+        return float("inf")
+
+
+class _RouteMetrics:
+    __slots__ = ("histogram", "statuses")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.histogram = Histogram(buckets)
+        self.statuses = [0, 0, 0, 0, 0]
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _num(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+def histogram_lines(name: str, labels: str, h: Histogram) -> List[str]:
+    """Prometheus sample lines for histogram `h` (`labels` without braces)."""
+    sep = "," if labels else ""
+    lines = [
+        f'{name}_bucket{{{labels}{sep}le="{_num(bound)}"}} {cum}'
+        for bound, cum in zip(h.buckets + (float("inf"),), h.cumulative())
+    ]
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {h.sum!r}")
+    lines.append(f"{name}_count{suffix} {h.count}")
+    return lines
+
+
+class Metrics:
+    """Request metrics registry and its ASGI middleware.
+
+    Use `add_metrics(app)`, or `app.use(metrics.middleware)` plus your own
+    route returning `metrics.render()`.
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix: str = "pathium"):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.routes: Dict[Tuple[str, str], _RouteMetrics] = {}
+        self.in_flight = 0
+        # extra `() -> List[str]` sources of exposition lines, see `register()`
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, collector: Callable[[], List[str]]) -> None:
+        """Append `collector()`'s lines to every `render()`."""
+        self.collectors.append(collector)
+
+    def _record(self, scope: Scope, status: int, duration: float) -> None:
+        route = scope.get("route")
+        method = scope.get("method", "")
+        if method not in _METHODS:
+            method = "OTHER"
+        key = (method, route.path if route is not None else UNMATCHED)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = _RouteMetrics(self.buckets)
+        metrics.histogram.observe(duration)
+        index = status // 100 - 1
+        if 0 <= index < 5:
+            metrics.statuses[index] += 1
+
+    def middleware(self, app: Callable[[Scope, Receive, Send], Any]) -> Callable[[Scope, Receive, Send], Any]:
+        async def inner(scope: Scope, receive: Receive, send: Send) -> None:
+            if scope.get("type") != "http":
+                await app(scope, receive, send)
+                return
+
+            status = 500
+            start = time.perf_counter()
+            recorded = False
+
+            def send_wrapper(msg: Dict[str, Any]):
+                nonlocal status, recorded
+                kind = msg["type"]
+                if kind == "http.response.start":
+                    status = msg["status"]
+                elif kind == "http.response.body" and not msg.get("more_body") and not recorded:
+                    recorded = True
+                    self._record(scope, status, time.perf_counter() - start)
+                return send(msg)
+
+            self.in_flight += 1
+            try:
+                await app(scope, receive, send_wrapper)
+            finally:
+                self.in_flight -= 1
+                if not recorded:
+                    self._record(scope, status, time.perf_counter() - start)
+
+        return inner
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_requests_total Total HTTP requests by route and status class.",
+            f"# TYPE {p}_requests_total counter",
+        ]
+        items = sorted(self.routes.items())
+        for (method, route), m in items:
+            labels = f'method="{_label(method)}",route="{_label(route)}"'
+            for cls, count in zip(_STATUS_CLASSES, m.statuses):
+                if count:
+                    lines.append(f'{p}_requests_total{{{labels},status="{cls}"}} {count}')
+        lines += [
+            f"# HELP {p}_request_duration_seconds HTTP request latency by route.",
+            f"# TYPE {p}_request_duration_seconds histogram",
+        ]
+        for (method, route), m in items:
+            labels = f'method="{_label(method)}",route="{_label(route)}"'
+            lines += histogram_lines(f"{p}_request_duration_seconds", labels, m.histogram)
+        lines += [
+            f"# HELP {p}_requests_in_flight HTTP requests currently being served.",
+            f"# TYPE {p}_requests_in_flight gauge",
+            f"{p}_requests_in_flight {self.in_flight}",
+        ]
+        for collector in self.collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+def add_metrics(
+    app: Pathium,
+    path: Optional[str] = "/metrics",
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Metrics:
+    """Record per-route metrics for `app` and serve them at `path`.
+
+    Pass `path=None` to skip the route (e.g. to expose it on a separate
+    admin app). Returns the `Metrics` registry.
+    """
+    metrics = Metrics(buckets)
+    app.use(metrics.middleware)
+    if path is not None:
+        async def _metrics_handler(req: Request):
+            return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+        app.get(path)(_metrics_handler)
+    return metrics
@@ -1,10 +1,12 @@
-"""Common middleware: CORS, security headers, and simple rate limiting.
+"""Common middleware: CORS, security headers, rate and concurrency limiting.
 
 These are lightweight, zero-dependency middleware factories suitable for
 embedding in `Pathium` apps. They are intentionally simple and designed
 for local development or as a reference implementation.
 """
-from typing import Callable, List, Optional, Dict, Any
+from collections import deque
+from typing import Callable, Deque, List, Optional, Dict, Any
+import asyncio
 import time
 
 from ._core import Middleware, Scope, Receive, Send, HTTPError
@@ -132,3 +134,234 @@ def rate_limit_middleware_factory(requests: int = 10, window_seconds: int = 60):
         return inner
 
     return middleware
+
+
+class ConcurrencyLimiter:
+    """Bounded concurrency with a bounded, time-limited wait queue.
+
+    Args:
+        limit: requests allowed to run at once.
+        queue_size: requests allowed to wait for a slot; further requests
+            are shed immediately.
+        max_wait: seconds a request may wait for a slot before it is shed.
+        adaptive: adjust `limit` automatically (see below).
+        target_delay: adaptive mode queue-wait target, in seconds.
+        interval: adaptive mode measurement interval, in seconds.
+        min_limit, max_limit: bounds for the adaptive limit (`max_limit`
+            defaults to 4x the initial limit).
+
+    In adaptive mode the queue behaves like CoDel: once it has not been
+    empty for a whole `interval` (a standing queue), waiting requests are
+    only given `target_delay` before being shed instead of `max_wait`. The
+    limit follows an AIMD rule on request latency: each interval, if the
+    average latency exceeded twice the baseline the limit shrinks by 10%,
+    otherwise it grows by one. The baseline is the lowest interval average
+    over the last `BASELINE_INTERVALS` intervals, so it follows the service
+    as it gets slower or faster instead of holding on to one early fast
+    request.
+    """
+    BASELINE_INTERVALS = 10
+
+    def __init__(
+        self,
+        limit: int = 100,
+        queue_size: int = 100,
+        max_wait: float = 1.0,
+        adaptive: bool = False,
+        target_delay: float = 0.005,
+        interval: float = 0.1,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+    ):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.adaptive = adaptive
+        self.target_delay = target_delay
+        self.interval = interval
+        self.min_limit = min_limit
+        self.max_limit = max_limit or limit * 4
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.shed = 0
+        # adaptive state
+        self._last_empty = time.monotonic()
+        self._interval_end = self._last_empty + interval
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        self._min_latency = float("inf")  # baseline in use
+        self._window_min = float("inf")  # lowest average of this window
+        self._intervals = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting if needed; returns False if the request is shed."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            self._last_empty = time.monotonic()
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.shed += 1
+            return False
+        now = time.monotonic()
+        wait = self.max_wait
+        if self.adaptive:
+            if now - self._last_empty > self.interval:
+                wait = min(wait, self.target_delay)  # standing queue: fail fast
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            async with asyncio.timeout(wait):
+                await fut
+        except BaseException as exc:
+            if fut.done() and not fut.cancelled():
+                self.release()  # granted just as the wait ended
+            else:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+            if isinstance(exc, TimeoutError):
+                self.shed += 1
+                return False
+            raise
+        self.admitted += 1
+        return True
+
+    def release(self, latency: Optional[float] = None) -> None:
+        """Return a slot; `latency` (seconds) feeds the adaptive limit."""
+        self.active -= 1
+        if self.adaptive and latency is not None:
+            self._observe(latency)
+        waiters = self._waiters
+        while waiters and self.active < self.limit:
+            fut = waiters.popleft()
+            if not fut.done():
+                self.active += 1
+                fut.set_result(None)
+        if not waiters:
+            self._last_empty = time.monotonic()
+
+    def _observe(self, latency: float) -> None:
+        self._latency_sum += latency
+        self._latency_count += 1
+        now = time.monotonic()
+        if now < self._interval_end:
+            return
+        avg = self._latency_sum / self._latency_count
+        self._min_latency = min(self._min_latency, avg)
+        self._window_min = min(self._window_min, avg)
+        if avg > 2 * self._min_latency:
+            self.limit = max(self.min_limit, int(self.limit * 0.9))
+        else:
+            self.limit = min(self.max_limit, self.limit + 1)
+        self._intervals += 1
+        if self._intervals >= self.BASELINE_INTERVALS:
+            # start the next window from this window's lowest average
+            self._min_latency = self._window_min
+            self._window_min = float("inf")
+            self._intervals = 0
+        self._interval_end = now + self.interval
+        self._latency_sum = 0.0
+        self._latency_count = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+def _as_limiter(spec: Any, defaults: Dict[str, Any]) -> ConcurrencyLimiter:
+    if isinstance(spec, ConcurrencyLimiter):
+        return spec
+    if isinstance(spec, int):
+        return ConcurrencyLimiter(spec, **defaults)
+    return ConcurrencyLimiter(**{**defaults, **spec})
+
+
+def concurrency_limit_middleware_factory(
+    max_concurrency: Optional[int] = 100,
+    queue_size: int = 100,
+    max_wait: float = 1.0,
+    groups: Optional[Dict[str, Any]] = None,
+    retry_after: int = 1,
+    adaptive: bool = False,
+    **adaptive_options: Any,
+) -> Middleware:
+    """Cap in-flight HTTP requests and shed overload with fast 503s.
+
+    - `max_concurrency`: global limit (None for only per-group limits).
+    - `queue_size` / `max_wait`: requests that may wait for a slot, and for
+      how long, before they are answered `503` with `Retry-After`.
+    - `groups`: bulkheads keyed by path prefix; each value is a limit, a
+      dict of `ConcurrencyLimiter` options or a `ConcurrencyLimiter`. The
+      longest matching prefix applies, on top of the global limit.
+    - `adaptive`: let each limiter tune its limit (see `ConcurrencyLimiter`);
+      `adaptive_options` (`target_delay`, `interval`, ...) are passed on.
+
+    The limiters are available as `middleware.limiters` (`"*"` is the global
+    one) for stats.
+
+    Example:
+        app.use(concurrency_limit_middleware_factory(
+            max_concurrency=200, groups={"/reports": 4}, adaptive=True,
+        ))
+    """
+    defaults = {"queue_size": queue_size, "max_wait": max_wait, "adaptive": adaptive, **adaptive_options}
+    limiters: Dict[str, ConcurrencyLimiter] = {}
+    if max_concurrency is not None:
+        limiters["*"] = ConcurrencyLimiter(max_concurrency, **defaults)
+    prefixes = sorted((groups or {}).items(), key=lambda item: len(item[0]), reverse=True)
+    group_limiters = [(prefix, _as_limiter(spec, defaults)) for prefix, spec in prefixes]
+    limiters.update(group_limiters)
+    global_limiter = limiters.get("*")
+    shed_headers = [
+        (b"content-type", b"application/json; charset=utf-8"),
+        (b"retry-after", str(retry_after).encode()),
+    ]
+    shed_body = b'{"detail": "Server overloaded"}'
+
+    def middleware(app: Callable[[Scope, Receive, Send], Any]):
+        async def inner(scope: Scope, receive: Receive, send: Send) -> None:
+            if scope.get("type") != "http":
+                await app(scope, receive, send)
+                return
+
+            path = scope.get("path", "")
+            held: List[ConcurrencyLimiter] = []
+            for prefix, limiter in group_limiters:
+                if path.startswith(prefix):
+                    held.append(limiter)
+                    break
+            if global_limiter is not None:
+                held.append(global_limiter)
+
+            acquired: List[ConcurrencyLimiter] = []
+            try:
+                for limiter in held:
+                    if not await limiter.acquire():
+                        await send({"type": "http.response.start", "status": 503, "headers": shed_headers})
+                        await send({"type": "http.response.body", "body": shed_body})
+                        return
+                    acquired.append(limiter)
+                start = time.monotonic()
+                await app(scope, receive, send)
+            finally:
+                if acquired:
+                    latency = time.monotonic() - start if len(acquired) == len(held) else None
+                    for limiter in reversed(acquired):
+                        limiter.release(latency)
+
+        return inner
+
+    middleware.limiters = limiters  # type: ignore[attr-defined]
+    return middleware
@@ -3,7 +3,8 @@
 This module detects Pydantic model types referenced in handler annotations
 or via the `validate_body` helper and returns JSON Schema components.
 """
-from typing import Any, Dict, Type
+import collections.abc
+from typing import Any, Dict, List, Optional, Type, get_args, get_origin
 
 try:
     from pydantic import BaseModel
@@ -11,10 +12,47 @@ except Exception:  # pragma: no cover - optional dependency
     BaseModel = None  # type: ignore
 
 
+_SEQUENCE_ORIGINS = (list, tuple, collections.abc.Sequence)
+
+
 def is_pydantic_model(obj: Any) -> bool:
     return BaseModel is not None and isinstance(obj, type) and issubclass(obj, BaseModel)
 
 
+def sequence_item_model(obj: Any) -> Optional[Type[Any]]:
+    """Return `Model` for `list[Model]`, `Sequence[Model]` or `tuple[Model, ...]`.
+
+    Returns None when `obj` is not a homogeneous sequence of a Pydantic model.
+    """
+    if get_origin(obj) not in _SEQUENCE_ORIGINS:
+        return None
+    args = [a for a in get_args(obj) if a is not Ellipsis]
+    if len(args) != 1 or not is_pydantic_model(args[0]):
+        return None
+    return args[0]
+
+
+def referenced_models(obj: Any) -> List[Type[Any]]:
+    """Return the Pydantic models referenced by a model or sequence type."""
+    if is_pydantic_model(obj):
+        return [obj]
+    item = sequence_item_model(obj)
+    return [item] if item is not None else []
+
+
+def schema_ref(obj: Any) -> Optional[Dict[str, Any]]:
+    """Return an OpenAPI schema referencing the component(s) for `obj`.
+
+    Models map to a `$ref`; sequences of models map to an array of `$ref`.
+    """
+    if is_pydantic_model(obj):
+        return {"$ref": f"#/components/schemas/{obj.__name__}"}
+    item = sequence_item_model(obj)
+    if item is not None:
+        return {"type": "array", "items": {"$ref": f"#/components/schemas/{item.__name__}"}}
+    return None
+
+
 def model_to_schema(model: Type[Any]) -> Dict[str, Any]:
     """Return a JSON Schema dict for a Pydantic model.
 
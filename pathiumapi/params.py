@@ -0,0 +1,344 @@
+"""Handler signature inspection and parameter injection.
+
+`Pathium.route()` compiles each handler's signature once into a call plan:
+one small getter per parameter that pulls the value from the request (path
+params, typed query params, headers, the validated body, the `Request`
+itself). At request time the plan only runs the getters and calls the
+handler positionally, without re-inspecting the signature, building
+`**kwargs` dicts or stacking decorator coroutines.
+
+Parameter sources, in order of precedence:
+
+- annotated `Request` / `WebSocket`, or an unannotated first parameter -> the
+  request (or websocket connection)
+- annotated `BackgroundTasks` -> tasks run after the response is sent
+- a name that appears in the route path -> the converted path parameter
+- a `Header()` default (or `Annotated[..., Header()]`) -> a request header
+- the model marked by `@validate_query`, or a `Query()` model -> query model
+- the model marked by `@validate_body`, or any Pydantic model / list of
+  models annotation -> the validated JSON body
+- a `bytes` annotation -> the raw request body
+- anything else -> a query parameter converted to its annotation
+  (`str`, `int`, `float`, `bool`, optionally wrapped in `Optional`)
+"""
+import inspect
+from time import perf_counter_ns
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union, get_args, get_origin
+
+from ._core import HTTPConnection, Request
+from .background import BackgroundTasks
+from .openapi_pydantic import is_pydantic_model, referenced_models
+from .timing import TIMINGS_KEY
+from .validation import RequestValidationError, body_validator, iter_ndjson, query_validator
+
+# A compiled handler: (request, path params) -> awaitable handler result
+Invoker = Callable[[Request, Dict[str, Any]], Awaitable[Any]]
+# A parameter getter: (request, path params, body bytes) -> argument value
+Getter = Callable[[Request, Dict[str, Any], Optional[bytes]], Any]
+
+_MISSING = inspect.Parameter.empty
+
+
+class Param:
+    """Base marker for explicitly sourced handler parameters."""
+    def __init__(self, default: Any = ..., alias: Optional[str] = None):
+        self.default = default
+        self.alias = alias
+
+    @property
+    def required(self) -> bool:
+        return self.default is ...
+
+
+class Query(Param):
+    """Mark a handler parameter as a query string value.
+
+    Example:
+
+        @app.get("/items")
+        async def list_items(page: int = Query(1), q: str = Query(None, alias="search")):
+            ...
+    """
+
+
+class Header(Param):
+    """Mark a handler parameter as a request header.
+
+    The header name defaults to the parameter name with underscores replaced
+    by dashes (`x_token` -> `x-token`); use `alias` to override it.
+    """
+
+
+def _to_bool(value: str) -> bool:
+    v = value.lower()
+    if v in ("1", "true", "yes", "on"):
+        return True
+    if v in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(value)
+
+
+_SCALARS: Dict[Any, Callable[[str], Any]] = {str: str, int: int, float: float, bool: _to_bool}
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if get_origin(annotation) is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _split_annotated(annotation: Any) -> Tuple[Any, Optional[Param]]:
+    if get_origin(annotation) is Annotated:
+        base, *meta = get_args(annotation)
+        for m in meta:
+            if isinstance(m, Param):
+                return base, m
+        return base, None
+    return annotation, None
+
+
+def _is_request(annotation: Any) -> bool:
+    # `Request` for HTTP routes, `WebSocket` for websocket routes
+    return isinstance(annotation, type) and issubclass(annotation, HTTPConnection)
+
+
+def _value_getter(source: str, name: str, key: str, annotation: Any, default: Any) -> Getter:
+    """Getter for a scalar query/header value converted to `annotation`."""
+    convert = _SCALARS.get(_unwrap_optional(annotation))
+    required = default is _MISSING or default is ...
+    loc = [source, key]
+    if source == "query":
+        def lookup(req: Request) -> Dict[str, str]:
+            return req.query_params
+    else:
+        def lookup(req: Request) -> Dict[str, str]:
+            return req.headers
+
+    def get(req: Request, params: Dict[str, Any], body: Optional[bytes]) -> Any:
+        raw = lookup(req).get(key)
+        if raw is None:
+            if required:
+                raise RequestValidationError([{"loc": loc, "msg": "Field required", "type": "missing"}])
+            return default
+        if convert is None:
+            return raw
+        try:
+            return convert(raw)
+        except ValueError:
+            raise RequestValidationError([{
+                "loc": loc,
+                "msg": f"Input should be a valid {_unwrap_optional(annotation).__name__}",
+                "type": "type_error",
+            }]) from None
+
+    return get
+
+
+def _path_getter(name: str, annotation: Any) -> Getter:
+    convert = _SCALARS.get(_unwrap_optional(annotation))
+    if convert is None or convert is str:
+        return lambda req, params, body: params[name]
+
+    def get(req: Request, params: Dict[str, Any], body: Optional[bytes]) -> Any:
+        value = params[name]
+        if isinstance(value, str):
+            try:
+                return convert(value)
+            except ValueError:
+                raise RequestValidationError([{
+                    "loc": ["path", name],
+                    "msg": f"Input should be a valid {_unwrap_optional(annotation).__name__}",
+                    "type": "type_error",
+                }]) from None
+        return value
+
+    return get
+
+
+def _background_getter(req: Request, params: Dict[str, Any], body: Optional[bytes]) -> BackgroundTasks:
+    # the endpoint runs `req.background` after the response is sent
+    if req.background is None:
+        req.background = BackgroundTasks()
+    return req.background
+
+
+def _signature(handler: Callable) -> inspect.Signature:
+    try:
+        return inspect.signature(handler, eval_str=True)
+    except Exception:
+        # unresolved forward references: fall back to the raw annotations
+        return inspect.signature(handler)
+
+
+def compile_handler(
+    handler: Callable,
+    path_params: List[str],
+    call: Optional[Callable[..., Awaitable[Any]]] = None,
+    allow_request: bool = True,
+    timed: bool = False,
+    websocket: bool = False,
+) -> Invoker:
+    """Compile `handler`'s signature into an `Invoker` for a route.
+
+    `path_params` are the parameter names captured by the route path.
+    `call` replaces the final `handler(*args)` call, e.g. to run a
+    synchronous handler on a thread pool; it must return an awaitable.
+    `allow_request=False` rejects handlers that ask for the `Request` (e.g.
+    when arguments are shipped to another process). `timed=True` builds an
+    invoker that records `validate` and `handler` phases in the request's
+    `Timings`. `websocket=True` compiles a websocket route, which has no
+    response to run `BackgroundTasks` after. Raises TypeError when a
+    required parameter cannot be sourced.
+    """
+    body_model = getattr(handler, "__validated_model__", None)
+    query_model = getattr(handler, "__validated_query_model__", None)
+    ndjson = getattr(handler, "__validated_media_type__", None) == "application/x-ndjson"
+
+    params = list(_signature(handler).parameters.values())
+    getters: List[Getter] = []
+    kw_getters: List[Tuple[str, Getter]] = []
+    needs_body = False
+    have_request = False
+    body_bound = query_bound = False
+    var_kw = False
+
+    for index, p in enumerate(params):
+        if p.kind is p.VAR_POSITIONAL:
+            continue
+        if p.kind is p.VAR_KEYWORD:
+            var_kw = True
+            continue
+
+        annotation, marker = _split_annotated(p.annotation)
+        if isinstance(p.default, Param):
+            marker = p.default
+        default = marker.default if marker is not None else p.default
+        unannotated = annotation is _MISSING or isinstance(annotation, str)
+        getter: Optional[Getter] = None
+
+        if _is_request(annotation) or (
+            allow_request and index == 0 and unannotated and marker is None and p.name not in path_params
+        ):
+            if not allow_request:
+                raise TypeError(
+                    f"{handler.__qualname__}: the Request cannot be passed to this executor; "
+                    "declare the path, query, header or body values it needs as parameters"
+                )
+            getter = lambda req, params, body: req
+            have_request = True
+        elif isinstance(annotation, type) and issubclass(annotation, BackgroundTasks):
+            if websocket:
+                raise TypeError(f"{handler.__qualname__}: websocket handlers cannot take BackgroundTasks")
+            if not allow_request:
+                raise TypeError(f"{handler.__qualname__}: BackgroundTasks cannot be passed to this executor")
+            getter = _background_getter
+        elif p.name in path_params and marker is None:
+            getter = _path_getter(p.name, annotation)
+        elif isinstance(marker, Header):
+            key = (marker.alias or p.name.replace("_", "-")).lower()
+            getter = _value_getter("header", p.name, key, annotation, default)
+        elif query_model is not None and not query_bound and (
+            annotation is query_model or (unannotated and marker is None and have_request)
+        ):
+            getter = lambda req, params, body, m=query_model: query_validator(m)(req.query_params)
+            query_bound = True
+        elif isinstance(marker, Query) and is_pydantic_model(annotation):
+            getter = lambda req, params, body, m=annotation: query_validator(m)(req.query_params)
+        elif body_model is not None and not body_bound and (
+            annotation == body_model or (unannotated and marker is None and (have_request or not allow_request))
+            or (not ndjson and referenced_models(annotation) == referenced_models(body_model)
+                and get_origin(annotation) == get_origin(body_model))
+        ):
+            if ndjson:
+                chunk_size = getattr(handler, "__validated_chunk_size__", 1000)
+                getter = lambda req, params, body, m=body_model: iter_ndjson(req, m, chunk_size)
+            else:
+                getter = lambda req, params, body, m=body_model: body_validator(m)(body)
+                needs_body = True
+            body_bound = True
+        elif marker is None and annotation is bytes:
+            getter = lambda req, params, body: body
+            needs_body = True
+        elif marker is None and body_model is None and referenced_models(annotation):
+            getter = lambda req, params, body, m=annotation: body_validator(m)(body)
+            needs_body = True
+            body_bound = True
+        else:
+            key = marker.alias if marker is not None and marker.alias else p.name
+            getter = _value_getter("query", p.name, key, annotation, default)
+
+        if p.kind is p.KEYWORD_ONLY:
+            kw_getters.append((p.name, getter))
+        else:
+            getters.append(getter)
+
+    if body_model is not None and not body_bound:
+        raise TypeError(f"{handler.__qualname__} has no parameter for the validated body model")
+
+    if var_kw:
+        # legacy `handler(req, **params)`: forward path params not bound by name
+        bound = {p.name for p in params}
+        extra = [n for n in path_params if n not in bound]
+        kw_getters.extend((n, lambda req, params, body, n=n: params[n]) for n in extra)
+
+    if timed:
+        return _build_timed_invoker(call or handler, getters, kw_getters, needs_body)
+    return _build_invoker(call or handler, getters, kw_getters, needs_body)
+
+
+def _build_invoker(
+    handler: Callable,
+    getters: List[Getter],
+    kw_getters: List[Tuple[str, Getter]],
+    needs_body: bool,
+) -> Invoker:
+    # Specialise the common shapes so the hot path does as little as possible.
+    if needs_body:
+        async def invoke_body(req: Request, params: Dict[str, Any]) -> Any:
+            body = await req.body()
+            args = [g(req, params, body) for g in getters]
+            if kw_getters:
+                return await handler(*args, **{n: g(req, params, body) for n, g in kw_getters})
+            return await handler(*args)
+        return invoke_body
+
+    if kw_getters:
+        def invoke_kw(req: Request, params: Dict[str, Any]) -> Awaitable[Any]:
+            args = [g(req, params, None) for g in getters]
+            return handler(*args, **{n: g(req, params, None) for n, g in kw_getters})
+        return invoke_kw
+
+    if not getters:
+        return lambda req, params: handler()
+    if len(getters) == 1:
+        g0 = getters[0]
+        return lambda req, params: handler(g0(req, params, None))
+    return lambda req, params: handler(*[g(req, params, None) for g in getters])
+
+
+def _build_timed_invoker(
+    handler: Callable,
+    getters: List[Getter],
+    kw_getters: List[Tuple[str, Getter]],
+    needs_body: bool,
+) -> Invoker:
+    # One generic shape: timing dwarfs the cost of the specialisations above.
+    async def invoke_timed(req: Request, params: Dict[str, Any]) -> Any:
+        timings = req.scope[TIMINGS_KEY]
+        body = await req.body() if needs_body else None
+        started = perf_counter_ns()
+        try:
+            args = [g(req, params, body) for g in getters]
+            kwargs = {n: g(req, params, body) for n, g in kw_getters}
+        finally:
+            timings.since("validate", started)
+        # body reads inside the handler are already counted as `read`
+        read = timings.phases.get("read", 0)
+        started = perf_counter_ns()
+        try:
+            return await handler(*args, **kwargs)
+        finally:
+            timings.add("handler", perf_counter_ns() - started - (timings.phases.get("read", 0) - read))
+    return invoke_timed
@@ -0,0 +1,289 @@
+"""Pre-fork multi-worker runner (`pathiumapi run --workers N`).
+
+The master process imports the app once, optionally freezes the garbage
+collector's view of those objects (`gc.freeze()`) so forked workers keep
+sharing the memory pages copy-on-write, then forks N workers. Each worker
+runs its own event loop and `Server` on either the listening socket the
+master bound (inherited) or, with `reuse_port=True`, its own
+`SO_REUSEPORT` socket so the kernel balances connections between workers.
+
+The master supervises the workers:
+
+- a worker that exits unexpectedly is replaced
+- `SIGHUP` replaces the workers one at a time (rolling restart); each new
+  worker must be listening before the old one is asked to stop
+- `SIGTERM` / `SIGINT` stop every worker gracefully: each drains its
+  in-flight requests for up to `graceful_timeout` seconds; workers still
+  running well after that are killed
+
+Lifespan startup/shutdown hooks run in every worker. Because the app is
+imported in the master, a rolling restart recycles workers (e.g. to return
+leaked memory or reopen connections) but does not load new code.
+
+POSIX only.
+"""
+import asyncio
+import gc
+import logging
+import os
+import select
+import signal
+import socket
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+from .server import Server, new_event_loop
+
+logger = logging.getLogger("pathiumapi.prefork")
+
+# extra seconds a stopping worker gets after its graceful timeout, for
+# lifespan shutdown hooks, before it is killed
+_SHUTDOWN_SLACK = 10.0
+# a worker that dies this soon after being spawned, before it was ready,
+# counts as a boot failure; too many in a row stop the master
+_BOOT_WINDOW = 5.0
+_MAX_BOOT_FAILURES = 5
+
+
+def bind_socket(host: str, port: int, reuse_port: bool = False, backlog: Optional[int] = 2048) -> socket.socket:
+    """Return a bound, non-blocking TCP socket, listening unless `backlog` is None."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    if backlog is not None:
+        sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+class _Worker:
+    __slots__ = ("pid", "ready_fd", "started", "ready", "retiring")
+
+    def __init__(self, pid: int, ready_fd: int):
+        self.pid = pid
+        self.ready_fd = ready_fd
+        self.started = time.monotonic()
+        self.ready = False
+        self.retiring = False
+
+
+class Supervisor:
+    """Fork and supervise `workers` processes serving `app`.
+
+    Args:
+        app: the ASGI application, already imported by the master.
+        host, port: address to serve on.
+        workers: number of worker processes.
+        reuse_port: give every worker its own `SO_REUSEPORT` socket instead
+            of sharing one inherited socket.
+        freeze: call `gc.freeze()` before forking.
+        graceful_timeout: seconds a stopping worker waits for in-flight
+            requests; it is killed if still running 10 seconds later.
+        server_options: passed to each worker's `Server`.
+    """
+    def __init__(
+        self,
+        app: Callable,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: int = 2,
+        reuse_port: bool = False,
+        freeze: bool = True,
+        graceful_timeout: float = 30.0,
+        **server_options: Any,
+    ):
+        if reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not available on this platform")
+        self.app = app
+        self.host = host
+        self.port = port
+        self.num_workers = workers
+        self.reuse_port = reuse_port
+        self.freeze = freeze
+        self.graceful_timeout = graceful_timeout
+        self.server_options = server_options
+        self.workers: Dict[int, _Worker] = {}
+        self.sock: Optional[socket.socket] = None
+        self.stopping = False
+        self.reload_requested = False
+        self.boot_failures = 0
+
+    # -- master ------------------------------------------------------------
+
+    def run(self) -> int:
+        """Run the master loop until stopped; returns the exit status."""
+        if self.reuse_port:
+            # bind (without listening, so it gets no connections) to fail
+            # fast on a port in use; workers bind their own sockets
+            probe = bind_socket(self.host, self.port, reuse_port=True, backlog=None)
+            self.port = probe.getsockname()[1]
+            self.sock = probe
+        else:
+            self.sock = bind_socket(self.host, self.port)
+            self.port = self.sock.getsockname()[1]
+        if self.freeze:
+            gc.collect()
+            gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+        logger.info("Master %d serving http://%s:%d with %d workers", os.getpid(), self.host, self.port, self.num_workers)
+        status = 0
+        try:
+            for _ in range(self.num_workers):
+                self.spawn()
+            while not self.stopping:
+                self._poll(0.2)
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self.rolling_restart()
+                if self.boot_failures >= _MAX_BOOT_FAILURES:
+                    logger.error("Workers keep failing to boot; stopping")
+                    status = 1
+                    break
+        finally:
+            self.stop()
+        return status
+
+    def _handle_stop(self, signum: int, frame: Any) -> None:
+        self.stopping = True
+
+    def _handle_reload(self, signum: int, frame: Any) -> None:
+        self.reload_requested = True
+
+    def spawn(self) -> _Worker:
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child
+            os.close(read_fd)
+            for other in self.workers.values():
+                os.close(other.ready_fd)
+            code = 1
+            try:
+                code = self._worker_main(write_fd)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(code)
+        os.close(write_fd)
+        worker = _Worker(pid, read_fd)
+        self.workers[pid] = worker
+        logger.info("Started worker %d", pid)
+        return worker
+
+    def _poll(self, timeout: float) -> None:
+        """Wait up to `timeout` for readiness notices, then reap exited workers."""
+        pending = {w.ready_fd: w for w in self.workers.values() if not w.ready}
+        if pending:
+            try:
+                readable, _, _ = select.select(list(pending), [], [], timeout)
+            except InterruptedError:  # pragma: no cover - signal during select
+                readable = []
+            for fd in readable:
+                if os.read(fd, 1):
+                    pending[fd].ready = True
+                    self.boot_failures = 0
+        else:
+            time.sleep(timeout)
+        self._reap()
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            os.close(worker.ready_fd)
+            if self.stopping or worker.retiring:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            logger.warning("Worker %d exited unexpectedly (status %d); restarting", pid, code)
+            if not worker.ready and time.monotonic() - worker.started < _BOOT_WINDOW:
+                self.boot_failures += 1
+                time.sleep(min(0.1 * 2 ** self.boot_failures, 2.0))
+            self.spawn()
+
+    def rolling_restart(self) -> None:
+        """Replace the workers one at a time without dropping capacity."""
+        logger.info("Rolling restart of %d workers", len(self.workers))
+        for old in [w for w in self.workers.values() if not w.retiring]:
+            if self.stopping:
+                return
+            new = self.spawn()
+            deadline = time.monotonic() + self.graceful_timeout
+            while not new.ready and new.pid in self.workers and time.monotonic() < deadline:
+                self._poll(0.1)
+            if not new.ready:
+                logger.error("Replacement worker %d did not start; keeping worker %d", new.pid, old.pid)
+                return
+            self._retire([old])
+
+    def _retire(self, workers: List[_Worker]) -> None:
+        """SIGTERM `workers`, waiting up to `graceful_timeout` before SIGKILL."""
+        for w in workers:
+            w.retiring = True
+            self._signal(w.pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + _SHUTDOWN_SLACK
+        while any(w.pid in self.workers for w in workers):
+            if time.monotonic() >= deadline:
+                for w in workers:
+                    if w.pid in self.workers:
+                        logger.warning("Worker %d did not stop in time; killing it", w.pid)
+                        self._signal(w.pid, signal.SIGKILL)
+                deadline = float("inf")
+            time.sleep(0.05)
+            self._reap()
+
+    def _signal(self, pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def stop(self) -> None:
+        self.stopping = True
+        self._retire(list(self.workers.values()))
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        logger.info("Master %d stopped", os.getpid())
+
+    # -- worker --------------------------------------------------------------
+
+    def _worker_main(self, ready_fd: int) -> int:  # pragma: no cover - runs in the child
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+        if self.reuse_port:
+            assert self.sock is not None
+            self.sock.close()
+            sock = bind_socket(self.host, self.port, reuse_port=True)
+        else:
+            sock = self.sock
+        server = Server(self.app, sock=sock, graceful_timeout=self.graceful_timeout, **self.server_options)
+
+        def ready() -> None:
+            os.write(ready_fd, b"1")
+            os.close(ready_fd)
+
+        loop = new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(server.serve(ready=ready))
+        finally:
+            loop.close()
+        return 0
+
+
+def run(app: Callable, host: str = "127.0.0.1", port: int = 8000, workers: int = 2, **options: Any) -> int:
+    """Serve `app` with `workers` forked processes; see `Supervisor`."""
+    return Supervisor(app, host=host, port=port, workers=workers, **options).run()
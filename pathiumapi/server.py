@@ -0,0 +1,844 @@
+"""Built-in asyncio HTTP/1.1 server for running Pathium (or any ASGI) apps.
+
+`pathiumapi run` serves apps with this server, so no external ASGI server is
+needed in production:
+
+    from pathiumapi.server import run
+    run(app, host="0.0.0.0", port=8000)
+
+Supported: keep-alive, pipelining (responses are written in request order),
+`Content-Length` and chunked request bodies, chunked streaming responses,
+`Expect: 100-continue`, `HEAD`, and the ASGI lifespan protocol. Header and
+body sizes are limited (431/413) and slow clients are cut off by header,
+body and keep-alive idle timeouts.
+
+`uvloop` and `httptools` are used automatically when installed
+(`pip install uvloop httptools`); otherwise the stdlib event loop and a
+pure-Python parser are used. WebSocket upgrades are not handled; run apps
+with websocket routes behind an ASGI server that supports them.
+"""
+import asyncio
+import email.utils
+import http
+import logging
+import re
+import signal
+import socket
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+logger = logging.getLogger("pathiumapi.server")
+
+try:
+    import httptools  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional
+    httptools = None
+
+_STATUS_LINES: Dict[int, bytes] = {
+    s.value: f"HTTP/1.1 {s.value} {s.phrase}\r\n".encode() for s in http.HTTPStatus
+}
+
+# request body bytes buffered per request before reading from the socket pauses
+_BODY_HIGH_WATER = 64 * 1024
+# pipelined requests queued behind the active one before reading pauses
+_PIPELINE_LIMIT = 16
+# `int(x, 16)` also takes signs, `0x`, `_` and whitespace; a chunk size is
+# bare hex digits only (a negative one would frame the next request as body)
+_CHUNK_SIZE = re.compile(rb"[0-9A-Fa-f]{1,16}")
+
+
+class ParserError(Exception):
+    """Malformed request; `status` is the response to send before closing."""
+    def __init__(self, msg: str, status: int = 400):
+        super().__init__(msg)
+        self.status = status
+
+
+def _status_line(status: int) -> bytes:
+    line = _STATUS_LINES.get(status)
+    if line is None:
+        line = f"HTTP/1.1 {status} \r\n".encode()
+    return line
+
+
+class PyHttpParser:
+    """Incremental HTTP/1.x request parser with the `httptools` callback API.
+
+    Calls `on_message_begin`, `on_url`, `on_header`, `on_headers_complete`,
+    `on_body` and `on_message_complete` on `protocol`.
+    """
+    def __init__(self, protocol: Any, max_head: int = 64 * 1024):
+        self.protocol = protocol
+        self.max_head = max_head
+        self._buf = bytearray()
+        self._state = "head"
+        self._remaining = 0
+        self._method = b""
+        self._version = "1.1"
+        self._keep_alive = True
+
+    def get_method(self) -> bytes:
+        return self._method
+
+    def get_http_version(self) -> str:
+        return self._version
+
+    def should_keep_alive(self) -> bool:
+        return self._keep_alive
+
+    def feed_data(self, data: bytes) -> None:
+        buf = self._buf
+        buf += data
+        while True:
+            state = self._state
+            if state == "head":
+                while buf[:2] == b"\r\n":  # stray CRLF between pipelined requests
+                    del buf[:2]
+                end = buf.find(b"\r\n\r\n")
+                if end < 0:
+                    if len(buf) > self.max_head:
+                        raise ParserError("Request header fields too large", 431)
+                    return
+                if end > self.max_head:
+                    raise ParserError("Request header fields too large", 431)
+                head = bytes(buf[:end])
+                del buf[:end + 4]
+                self._parse_head(head)
+            elif state == "body" or state == "chunk":
+                if not buf:
+                    return
+                n = min(self._remaining, len(buf))
+                chunk = bytes(buf[:n])
+                del buf[:n]
+                self._remaining -= n
+                self.protocol.on_body(chunk)
+                if self._remaining == 0:
+                    if state == "body":
+                        self._complete()
+                    else:
+                        self._state = "chunk_end"
+            elif state == "chunk_end":
+                if len(buf) < 2:
+                    return
+                if buf[:2] != b"\r\n":
+                    raise ParserError("Invalid chunk terminator")
+                del buf[:2]
+                self._state = "chunk_size"
+            elif state == "chunk_size":
+                end = buf.find(b"\r\n")
+                if end < 0:
+                    if len(buf) > 1024:
+                        raise ParserError("Invalid chunk size")
+                    return
+                line, ext, _ = bytes(buf[:end]).partition(b";")
+                del buf[:end + 2]
+                if ext:
+                    line = line.rstrip(b" \t")  # whitespace before an extension
+                if not _CHUNK_SIZE.fullmatch(line):
+                    raise ParserError("Invalid chunk size")
+                size = int(line, 16)
+                if size == 0:
+                    self._state = "trailers"
+                else:
+                    self._remaining = size
+                    self._state = "chunk"
+            elif state == "trailers":
+                end = buf.find(b"\r\n")
+                if end < 0:
+                    if len(buf) > self.max_head:
+                        raise ParserError("Trailers too large", 431)
+                    return
+                del buf[:end + 2]
+                if end == 0:
+                    self._complete()
+
+    def _complete(self) -> None:
+        self._state = "head"
+        self.protocol.on_message_complete()
+
+    def _parse_head(self, head: bytes) -> None:
+        lines = head.split(b"\r\n")
+        try:
+            method, target, version = lines[0].split(b" ")
+        except ValueError:
+            raise ParserError("Invalid request line") from None
+        if version not in (b"HTTP/1.1", b"HTTP/1.0") or not method or not target:
+            raise ParserError("Invalid request line")
+        self._method = method
+        self._version = version[5:].decode()
+        keep_alive = version == b"HTTP/1.1"
+        length: Optional[int] = None
+        chunked = False
+        self.protocol.on_message_begin()
+        self.protocol.on_url(target)
+        for line in lines[1:]:
+            name, sep, value = line.partition(b":")
+            if not sep or not name or name != name.strip() or b" " in name:
+                raise ParserError("Invalid header line")
+            value = value.strip()
+            lname = name.lower()
+            if lname == b"content-length":
+                if length is not None or not value.isdigit():
+                    raise ParserError("Invalid Content-Length")
+                length = int(value)
+            elif lname == b"transfer-encoding":
+                if value.lower() != b"chunked":
+                    raise ParserError("Unsupported Transfer-Encoding", 501)
+                chunked = True
+            elif lname == b"connection":
+                tokens = {t.strip() for t in value.lower().split(b",")}
+                if b"close" in tokens:
+                    keep_alive = False
+                elif b"keep-alive" in tokens:
+                    keep_alive = True
+            self.protocol.on_header(name, value)
+        if chunked and length is not None:
+            raise ParserError("Content-Length with Transfer-Encoding")
+        self._keep_alive = keep_alive
+        self.protocol.on_headers_complete()
+        if chunked:
+            self._state = "chunk_size"
+        elif length:
+            self._remaining = length
+            self._state = "body"
+        else:
+            self.protocol.on_message_complete()
+
+
+_PARSER_ERRORS: Tuple[type, ...] = (ParserError,)
+if httptools is not None:  # pragma: no cover - optional
+    _PARSER_ERRORS += (httptools.HttpParserError,)
+
+
+class _Cycle:
+    """One request/response exchange on a connection."""
+    def __init__(self, proto: "HTTPProtocol", scope: Dict[str, Any], keep_alive: bool, expect_continue: bool):
+        self.proto = proto
+        self.scope = scope
+        self.keep_alive = keep_alive
+        self.expect_continue = expect_continue
+        self.head_only = scope["method"] == "HEAD"
+        self.body: List[bytes] = []
+        self.body_size = 0  # buffered, not yet received by the app
+        self.total_size = 0
+        self.more_body = True
+        self.body_sent = False
+        self.event = asyncio.Event()
+        self.disconnected = False
+        self.reject: Optional[int] = None
+        self.response_started = False
+        self.response_complete = False
+        self.head_written = False
+        self.chunked = False
+        self.status = 200
+        self.headers: List[Tuple[bytes, bytes]] = []
+
+    async def run(self) -> None:
+        try:
+            if self.reject is not None:
+                await self._simple_response(self.reject)
+                self.keep_alive = False
+            else:
+                await self.proto.server.app(self.scope, self.receive, self.send)
+        except BaseException as exc:
+            if not isinstance(exc, Exception):
+                self.keep_alive = False
+                raise
+            logger.exception("Exception in ASGI application")
+            if not self.response_started and not self.disconnected:
+                await self._simple_response(500)
+            self.keep_alive = False
+        else:
+            if not self.response_started and not self.disconnected:
+                logger.error("ASGI application returned without starting a response")
+                await self._simple_response(500)
+            elif not self.response_complete:
+                self.keep_alive = False
+        finally:
+            self.proto.cycle_done(self)
+
+    async def _simple_response(self, status: int) -> None:
+        body = http.HTTPStatus(status).phrase.encode()
+        await self.send({"type": "http.response.start", "status": status,
+                         "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"connection", b"close")]})
+        await self.send({"type": "http.response.body", "body": body})
+
+    async def receive(self) -> Dict[str, Any]:
+        if self.expect_continue and not self.disconnected:
+            self.expect_continue = False
+            self.proto.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        while True:
+            if self.disconnected or self.response_complete:
+                return {"type": "http.disconnect"}
+            if self.body or (not self.more_body and not self.body_sent):
+                chunk = b"".join(self.body)
+                self.body.clear()
+                self.body_size = 0
+                self.proto.resume_reading()
+                if not self.more_body:
+                    self.body_sent = True
+                return {"type": "http.request", "body": chunk, "more_body": self.more_body}
+            self.event.clear()
+            if self.more_body and self.proto.server.body_timeout is not None:
+                try:
+                    await asyncio.wait_for(self.event.wait(), self.proto.server.body_timeout)
+                except asyncio.TimeoutError:
+                    # slow upload: give up on the client
+                    self.disconnected = True
+                    self.proto.close()
+            else:
+                await self.event.wait()
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        if self.disconnected:
+            return
+        kind = message["type"]
+        if kind == "http.response.start":
+            if self.response_started:
+                raise RuntimeError("http.response.start sent twice")
+            self.response_started = True
+            self.status = message["status"]
+            self.headers = list(message.get("headers", ()))
+            return
+        if kind != "http.response.body":
+            return
+        if not self.response_started:
+            raise RuntimeError("http.response.body sent before http.response.start")
+        if self.response_complete:
+            raise RuntimeError("http.response.body sent after the response completed")
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        out = self._head(body, more) if not self.head_written else []
+        if self.head_only:
+            pass
+        elif self.chunked:
+            if body:
+                out += [b"%x\r\n" % len(body), body, b"\r\n"]
+            if not more:
+                out.append(b"0\r\n\r\n")
+        elif body:
+            out.append(body)
+        if out:
+            self.proto.write(b"".join(out))
+        if not more:
+            self.response_complete = True
+            self.event.set()
+        await self.proto.drain()
+
+    def _head(self, body: bytes, more: bool) -> List[bytes]:
+        self.head_written = True
+        out = [_status_line(self.status)]
+        has_length = chunked = False
+        for name, value in self.headers:
+            lname = name.lower()
+            if lname == b"content-length":
+                has_length = True
+            elif lname == b"transfer-encoding":
+                chunked = value.lower() == b"chunked"
+            elif lname == b"connection":
+                if value.lower() == b"close":
+                    self.keep_alive = False
+                continue
+            out += [name, b": ", value, b"\r\n"]
+        if not has_length and not chunked:
+            if not more:
+                out += [b"content-length: ", str(len(body)).encode(), b"\r\n"]
+            elif self.scope["http_version"] == "1.1":
+                out.append(b"transfer-encoding: chunked\r\n")
+                chunked = True
+            else:
+                self.keep_alive = False  # close-delimited body
+        self.chunked = chunked
+        if self.proto.server.draining:
+            self.keep_alive = False
+        if not self.keep_alive:
+            out.append(b"connection: close\r\n")
+        out += [b"date: ", self.proto.server.date_header, b"\r\n\r\n"]
+        return out
+
+
+class HTTPProtocol(asyncio.Protocol):
+    """asyncio protocol serving one HTTP/1.1 connection."""
+    def __init__(self, server: "Server"):
+        self.server = server
+        self.loop = asyncio.get_running_loop()
+        self.transport: Optional[asyncio.Transport] = None
+        parser_cls = httptools.HttpRequestParser if httptools is not None and server.http == "httptools" else None
+        if parser_cls is not None:  # pragma: no cover - optional
+            self.parser = parser_cls(self)
+        else:
+            self.parser = PyHttpParser(self, server.max_header_size)
+        self.cycle: Optional[_Cycle] = None  # request being parsed
+        self.active: Optional[_Cycle] = None  # request being answered
+        self.pipeline: Deque[_Cycle] = deque()
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.read_paused = False
+        self.write_paused = False
+        self._drain: Optional[asyncio.Future] = None
+        self._url = b""
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._head_size = 0
+        self._head_pending = False  # bytes of a request head have arrived
+        # status of a ParserError raised from a callback: httptools wraps
+        # callback exceptions in HttpParserCallbackError, dropping it
+        self._error_status: Optional[int] = None
+        self.client: Optional[Tuple[str, int]] = None
+        self.sockname: Optional[Tuple[str, int]] = None
+
+    # -- connection events -------------------------------------------------
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        self.server.connections.add(self)
+        peer = transport.get_extra_info("peername")
+        sock = transport.get_extra_info("sockname")
+        self.client = tuple(peer[:2]) if isinstance(peer, tuple) else None  # type: ignore[assignment]
+        self.sockname = tuple(sock[:2]) if isinstance(sock, tuple) else None  # type: ignore[assignment]
+        self._set_timer(self.server.keep_alive_timeout)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.server.connections.discard(self)
+        self._cancel_timer()
+        for cycle in (self.cycle, self.active, *self.pipeline):
+            if cycle is not None:
+                cycle.disconnected = True
+                cycle.event.set()
+        self.pipeline.clear()
+        if self._drain is not None and not self._drain.done():
+            self._drain.set_result(None)
+        self.transport = None
+
+    def data_received(self, data: bytes) -> None:
+        if self.cycle is None and not self._head_pending:
+            # a new request has started: the client now has `header_timeout`
+            # seconds to finish sending its headers
+            self._head_pending = True
+            self._set_timer(self.server.header_timeout)
+        try:
+            self.parser.feed_data(data)
+        except _PARSER_ERRORS as exc:
+            status = self._error_status or getattr(exc, "status", 400)
+            self._error_status = None
+            self._reject(status)
+        except Exception as exc:  # pragma: no cover - httptools upgrade
+            if httptools is not None and isinstance(exc, httptools.HttpParserUpgrade):
+                return
+            raise
+
+    def pause_writing(self) -> None:
+        self.write_paused = True
+
+    def resume_writing(self) -> None:
+        self.write_paused = False
+        if self._drain is not None and not self._drain.done():
+            self._drain.set_result(None)
+        self._drain = None
+
+    # -- parser callbacks --------------------------------------------------
+
+    def on_message_begin(self) -> None:
+        self._url = b""
+        self._headers = []
+        self._head_size = 0
+
+    def on_url(self, url: bytes) -> None:
+        self._url += url
+        self._head_size += len(url)
+
+    def on_header(self, name: bytes, value: bytes) -> None:
+        self._head_size += len(name) + len(value)
+        if self._head_size > self.server.max_header_size:
+            self._error_status = 431
+            raise ParserError("Request header fields too large", 431)
+        self._headers.append((name.lower(), value))
+
+    def on_headers_complete(self) -> None:
+        self._cancel_timer()
+        self._head_pending = False
+        raw_path, _, query = self._url.partition(b"?")
+        server = self.server
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": self.parser.get_http_version(),
+            "server": self.sockname,
+            "client": self.client,
+            "scheme": "http",
+            "method": self.parser.get_method().decode("ascii"),
+            "root_path": server.root_path,
+            "path": unquote(raw_path.decode("latin-1")),
+            "raw_path": raw_path,
+            "query_string": query,
+            "headers": self._headers,
+            "state": dict(server.lifespan_state),
+        }
+        expect = any(n == b"expect" and v.lower() == b"100-continue" for n, v in self._headers)
+        cycle = _Cycle(self, scope, self.parser.should_keep_alive(), expect)
+        max_body = server.max_body_size
+        if max_body is not None:
+            for name, value in self._headers:
+                if name == b"content-length" and value.isdigit() and int(value) > max_body:
+                    cycle.reject = 413
+                    cycle.expect_continue = False
+        self.cycle = cycle
+        if self.active is None:
+            self._start(cycle)
+        else:
+            self.pipeline.append(cycle)
+            if len(self.pipeline) >= _PIPELINE_LIMIT:
+                self.pause_reading()
+
+    def on_body(self, body: bytes) -> None:
+        cycle = self.cycle
+        if cycle is None or cycle.response_complete or cycle.disconnected or cycle.reject:
+            return
+        cycle.body_size += len(body)
+        cycle.total_size += len(body)
+        max_body = self.server.max_body_size
+        if max_body is not None and cycle.total_size > max_body:
+            if not cycle.response_started and cycle is not self.active:
+                cycle.reject = 413
+            else:
+                # the app is already reading: cut the upload off
+                cycle.disconnected = True
+                cycle.event.set()
+                self.close()
+            return
+        cycle.body.append(body)
+        if cycle.body_size > _BODY_HIGH_WATER:
+            self.pause_reading()
+        cycle.event.set()
+
+    def on_message_complete(self) -> None:
+        cycle = self.cycle
+        self.cycle = None
+        if cycle is not None:
+            cycle.more_body = False
+            cycle.event.set()
+
+    # -- cycle management --------------------------------------------------
+
+    def _start(self, cycle: _Cycle) -> None:
+        self.active = cycle
+        self.server.in_flight += 1
+        task = self.loop.create_task(cycle.run())
+        self.server.tasks.add(task)
+        task.add_done_callback(self.server.tasks.discard)
+
+    def cycle_done(self, cycle: _Cycle) -> None:
+        self.server.in_flight -= 1
+        self.server.total_requests += 1
+        self.active = None
+        if self.transport is None or self.transport.is_closing():
+            return
+        if not cycle.keep_alive or self.server.draining:
+            self.close()
+            return
+        if self.pipeline:
+            self._start(self.pipeline.popleft())
+            self.resume_reading()
+            return
+        self.resume_reading()
+        if self.cycle is None and not self._head_pending:
+            self._set_timer(self.server.keep_alive_timeout)
+
+    def _reject(self, status: int) -> None:
+        """Answer a malformed request and close, preserving pipeline order."""
+        if self.transport is None:
+            return
+        if self.active is None and not self.pipeline:
+            body = http.HTTPStatus(status).phrase.encode()
+            self.write(b"".join([
+                _status_line(status),
+                b"content-type: text/plain; charset=utf-8\r\nconnection: close\r\n",
+                b"content-length: ", str(len(body)).encode(), b"\r\n\r\n", body,
+            ]))
+            self.close()
+        else:
+            self.pause_reading()
+            cycle = _Cycle(self, {"method": "GET", "http_version": "1.1"}, False, False)
+            cycle.reject = status
+            cycle.more_body = False
+            self.pipeline.append(cycle)
+        self.cycle = None
+
+    # -- transport helpers -------------------------------------------------
+
+    @property
+    def idle(self) -> bool:
+        return self.active is None and self.cycle is None and not self.pipeline and not self._head_pending
+
+    def write(self, data: bytes) -> None:
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.write(data)
+
+    async def drain(self) -> None:
+        if self.write_paused and self.transport is not None:
+            if self._drain is None:
+                self._drain = self.loop.create_future()
+            await self._drain
+
+    def pause_reading(self) -> None:
+        if not self.read_paused and self.transport is not None:
+            self.read_paused = True
+            self.transport.pause_reading()
+
+    def resume_reading(self) -> None:
+        if self.read_paused and self.transport is not None and len(self.pipeline) < _PIPELINE_LIMIT:
+            self.read_paused = False
+            self.transport.resume_reading()
+
+    def close(self) -> None:
+        self._cancel_timer()
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.close()
+
+    def _set_timer(self, timeout: Optional[float]) -> None:
+        self._cancel_timer()
+        if timeout is not None:
+            self.timer = self.loop.call_later(timeout, self._timed_out)
+
+    def _cancel_timer(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def _timed_out(self) -> None:
+        self.timer = None
+        if self._head_pending:
+            if self.active is None and not self.pipeline:
+                self._reject(408)  # headers did not arrive in time
+            else:
+                self._set_timer(self.server.header_timeout)
+        elif self.idle:
+            self.close()
+
+
+class _Lifespan:
+    """Drives the ASGI lifespan protocol for the server."""
+    def __init__(self, app: Callable, state: Dict[str, Any]):
+        self.app = app
+        self.state = state
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.events: Dict[str, asyncio.Event] = {
+            "startup": asyncio.Event(), "shutdown": asyncio.Event()
+        }
+        self.failed: Optional[str] = None
+        self.supported = True
+        self.task: Optional[asyncio.Task] = None
+
+    async def _main(self) -> None:
+        scope = {"type": "lifespan", "asgi": {"version": "3.0", "spec_version": "2.0"}, "state": self.state}
+        try:
+            await self.app(scope, self.queue.get, self._send)
+        except BaseException as exc:
+            if not self.events["startup"].is_set():
+                # apps without lifespan support raise on the lifespan scope
+                self.supported = False
+                logger.debug("ASGI lifespan not supported: %r", exc)
+        finally:
+            for event in self.events.values():
+                event.set()
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        kind = message["type"]
+        phase = "startup" if kind.startswith("lifespan.startup") else "shutdown"
+        if kind.endswith(".failed"):
+            self.failed = message.get("message", "") or f"{phase} failed"
+        self.events[phase].set()
+
+    async def startup(self) -> None:
+        self.task = asyncio.ensure_future(self._main())
+        await self.queue.put({"type": "lifespan.startup"})
+        await self.events["startup"].wait()
+        if self.failed is not None:
+            raise RuntimeError(f"Application startup failed: {self.failed}")
+
+    async def shutdown(self) -> None:
+        if not self.supported or self.task is None or self.task.done():
+            return
+        await self.queue.put({"type": "lifespan.shutdown"})
+        await self.events["shutdown"].wait()
+        if self.failed is not None:
+            logger.error("Application shutdown failed: %s", self.failed)
+
+
+class Server:
+    """HTTP/1.1 server running an ASGI app on an asyncio event loop.
+
+    Args:
+        app: the ASGI application.
+        host, port: address to bind (ignored when `sock` is given).
+        sock: an already bound listening socket (used by the prefork runner).
+        uds: bind a Unix domain socket path instead of TCP.
+        backlog: listen backlog.
+        keep_alive_timeout: seconds an idle keep-alive connection stays open.
+        header_timeout: seconds a client has to send complete request headers.
+        body_timeout: seconds the app waits for each request body chunk
+            before the connection is dropped (`None` disables it).
+        max_header_size: request line + header bytes allowed (431 beyond).
+        max_body_size: request body bytes allowed (413 beyond; `None` for
+            no limit).
+        http: `"auto"` uses `httptools` when installed, `"httptools"`
+            requires it and `"python"` forces the pure-Python parser.
+        lifespan: `"auto"`, `"on"` or `"off"`.
+        graceful_timeout: seconds shutdown waits for in-flight requests
+            before cancelling them (`None` waits indefinitely).
+
+    On SIGTERM/SIGINT the server drains: it marks the app as draining
+    (`app.start_draining()` when the app has one), stops accepting
+    connections, closes idle keep-alive connections, lets in-flight requests
+    finish (answering them with `connection: close`) until the deadline,
+    cancels the rest and then runs lifespan shutdown.
+    """
+    def __init__(
+        self,
+        app: Callable,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        sock: Optional[socket.socket] = None,
+        uds: Optional[str] = None,
+        backlog: int = 2048,
+        keep_alive_timeout: Optional[float] = 5.0,
+        header_timeout: Optional[float] = 10.0,
+        body_timeout: Optional[float] = 30.0,
+        max_header_size: int = 64 * 1024,
+        max_body_size: Optional[int] = 16 * 1024 * 1024,
+        http: str = "auto",
+        lifespan: str = "auto",
+        root_path: str = "",
+        graceful_timeout: Optional[float] = 30.0,
+    ):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.sock = sock
+        self.uds = uds
+        self.backlog = backlog
+        self.keep_alive_timeout = keep_alive_timeout
+        self.header_timeout = header_timeout
+        self.body_timeout = body_timeout
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+        if http == "httptools" and httptools is None:
+            raise RuntimeError("http='httptools' requires httptools (pip install httptools)")
+        self.http = "httptools" if http != "python" and httptools is not None else "python"
+        self.lifespan = lifespan
+        self.root_path = root_path
+        self.graceful_timeout = graceful_timeout
+        self.lifespan_state: Dict[str, Any] = {}
+        self.connections: Set[HTTPProtocol] = set()
+        self.tasks: Set[asyncio.Task] = set()
+        self.in_flight = 0
+        self.total_requests = 0
+        self.draining = False
+        self.date_header = b""
+        self.should_exit: Optional[asyncio.Event] = None  # created on the loop in serve()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._lifespan: Optional[_Lifespan] = None
+        self._ticker: Optional[asyncio.Task] = None
+
+    @property
+    def sockets(self) -> List[socket.socket]:
+        return list(self._server.sockets) if self._server is not None else []
+
+    def _update_date(self) -> None:
+        self.date_header = email.utils.formatdate(time.time(), usegmt=True).encode()
+
+    async def _tick(self) -> None:
+        while True:
+            await asyncio.sleep(1.0)
+            self._update_date()
+
+    async def startup(self) -> None:
+        """Run lifespan startup and start listening."""
+        self._update_date()
+        if self.lifespan != "off":
+            self._lifespan = _Lifespan(self.app, self.lifespan_state)
+            await self._lifespan.startup()
+            if not self._lifespan.supported and self.lifespan == "on":
+                raise RuntimeError("Application does not support ASGI lifespan")
+        loop = asyncio.get_running_loop()
+        factory = lambda: HTTPProtocol(self)
+        if self.sock is not None:
+            self._server = await loop.create_server(factory, sock=self.sock, backlog=self.backlog)
+        elif self.uds is not None:
+            self._server = await loop.create_unix_server(factory, path=self.uds, backlog=self.backlog)
+        else:
+            self._server = await loop.create_server(factory, self.host, self.port, backlog=self.backlog)
+        self._ticker = asyncio.ensure_future(self._tick())
+
+    async def shutdown(self) -> None:
+        """Drain in-flight requests, then run lifespan shutdown."""
+        self.draining = True
+        start_draining = getattr(self.app, "start_draining", None)
+        if callable(start_draining):
+            start_draining()
+        if self._server is not None:
+            self._server.close()
+        for conn in list(self.connections):
+            if conn.idle:
+                conn.close()
+        if self.tasks:
+            logger.info("Waiting for %d in-flight requests", len(self.tasks))
+            _, pending = await asyncio.wait(set(self.tasks), timeout=self.graceful_timeout)
+            if pending:
+                logger.warning("Cancelling %d requests still running after %ss", len(pending), self.graceful_timeout)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        for conn in list(self.connections):
+            conn.close()
+        if self._ticker is not None:
+            self._ticker.cancel()
+        if self._lifespan is not None:
+            await self._lifespan.shutdown()
+
+    def handle_exit(self, *args: Any) -> None:
+        if self.should_exit is not None:
+            self.should_exit.set()
+
+    async def serve(self, ready: Optional[Callable[[], None]] = None) -> None:
+        """Serve until SIGINT/SIGTERM (or `handle_exit()`), then shut down.
+
+        `ready` is called once the server is listening.
+        """
+        self.should_exit = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.handle_exit)
+            except (NotImplementedError, RuntimeError, ValueError):  # pragma: no cover - non-main thread / Windows
+                pass
+        await self.startup()
+        for sock in self.sockets:
+            name = sock.getsockname()
+            where = name if isinstance(name, str) else f"http://{name[0]}:{name[1]}"
+            logger.info("Serving on %s (parser: %s)", where, self.http)
+        if ready is not None:
+            ready()
+        try:
+            await self.should_exit.wait()
+        finally:
+            await self.shutdown()
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Return a uvloop event loop when uvloop is installed, else asyncio's."""
+    try:
+        import uvloop  # type: ignore[import-not-found]
+    except ImportError:
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()  # pragma: no cover - optional
+
+
+def run(app: Callable, host: str = "127.0.0.1", port: int = 8000, **options: Any) -> None:
+    """Serve `app` until interrupted. `options` are passed to `Server`."""
+    loop = new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(Server(app, host=host, port=port, **options).serve())
+    finally:
+        loop.close()
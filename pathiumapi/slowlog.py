@@ -0,0 +1,208 @@
+"""Slow-request log.
+
+`add_slow_log(app, threshold=0.5)` keeps the most recent requests that took
+longer than `threshold` seconds, with what is needed to debug them:
+
+- method, path, route template, path params, query string, status, duration
+- the per-phase breakdown when request timing is on
+  (`Pathium(server_timing=True)` or `on_timing=`, see `pathiumapi.timing`)
+- a stack snapshot taken by a watchdog thread as soon as a request crosses
+  the threshold, while it is still running: the loop thread's stack if the
+  request is blocking the loop, otherwise the chain of coroutines it is
+  awaiting in
+
+The entries are served as JSON at `/_slow` when a `secret` is configured,
+to requests carrying `X-Slow-Log: <secret>`; they include query strings,
+path params and stacks. Fast requests cost a `send` wrapper and, with stack
+capture on, a dict insert and delete.
+"""
+import asyncio
+import hmac
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from ._core import HTTPError, Pathium, Receive, Request, Response, Scope, Send
+from .timing import TIMINGS_KEY
+
+
+class SlowRequest:
+    """One request that exceeded the threshold."""
+    __slots__ = ("started", "method", "path", "route", "params", "query", "status", "duration", "timings", "stack")
+
+    def __init__(self, started: float, scope: Scope):
+        self.started = started
+        self.method = scope.get("method", "")
+        self.path = scope.get("path", "")
+        self.route: Optional[str] = None
+        self.params: Dict[str, Any] = {}
+        self.query = scope.get("query_string", b"").decode("latin-1")
+        self.status = 500
+        self.duration = 0.0
+        self.timings: Optional[Dict[str, float]] = None
+        self.stack: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _coroutine_stack(task: "asyncio.Task[Any]") -> str:
+    """Format the chain of coroutines `task` is suspended in, outermost first."""
+    frames: List[Any] = []
+    coro: Any = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "ag_await", None)
+    summary = traceback.StackSummary.extract((f, f.f_lineno) for f in frames)
+    return "".join(summary.format())
+
+
+class _InFlight:
+    __slots__ = ("start", "scope", "stack")
+
+    def __init__(self, start: float, scope: Scope):
+        self.start = start
+        self.scope = scope
+        self.stack: Optional[str] = None
+
+
+class SlowRequestLog:
+    """Ring buffer of requests slower than `threshold` seconds.
+
+    Args:
+        threshold: seconds after which a request counts as slow.
+        max_entries: slow requests kept.
+        capture_stack: take a stack snapshot when a running request crosses
+            the threshold (needs `start()`, done by `add_slow_log`).
+    """
+    def __init__(self, threshold: float = 1.0, max_entries: int = 100, capture_stack: bool = True):
+        self.threshold = threshold
+        self.capture_stack = capture_stack
+        self.entries: Deque[SlowRequest] = deque(maxlen=max_entries)
+        self.in_flight: Dict["asyncio.Task[Any]", _InFlight] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id = 0
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start the stack-capturing watchdog (call from the running loop)."""
+        if not self.capture_stack or self._watchdog is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="pathium-slow-log", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._watchdog is not None:
+            self._stop.set()
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    def _watch(self) -> None:
+        check = min(self.threshold / 4, 0.25)
+        while not self._stop.wait(check):
+            now = time.perf_counter()
+            for task, flight in list(self.in_flight.items()):
+                if flight.stack is None and now - flight.start >= self.threshold:
+                    try:
+                        flight.stack = self._snapshot(task)
+                    except Exception:  # pragma: no cover - racing the loop thread
+                        flight.stack = ""
+
+    def _snapshot(self, task: "asyncio.Task[Any]") -> str:
+        if self.loop is not None and asyncio.current_task(self.loop) is task:
+            # the request is running right now, i.e. blocking the loop
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                return "".join(traceback.format_stack(frame))
+        return _coroutine_stack(task)
+
+    def middleware(self, app: Callable[[Scope, Receive, Send], Any]) -> Callable[[Scope, Receive, Send], Any]:
+        async def inner(scope: Scope, receive: Receive, send: Send) -> None:
+            if scope.get("type") != "http":
+                await app(scope, receive, send)
+                return
+
+            status = 500
+
+            def send_wrapper(msg: Dict[str, Any]):
+                nonlocal status
+                if msg["type"] == "http.response.start":
+                    status = msg["status"]
+                return send(msg)
+
+            flight = _InFlight(time.perf_counter(), scope)
+            task = asyncio.current_task() if self._watchdog is not None else None
+            if task is not None:
+                self.in_flight[task] = flight
+            try:
+                await app(scope, receive, send_wrapper)
+            finally:
+                if task is not None:
+                    self.in_flight.pop(task, None)
+                duration = time.perf_counter() - flight.start
+                if duration >= self.threshold:
+                    self._record(flight, status, duration)
+
+        return inner
+
+    def _record(self, flight: _InFlight, status: int, duration: float) -> None:
+        scope = flight.scope
+        entry = SlowRequest(time.time() - duration, scope)
+        route = scope.get("route")
+        if route is not None:
+            entry.route = route.path
+        entry.params = {
+            k: v if v is None or isinstance(v, (str, int, float, bool)) else str(v)
+            for k, v in scope.get("path_params", {}).items()
+        }
+        entry.status = status
+        entry.duration = duration
+        timings = scope.get(TIMINGS_KEY)
+        if timings is not None:
+            entry.timings = timings.milliseconds()
+        entry.stack = flight.stack
+        self.entries.append(entry)
+
+
+def add_slow_log(
+    app: Pathium,
+    path: Optional[str] = "/_slow",
+    secret: Optional[str] = None,
+    header: str = "x-slow-log",
+    **options: Any,
+) -> SlowRequestLog:
+    """Record slow requests of `app` and serve them at `path` (newest first).
+
+    The route is only mounted with a `secret`, and answers 403 unless the
+    request's `header` carries it; without one, read `log.entries` in
+    process. Keyword arguments go to `SlowRequestLog`. The watchdog runs
+    between the app's startup and shutdown.
+    """
+    log = SlowRequestLog(**options)
+    app.use(log.middleware)
+    app.on_startup(log.start)
+    app.on_shutdown(log.stop)
+    if path is None or secret is None:
+        return log
+
+    token = secret.encode()
+    name = header.lower().encode()
+
+    async def _slow_handler(req: Request):
+        for key, value in req.scope.get("headers", ()):
+            if key == name and hmac.compare_digest(value, token):
+                return Response.json([entry.as_dict() for entry in reversed(log.entries)])
+        raise HTTPError(403, "Forbidden")
+
+    app.get(path)(_slow_handler)
+    return log
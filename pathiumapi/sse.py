@@ -0,0 +1,193 @@
+"""Server-Sent Events (`text/event-stream`) responses.
+
+`EventSourceResponse` streams events to a browser `EventSource`, sending a
+keep-alive comment whenever the stream is idle for `ping` seconds so proxies
+do not time the connection out. Reconnecting clients send the id of the
+last event they saw in `Last-Event-ID`; with a `ReplayBuffer` the response
+first replays the buffered events after that id, then continues live.
+
+Example:
+
+    events = ReplayBuffer(max_events=500)
+    hub = Broadcast()
+
+    async def publish(data):
+        # assigns the next id; the encoded frame is shared by all clients
+        event = events.append(data, event="update")
+        await hub.publish("dashboard", event.encode().decode())
+
+    @app.get("/dashboard/stream")
+    async def stream(last_event_id: Optional[str] = Header(None)):
+        async def live():
+            async with hub.subscribe("dashboard") as sub:
+                async for msg in sub:
+                    yield msg.bytes
+        return EventSourceResponse(live(), replay=events, last_event_id=last_event_id)
+
+Publishing the frame text works with any `Broadcast` backend, since only
+text crosses a broker. Pre-encoded frames keep their `id:` line, which is
+used to skip events the client already got from the replay buffer.
+"""
+import asyncio
+import json
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Deque, Iterable, List, Optional, Tuple
+
+from ._core import StreamingResponse, _iterate
+
+PING = b": ping\n\n"
+
+
+class ServerSentEvent:
+    """A single SSE frame.
+
+    `data` may be a string or any JSON-serializable object. The wire
+    encoding is computed once and cached, so an event shared by many
+    streams is formatted only once.
+    """
+    __slots__ = ("data", "event", "id", "retry", "_encoded")
+
+    def __init__(self, data: Any = "", event: Optional[str] = None, id: Optional[str] = None, retry: Optional[int] = None):
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+        self._encoded: Optional[bytes] = None
+
+    def encode(self) -> bytes:
+        if self._encoded is None:
+            data = self.data if isinstance(self.data, str) else json.dumps(self.data)
+            parts = []
+            if self.id is not None:
+                parts.append(f"id: {self.id}\n")
+            if self.event is not None:
+                parts.append(f"event: {self.event}\n")
+            if self.retry is not None:
+                parts.append(f"retry: {self.retry}\n")
+            for line in data.splitlines() or [""]:
+                parts.append(f"data: {line}\n")
+            parts.append("\n")
+            self._encoded = "".join(parts).encode()
+        return self._encoded
+
+
+def _parse_id(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _event_id(item: Any) -> Optional[int]:
+    if isinstance(item, (bytes, bytearray)):
+        # a pre-encoded frame; `ServerSentEvent.encode()` puts the id first
+        if item.startswith(b"id: "):
+            return _parse_id(bytes(item[4:item.find(b"\n")]))
+        return None
+    return _parse_id(getattr(item, "id", None))
+
+
+class ReplayBuffer:
+    """Bounded history of recent events for `Last-Event-ID` resume.
+
+    `append()` assigns increasing integer ids. Only the newest `max_events`
+    are kept; a client that was away longer resumes from the oldest
+    buffered event.
+    """
+    def __init__(self, max_events: int = 1000):
+        self._events: Deque[ServerSentEvent] = deque(maxlen=max_events)
+        self._next_id = 1
+
+    def append(self, data: Any, event: Optional[str] = None) -> ServerSentEvent:
+        """Record a new event and return it (with its id) for publishing."""
+        sse = ServerSentEvent(data, event=event, id=str(self._next_id))
+        self._next_id += 1
+        self._events.append(sse)
+        return sse
+
+    def since(self, last_event_id: Optional[str]) -> List[ServerSentEvent]:
+        """Return buffered events newer than `last_event_id`."""
+        last = _parse_id(last_event_id)
+        if last is None or not self._events or last >= self._next_id - 1:
+            return []
+        return [e for e in self._events if int(e.id) > last]  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+def _encode(item: Any) -> bytes:
+    if isinstance(item, ServerSentEvent):
+        return item.encode()
+    if isinstance(item, (bytes, bytearray)):
+        return bytes(item)  # pre-formatted frame
+    return ServerSentEvent(item).encode()
+
+
+class EventSourceResponse(StreamingResponse):
+    """Stream `content` to the client as Server-Sent Events.
+
+    Args:
+        content: async or plain iterable of `ServerSentEvent`s, strings or
+            JSON-serializable objects (sent as `data:`), or pre-encoded bytes.
+        ping: seconds of inactivity before a keep-alive comment is sent
+            (`None` disables it).
+        replay: a `ReplayBuffer` to resume from.
+        last_event_id: the client's `Last-Event-ID` header; buffered events
+            after it are sent first and live events up to it are skipped.
+        retry: reconnection delay hint for the client, in milliseconds.
+    """
+    def __init__(
+        self,
+        content: AsyncIterable[Any] | Iterable[Any],
+        ping: Optional[float] = 15.0,
+        replay: Optional[ReplayBuffer] = None,
+        last_event_id: Optional[str] = None,
+        retry: Optional[int] = None,
+        status: int = 200,
+        headers: Optional[List[Tuple[str, str]]] = None,
+        background: Any = None,
+    ):
+        headers = list(headers or [])
+        headers += [("cache-control", "no-cache"), ("x-accel-buffering", "no")]
+        super().__init__(content, status=status, headers=headers, media_type="text/event-stream", background=background)
+        self.ping = ping
+        self.replay = replay
+        self.last_event_id = last_event_id
+        self.retry = retry
+
+    async def chunks(self) -> AsyncIterator[bytes]:  # type: ignore[override]
+        if self.retry is not None:
+            yield f"retry: {self.retry}\n\n".encode()
+        last = _parse_id(self.last_event_id)
+        if self.replay is not None and last is not None:
+            for event in self.replay.since(self.last_event_id):
+                yield event.encode()
+                last = int(event.id)  # type: ignore[arg-type]
+
+        items = _iterate(self.body_iterator)
+        try:
+            nxt: Optional[asyncio.Future] = None
+            while True:
+                if nxt is None:
+                    nxt = asyncio.ensure_future(items.__anext__())
+                done, _ = await asyncio.wait({nxt}, timeout=self.ping)
+                if not done:
+                    yield PING
+                    continue
+                try:
+                    item = nxt.result()
+                except StopAsyncIteration:
+                    return
+                nxt = None
+                if last is not None:
+                    # already replayed from the buffer
+                    event_id = _event_id(item)
+                    if event_id is not None and event_id <= last:
+                        continue
+                yield _encode(item)
+        finally:
+            if nxt is not None:
+                nxt.cancel()
+                await asyncio.gather(nxt, return_exceptions=True)
+            await items.aclose()
@@ -0,0 +1,846 @@
+"""Testing helpers: in-process test clients and a pytest plugin.
+
+`TestClient` calls an ASGI app directly, without sockets or a server:
+
+    from pathiumapi.testing import TestClient
+
+    with TestClient(app) as client:          # runs startup/shutdown hooks
+        r = client.post("/items", json={"name": "pen"})
+        assert r.status_code == 201 and r.json()["name"] == "pen"
+
+        with client.stream("GET", "/events") as r:
+            first = next(r.iter_lines())
+
+        with client.websocket_connect("/ws/lobby") as ws:
+            ws.send_text("hi")
+            assert ws.receive_json()["text"] == "hi"
+
+The sync client drives the app on an event loop in a background thread, so
+state bound to a loop (pools, queues, background tasks) lives across calls.
+`AsyncClient` has the same API as coroutines for use inside async tests.
+Without `with`, no lifespan events are sent.
+
+Enable the pytest plugin in a `conftest.py`:
+
+    pytest_plugins = ["pathiumapi.testing"]
+
+and use the `perf_budget` fixture to guard a hot path against throughput
+regressions:
+
+    def test_item_lookup_is_fast(perf_budget):
+        perf_budget(lambda: app.router.find("GET", "/items/1"))
+
+`perf_budget` takes plain functions or coroutine functions (an ASGI call,
+for example).
+
+`pytest --perf-update` records the throughput in `perf_baseline.json` next
+to the test module (commit it); later runs fail when it drops more than the
+tolerance (20% by default) below the baseline, and a scenario without a
+baseline fails rather than recording one. Throughput is stored normalised
+by a fixed reference micro-benchmark measured alongside it, so a baseline
+recorded on a laptop holds on a slower CI machine. Baselines from another
+Python version are skipped rather than compared.
+
+Options: `--perf-update` (re-)records the baselines, `--perf-tolerance 0.3`
+changes the default tolerance and `--perf-baseline PATH` uses a single
+baseline file.
+"""
+import asyncio
+import contextlib
+import gc
+import inspect
+import json
+import os
+import platform
+import statistics
+import threading
+from pathlib import Path
+from typing import (
+    Any, AsyncIterator, Callable, Coroutine, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar, Union,
+)
+from urllib.parse import unquote, urlencode, urlsplit
+
+from .bench import measure, measure_async
+from .websockets import WebSocketDisconnect
+
+try:
+    import pytest
+except ImportError:  # pragma: no cover - pytest is a test-time dependency
+    pytest = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+Headers = List[Tuple[bytes, bytes]]
+_MISSING: Any = object()
+_CLOSE_TIMEOUT = 5.0
+
+
+def _header_dict(raw: Headers) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    for name, value in raw:
+        key, text = name.decode("latin-1").lower(), value.decode("latin-1")
+        headers[key] = f"{headers[key]}, {text}" if key in headers else text
+    return headers
+
+
+def _charset(headers: Mapping[str, str]) -> str:
+    for part in headers.get("content-type", "").split(";")[1:]:
+        key, _, value = part.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip('"')
+    return "utf-8"
+
+
+async def _race(aw: Coroutine[Any, Any, T], task: "asyncio.Future[Any]") -> T:
+    """Await `aw`, re-raising the application's error if `task` ends first."""
+    fut = asyncio.ensure_future(aw)
+    done, _ = await asyncio.wait({fut, task}, return_when=asyncio.FIRST_COMPLETED)
+    if fut in done:
+        return fut.result()
+    fut.cancel()
+    task.result()
+    raise RuntimeError("the application returned without sending the expected message")
+
+
+async def _next(queue: "asyncio.Queue[T]", task: "asyncio.Future[Any]") -> T:
+    if not queue.empty():
+        return queue.get_nowait()
+    return await _race(queue.get(), task)
+
+
+async def _finish(task: "asyncio.Future[Any]", cancel: bool) -> None:
+    """Wait for the application task to end, cancelling it if asked or stuck."""
+    if not cancel:
+        await asyncio.wait({task}, timeout=_CLOSE_TIMEOUT)
+    if not task.done():
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        return
+    task.result()
+
+
+class TestResponse:
+    """A response read in full: `status_code`, `headers`, `content`, `text`, `json()`.
+
+    `headers` has lower-cased names, repeated headers joined with ", ";
+    `raw_headers` keeps the ASGI list.
+    """
+    __test__ = False
+
+    def __init__(self, status_code: int, raw_headers: Headers, content: bytes):
+        self.status_code = status_code
+        self.raw_headers = raw_headers
+        self.headers = _header_dict(raw_headers)
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(_charset(self.headers))
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def __repr__(self) -> str:
+        return f"<TestResponse [{self.status_code}]>"
+
+
+class _Exchange:
+    """The client side of one HTTP request: in-memory `receive` and `send`."""
+
+    def __init__(self, body: List[bytes], maxsize: int = 0):
+        self.body = body
+        self.status: Optional[int] = None
+        self.headers: Headers = []
+        self.chunks: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize)
+        self.started = asyncio.Event()
+        # set when the response is complete or the client stopped reading
+        self.done = asyncio.Event()
+
+    async def receive(self) -> Dict[str, Any]:
+        if self.body:
+            return {"type": "http.request", "body": self.body.pop(0), "more_body": bool(self.body)}
+        await self.done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            if self.status is not None:
+                raise RuntimeError("http.response.start sent twice")
+            self.status = message["status"]
+            self.headers = list(message.get("headers", ()))
+            self.started.set()
+        elif message["type"] == "http.response.body":
+            if self.status is None:
+                raise RuntimeError("http.response.body sent before http.response.start")
+            if self.done.is_set():
+                return
+            body = message.get("body", b"")
+            if body:
+                await self.chunks.put(body)
+            if not message.get("more_body", False):
+                self.done.set()
+                await self.chunks.put(None)
+
+
+class StreamResponse:
+    """A response whose body is read as it is sent (`AsyncClient.stream`)."""
+
+    def __init__(self, exchange: _Exchange, task: "asyncio.Future[Any]"):
+        self._exchange = exchange
+        self._task = task
+        self.status_code: int = exchange.status  # type: ignore[assignment]
+        self.raw_headers = exchange.headers
+        self.headers = _header_dict(exchange.headers)
+        self.complete = False
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        if self.complete:
+            return None
+        chunk = await _next(self._exchange.chunks, self._task)
+        if chunk is None:
+            self.complete = True
+        return chunk
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self._next_chunk()
+            if chunk is None:
+                return
+            yield chunk
+
+    async def iter_lines(self) -> AsyncIterator[str]:
+        buffer = ""
+        async for chunk in self.iter_bytes():
+            buffer += chunk.decode(_charset(self.headers))
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+        if buffer:
+            yield buffer
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.iter_bytes()])
+
+
+class WebSocketSession:
+    """The client end of a WebSocket opened by `AsyncClient.websocket_connect`.
+
+    `receive*()` raise `WebSocketDisconnect` when the app closes the socket.
+    """
+
+    def __init__(
+        self,
+        task: "asyncio.Future[Any]",
+        to_app: "asyncio.Queue[Dict[str, Any]]",
+        from_app: "asyncio.Queue[Dict[str, Any]]",
+        accept: Dict[str, Any],
+    ):
+        self._task = task
+        self._to_app = to_app
+        self._from_app = from_app
+        self.subprotocol: Optional[str] = accept.get("subprotocol")
+        self.headers = _header_dict(list(accept.get("headers", ())))
+        self.closed = False
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        await self._to_app.put(message)
+
+    async def send_text(self, data: str) -> None:
+        await self.send({"type": "websocket.receive", "text": data})
+
+    async def send_bytes(self, data: bytes) -> None:
+        await self.send({"type": "websocket.receive", "bytes": data})
+
+    async def send_json(self, data: Any) -> None:
+        await self.send_text(json.dumps(data))
+
+    async def receive(self) -> Dict[str, Any]:
+        """Return the next raw `websocket.send` message from the app."""
+        message = await _next(self._from_app, self._task)
+        if message["type"] == "websocket.close":
+            self.closed = True
+            raise WebSocketDisconnect(message.get("code", 1000), message.get("reason") or "")
+        return message
+
+    async def receive_text(self) -> str:
+        message = await self.receive()
+        if message.get("text") is None:
+            raise TypeError("expected a text message, got bytes")
+        return message["text"]
+
+    async def receive_bytes(self) -> bytes:
+        message = await self.receive()
+        if message.get("bytes") is None:
+            raise TypeError("expected a binary message, got text")
+        return message["bytes"]
+
+    async def receive_json(self) -> Any:
+        message = await self.receive()
+        return json.loads(message["text"] if message.get("text") is not None else message["bytes"])
+
+    async def close(self, code: int = 1000) -> None:
+        """Disconnect and wait for the app's handler to finish."""
+        if not self.closed:
+            self.closed = True
+            await self._to_app.put({"type": "websocket.disconnect", "code": code})
+        await _finish(self._task, cancel=False)
+
+
+class AsyncClient:
+    """Send requests straight to an ASGI app, as coroutines.
+
+    Args:
+        app: the ASGI application.
+        base_url: scheme, host and port reported to the app.
+        headers: default headers for every request.
+        raise_server_exceptions: re-raise errors escaping the app from
+            `request()`; when False they become a plain 500 response, as a
+            server would send.
+        client: the `(host, port)` peer address in the scope.
+
+    `async with AsyncClient(app)` sends the lifespan startup and shutdown
+    events.
+    """
+    def __init__(
+        self,
+        app: Callable[..., Any],
+        base_url: str = "http://testserver",
+        headers: Optional[Mapping[str, str]] = None,
+        raise_server_exceptions: bool = True,
+        client: Tuple[str, int] = ("testclient", 50000),
+    ):
+        self.app = app
+        url = urlsplit(base_url)
+        self.scheme = url.scheme or "http"
+        self.host = url.hostname or "testserver"
+        self.port = url.port or (443 if self.scheme == "https" else 80)
+        self.root_path = url.path.rstrip("/")
+        self.headers = dict(headers or {})
+        self.raise_server_exceptions = raise_server_exceptions
+        self.client = client
+        self._lifespan: Optional["asyncio.Future[Any]"] = None
+        self._lifespan_in: "asyncio.Queue[Dict[str, Any]]"
+        self._lifespan_out: "asyncio.Queue[Dict[str, Any]]"
+
+    async def __aenter__(self) -> "AsyncClient":
+        await self.startup()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.shutdown()
+
+    async def startup(self) -> None:
+        """Send `lifespan.startup`; raises `RuntimeError` if the app reports failure.
+
+        Apps that do not speak the lifespan protocol are tolerated.
+        """
+        self._lifespan_in, self._lifespan_out = asyncio.Queue(), asyncio.Queue()
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        task = asyncio.ensure_future(self.app(scope, self._lifespan_in.get, self._lifespan_out.put))
+        await self._lifespan_in.put({"type": "lifespan.startup"})
+        try:
+            message = await _next(self._lifespan_out, task)
+        except Exception:
+            return  # no lifespan support
+        self._lifespan = task
+        if message["type"] == "lifespan.startup.failed":
+            await _finish(task, cancel=False)
+            self._lifespan = None
+            raise RuntimeError(f"application startup failed: {message.get('message', '')}")
+
+    async def shutdown(self) -> None:
+        """Send `lifespan.shutdown` if startup ran; raises `RuntimeError` on failure."""
+        task, self._lifespan = self._lifespan, None
+        if task is None:
+            return
+        await self._lifespan_in.put({"type": "lifespan.shutdown"})
+        message = await _next(self._lifespan_out, task)
+        await _finish(task, cancel=False)
+        if message["type"] == "lifespan.shutdown.failed":
+            raise RuntimeError(f"application shutdown failed: {message.get('message', '')}")
+
+    def _scope(self, kind: str, path: str, params: Optional[Mapping[str, Any]], headers: Dict[str, str]) -> Dict[str, Any]:
+        path, _, query = path.partition("?")
+        if params:
+            query = "&".join(q for q in (query, urlencode(params, doseq=True)) if q)
+        host = self.host if self.port in (80, 443) else f"{self.host}:{self.port}"
+        merged = {"host": host, **{k.lower(): v for k, v in self.headers.items()}}
+        merged.update((k.lower(), v) for k, v in headers.items())
+        scheme = self.scheme if kind == "http" else {"http": "ws", "https": "wss"}.get(self.scheme, self.scheme)
+        return {
+            "type": kind,
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "scheme": scheme,
+            "path": unquote(self.root_path + path),
+            "raw_path": (self.root_path + path).encode(),
+            "query_string": query.encode(),
+            "root_path": self.root_path,
+            "headers": [(k.encode("latin-1"), str(v).encode("latin-1")) for k, v in merged.items()],
+            "client": self.client,
+            "server": (self.host, self.port),
+        }
+
+    def _http_scope(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Mapping[str, Any]],
+        headers: Optional[Mapping[str, str]],
+        json_body: Any,
+        content: Union[None, str, bytes, Iterable[bytes]],
+    ) -> Tuple[Dict[str, Any], List[bytes]]:
+        extra = dict(headers or {})
+        if json_body is not _MISSING:
+            chunks = [json.dumps(json_body).encode()]
+            extra.setdefault("content-type", "application/json")
+        elif content is None:
+            chunks = [b""]
+        elif isinstance(content, str):
+            chunks = [content.encode()]
+        elif isinstance(content, (bytes, bytearray)):
+            chunks = [bytes(content)]
+        else:
+            chunks = [bytes(c) for c in content] or [b""]
+        if len(chunks) > 1:
+            extra.setdefault("transfer-encoding", "chunked")
+        elif chunks[0] or method.upper() in ("POST", "PUT", "PATCH"):
+            extra.setdefault("content-length", str(len(chunks[0])))
+        scope = self._scope("http", path, params, extra)
+        scope["method"] = method.upper()
+        return scope, chunks
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        json: Any = _MISSING,
+        content: Union[None, str, bytes, Iterable[bytes]] = None,
+    ) -> TestResponse:
+        """Send one request and read the whole response.
+
+        `json` is encoded as the body; otherwise `content` is sent as is (an
+        iterable of bytes is sent in several `http.request` messages).
+        """
+        scope, body = self._http_scope(method, path, params, headers, json, content)
+        exchange = _Exchange(body)
+        try:
+            await self.app(scope, exchange.receive, exchange.send)
+        except Exception:
+            if self.raise_server_exceptions:
+                raise
+            if exchange.status is None:
+                return TestResponse(500, [(b"content-type", b"text/plain; charset=utf-8")], b"Internal Server Error")
+        if exchange.status is None:
+            raise RuntimeError("the application returned without sending a response")
+        exchange.done.set()
+        chunks = []
+        while not exchange.chunks.empty():
+            chunk = exchange.chunks.get_nowait()
+            if chunk is not None:
+                chunks.append(chunk)
+        return TestResponse(exchange.status, exchange.headers, b"".join(chunks))
+
+    async def get(self, path: str, **kwargs: Any) -> TestResponse:
+        return await self.request("GET", path, **kwargs)
+
+    async def head(self, path: str, **kwargs: Any) -> TestResponse:
+        return await self.request("HEAD", path, **kwargs)
+
+    async def options(self, path: str, **kwargs: Any) -> TestResponse:
+        return await self.request("OPTIONS", path, **kwargs)
+
+    async def post(self, path: str, **kwargs: Any) -> TestResponse:
+        return await self.request("POST", path, **kwargs)
+
+    async def put(self, path: str, **kwargs: Any) -> TestResponse:
+        return await self.request("PUT", path, **kwargs)
+
+    async def patch(self, path: str, **kwargs: Any) -> TestResponse:
+        return await self.request("PATCH", path, **kwargs)
+
+    async def delete(self, path: str, **kwargs: Any) -> TestResponse:
+        return await self.request("DELETE", path, **kwargs)
+
+    @contextlib.asynccontextmanager
+    async def stream(self, method: str, path: str, **kwargs: Any) -> AsyncIterator[StreamResponse]:
+        """Send a request and read the body as the app sends it.
+
+        Takes the same arguments as `request()`. The app is held back until
+        each chunk is read. Leaving the block before the body is complete
+        disconnects the client and cancels the app; errors from the app
+        are always raised.
+        """
+        scope, body = self._http_scope(
+            method, path, kwargs.pop("params", None), kwargs.pop("headers", None),
+            kwargs.pop("json", _MISSING), kwargs.pop("content", None),
+        )
+        if kwargs:
+            raise TypeError(f"unexpected arguments: {', '.join(kwargs)}")
+        exchange = _Exchange(body, maxsize=1)
+        task = asyncio.ensure_future(self.app(scope, exchange.receive, exchange.send))
+        try:
+            await _race(exchange.started.wait(), task)
+        except BaseException:
+            await _finish(task, cancel=True)
+            raise
+        response = StreamResponse(exchange, task)
+        try:
+            yield response
+        finally:
+            complete = exchange.done.is_set()
+            exchange.done.set()
+            await _finish(task, cancel=not complete)
+
+    @contextlib.asynccontextmanager
+    async def websocket_connect(
+        self,
+        path: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        subprotocols: Optional[List[str]] = None,
+    ) -> AsyncIterator[WebSocketSession]:
+        """Open a WebSocket; raises `WebSocketDisconnect` if the app rejects it.
+
+        The socket is disconnected (code 1000) when the block exits.
+        """
+        scope = self._scope("websocket", path, params, dict(headers or {}))
+        scope["subprotocols"] = list(subprotocols or [])
+        to_app: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        from_app: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        to_app.put_nowait({"type": "websocket.connect"})
+        task = asyncio.ensure_future(self.app(scope, to_app.get, from_app.put))
+        try:
+            message = await _next(from_app, task)
+        except BaseException:
+            await _finish(task, cancel=True)
+            raise
+        if message["type"] == "websocket.close":
+            await _finish(task, cancel=False)
+            raise WebSocketDisconnect(message.get("code", 1000), message.get("reason") or "")
+        session = WebSocketSession(task, to_app, from_app, message)
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+class _SyncStream:
+    """`StreamResponse` with blocking methods, for `TestClient.stream`."""
+
+    def __init__(self, response: StreamResponse, call: Callable[[Any], Any]):
+        self._response = response
+        self._call = call
+        self.status_code = response.status_code
+        self.raw_headers = response.raw_headers
+        self.headers = response.headers
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._call(self._response._next_chunk())
+            if chunk is None:
+                return
+            yield chunk
+
+    def iter_lines(self) -> Iterator[str]:
+        buffer = ""
+        for chunk in self.iter_bytes():
+            buffer += chunk.decode(_charset(self.headers))
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+        if buffer:
+            yield buffer
+
+    def read(self) -> bytes:
+        return b"".join(self.iter_bytes())
+
+
+class _SyncWebSocket:
+    """`WebSocketSession` with blocking methods, for `TestClient.websocket_connect`."""
+
+    def __init__(self, session: WebSocketSession, call: Callable[[Any], Any]):
+        self._session = session
+        self._call = call
+        self.subprotocol = session.subprotocol
+        self.headers = session.headers
+
+    def send(self, message: Dict[str, Any]) -> None:
+        self._call(self._session.send(message))
+
+    def send_text(self, data: str) -> None:
+        self._call(self._session.send_text(data))
+
+    def send_bytes(self, data: bytes) -> None:
+        self._call(self._session.send_bytes(data))
+
+    def send_json(self, data: Any) -> None:
+        self._call(self._session.send_json(data))
+
+    def receive(self) -> Dict[str, Any]:
+        return self._call(self._session.receive())
+
+    def receive_text(self) -> str:
+        return self._call(self._session.receive_text())
+
+    def receive_bytes(self) -> bytes:
+        return self._call(self._session.receive_bytes())
+
+    def receive_json(self) -> Any:
+        return self._call(self._session.receive_json())
+
+    def close(self, code: int = 1000) -> None:
+        self._call(self._session.close(code))
+
+
+class TestClient:
+    """Blocking client for an ASGI app; takes the same arguments as `AsyncClient`.
+
+    The app runs on an event loop in a background thread, started on first
+    use and stopped by `close()` (or leaving a `with` block, which also
+    runs the lifespan events).
+    """
+    __test__ = False
+
+    def __init__(self, app: Callable[..., Any], **options: Any):
+        self.aclient = AsyncClient(app, **options)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _call(self, coro: Coroutine[Any, Any, T]) -> T:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="pathium-test-client", daemon=True)
+            self._thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self) -> None:
+        """Stop the loop thread, cancelling anything still running on it."""
+        loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()  # type: ignore[union-attr]
+        pending = asyncio.all_tasks(loop)
+        if pending:
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.wait(pending))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+    def __enter__(self) -> "TestClient":
+        self._call(self.aclient.startup())
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        try:
+            self._call(self.aclient.shutdown())
+        finally:
+            self.close()
+
+    def request(self, method: str, path: str, **kwargs: Any) -> TestResponse:
+        """See `AsyncClient.request`."""
+        return self._call(self.aclient.request(method, path, **kwargs))
+
+    def get(self, path: str, **kwargs: Any) -> TestResponse:
+        return self.request("GET", path, **kwargs)
+
+    def head(self, path: str, **kwargs: Any) -> TestResponse:
+        return self.request("HEAD", path, **kwargs)
+
+    def options(self, path: str, **kwargs: Any) -> TestResponse:
+        return self.request("OPTIONS", path, **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> TestResponse:
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path: str, **kwargs: Any) -> TestResponse:
+        return self.request("PUT", path, **kwargs)
+
+    def patch(self, path: str, **kwargs: Any) -> TestResponse:
+        return self.request("PATCH", path, **kwargs)
+
+    def delete(self, path: str, **kwargs: Any) -> TestResponse:
+        return self.request("DELETE", path, **kwargs)
+
+    @contextlib.contextmanager
+    def stream(self, method: str, path: str, **kwargs: Any) -> Iterator[_SyncStream]:
+        """See `AsyncClient.stream`."""
+        cm = self.aclient.stream(method, path, **kwargs)
+        response = self._call(cm.__aenter__())
+        try:
+            yield _SyncStream(response, self._call)
+        finally:
+            self._call(cm.__aexit__(None, None, None))
+
+    @contextlib.contextmanager
+    def websocket_connect(self, path: str, **kwargs: Any) -> Iterator[_SyncWebSocket]:
+        """See `AsyncClient.websocket_connect`."""
+        cm = self.aclient.websocket_connect(path, **kwargs)
+        session = self._call(cm.__aenter__())
+        try:
+            yield _SyncWebSocket(session, self._call)
+        finally:
+            self._call(cm.__aexit__(None, None, None))
+
+
+DEFAULT_TOLERANCE = 0.20
+_REPEAT = 3
+
+
+def _reference_work() -> None:
+    # dict/str/int churn plus a small JSON encode: the kind of interpreter
+    # work a request handler does
+    d = {f"k{i}": i * 2 for i in range(32)}
+    "-".join(d)
+    json.dumps(d)
+    sorted(d.values(), reverse=True)
+
+
+def _ops(fn: Callable[[], Any], min_time: float) -> float:
+    if inspect.iscoroutinefunction(fn):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(measure_async(fn, min_time))["ops_per_sec"]
+        raise RuntimeError(
+            "perf_budget measures coroutine functions on its own event loop and cannot run "
+            "inside one; use it from a synchronous test"
+        )
+    return measure(fn, min_time)["ops_per_sec"]
+
+
+def _python() -> str:
+    return ".".join(platform.python_version_tuple()[:2])
+
+
+class BudgetExceeded(AssertionError):
+    """Raised when a scenario is slower than its baseline allows."""
+
+
+class MissingBaseline(AssertionError):
+    """Raised when a scenario has no baseline and recording is off."""
+
+
+class PerfBudget:
+    """Measure scenarios and compare them with a baseline file.
+
+    Args:
+        baseline: path of the JSON baseline file.
+        tolerance: allowed fractional throughput drop.
+        update: record new baselines instead of comparing. Without it a
+            scenario missing from the file raises `MissingBaseline`.
+        min_time: seconds per measurement. The reference benchmark and the
+            scenario are measured back to back in three rounds with the
+            garbage collector paused; the median per-round ratio is kept.
+    """
+    def __init__(
+        self,
+        baseline: Union[str, Path],
+        tolerance: float = DEFAULT_TOLERANCE,
+        update: bool = False,
+        min_time: float = 0.2,
+    ):
+        self.baseline = Path(baseline)
+        self.tolerance = tolerance
+        self.update = update
+        self.min_time = min_time
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.baseline.read_text())
+        except FileNotFoundError:
+            return {}
+
+    def _save(self, name: str, entry: Dict[str, Any]) -> None:
+        data = self._load()
+        data[name] = entry
+        tmp = self.baseline.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+        os.replace(tmp, self.baseline)
+
+    def measure(self, fn: Callable[[], Any]) -> Tuple[float, float]:
+        """Return `fn`'s best ops/sec and its median ratio to the reference."""
+        best = 0.0
+        ratios = []
+        enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(_REPEAT):
+                reference = _ops(_reference_work, self.min_time)
+                ops = _ops(fn, self.min_time)
+                best = max(best, ops)
+                ratios.append(ops / reference)
+        finally:
+            if enabled:
+                gc.enable()
+        return best, statistics.median(ratios)
+
+    def check(self, name: str, fn: Callable[[], Any], tolerance: Optional[float] = None) -> Dict[str, Any]:
+        """Measure `fn`; record it as `name` or compare with its baseline.
+
+        Returns the measurement. Raises `BudgetExceeded` on a regression and
+        `MissingBaseline` when `name` has no baseline and `update` is off.
+        """
+        tolerance = self.tolerance if tolerance is None else tolerance
+        old = self._load().get(name)
+        if old is None and not self.update:
+            raise MissingBaseline(
+                f"{name}: no baseline in {self.baseline}; run with --perf-update to record one"
+            )
+        ops, normalized = self.measure(fn)
+        entry = {"ops_per_sec": ops, "normalized": normalized, "python": _python()}
+        if self.update:
+            self._save(name, entry)
+            return dict(entry, status="recorded")
+        if old.get("python") != entry["python"]:
+            return dict(entry, status="skipped", reason=f"baseline recorded on Python {old.get('python')}")
+        ratio = entry["normalized"] / old["normalized"]
+        if ratio < 1.0 - tolerance:
+            raise BudgetExceeded(
+                f"{name}: {ops:,.0f} ops/s is {1.0 - ratio:.0%} below its baseline "
+                f"(normalised {entry['normalized']:.4f} vs {old['normalized']:.4f}, "
+                f"tolerance {tolerance:.0%}); rerun with --perf-update if this is expected"
+            )
+        return dict(entry, status="ok", ratio=ratio)
+
+
+if pytest is not None:
+    def pytest_addoption(parser: Any) -> None:
+        group = parser.getgroup("pathiumapi", "PathiumAPI performance budgets")
+        group.addoption("--perf-update", action="store_true", default=False,
+                        help="Record perf_budget baselines instead of comparing")
+        group.addoption("--perf-tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed throughput drop for perf_budget (default: 0.2)")
+        group.addoption("--perf-baseline", default=None,
+                        help="Baseline file (default: perf_baseline.json next to each test module)")
+
+    @pytest.fixture
+    def perf_budget(request: Any) -> Callable[..., Dict[str, Any]]:
+        """Check a callable's throughput against the stored baseline.
+
+        Call it as `perf_budget(fn, name=None, tolerance=None)`; the name
+        defaults to the test's node id. Skips the test when the baseline was
+        recorded on another Python version.
+        """
+        config = request.config
+        path = config.getoption("perf_baseline", None) or request.path.parent / "perf_baseline.json"
+        budget = PerfBudget(
+            path,
+            tolerance=config.getoption("perf_tolerance", DEFAULT_TOLERANCE),
+            update=config.getoption("perf_update", False),
+        )
+
+        def check(fn: Callable[[], Any], name: Optional[str] = None, tolerance: Optional[float] = None) -> Dict[str, Any]:
+            result = budget.check(name or request.node.nodeid, fn, tolerance)
+            if result["status"] == "skipped":
+                pytest.skip(result["reason"])
+            return result
+
+        return check
@@ -0,0 +1,136 @@
+"""Per-phase request timing (`Pathium(server_timing=True)` / `on_timing=`).
+
+When enabled, every HTTP request gets a `Timings` record at
+`scope["timings"]`. The app fills it with `time.perf_counter_ns()` spans for:
+
+- `routing`: `Router.find`
+- `read`: waiting for request body chunks
+- `validate`: extracting and validating the handler's parameters
+- `handler`: the handler itself, excluding body reads
+- `serialize`: turning the handler's return value into a `Response` and
+  encoding the headers (JSON built by `Response.json()` inside the handler
+  counts as `handler`)
+- `send`: handing the response to the server
+- `mw.<name>`: each middleware layer's own time, excluding the layers and
+  the endpoint inside it
+
+With `server_timing=True` the phases known when the response starts are
+sent as a `Server-Timing` header, where `mw.<name>` is the time each layer
+spent before passing the request on and `total` is the time to the first
+response byte. `on_timing(scope, timings)` is called once the request is
+done, with every phase complete.
+
+When neither option is set the middleware stack and call plans are the
+untimed ones, so the only cost is a `scope.get()` in the endpoint.
+"""
+from time import perf_counter_ns
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# scope key holding the request's `Timings`
+TIMINGS_KEY = "timings"
+
+App = Callable[[Dict[str, Any], Any, Any], Awaitable[None]]
+
+
+class Timings:
+    """Phase durations for one request, in nanoseconds.
+
+    `phases` maps phase name to accumulated nanoseconds, in the order the
+    phases first ran; `total` is set once the request is done.
+    """
+    __slots__ = ("start", "phases", "total", "layers")
+
+    def __init__(self) -> None:
+        self.start = perf_counter_ns()
+        self.phases: Dict[str, int] = {}
+        self.total = 0
+        # [name, entered, left] per timed layer, outermost first; the
+        # endpoint is the last layer and has an empty name
+        self.layers: List[List[Any]] = []
+
+    def add(self, name: str, ns: int) -> None:
+        self.phases[name] = self.phases.get(name, 0) + ns
+
+    def since(self, name: str, start: int) -> None:
+        """Add the time elapsed since `start` (a `perf_counter_ns()` value)."""
+        self.phases[name] = self.phases.get(name, 0) + perf_counter_ns() - start
+
+    def enter(self, name: str) -> List[Any]:
+        entry = [name, perf_counter_ns(), 0]
+        self.layers.append(entry)
+        return entry
+
+    def leave(self, entry: List[Any]) -> None:
+        entry[2] = perf_counter_ns()
+
+    def finish(self) -> None:
+        """Record each middleware layer's own time and the request total."""
+        layers = self.layers
+        for i, (name, entered, left) in enumerate(layers):
+            if not name:
+                continue
+            own = left - entered
+            if i + 1 < len(layers):
+                inner = layers[i + 1]
+                own -= inner[2] - inner[1]
+            self.add("mw." + name, own)
+        self.total = perf_counter_ns() - self.start
+
+    def milliseconds(self) -> Dict[str, float]:
+        """`phases` converted to milliseconds."""
+        return {name: ns / 1e6 for name, ns in self.phases.items()}
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value for the phases recorded so far."""
+        parts = []
+        layers = self.layers
+        for outer, inner in zip(layers, layers[1:]):
+            if outer[0]:
+                parts.append(f"mw.{outer[0]};dur={(inner[1] - outer[1]) / 1e6:.3f}")
+        for name, ns in self.phases.items():
+            parts.append(f"{name};dur={ns / 1e6:.3f}")
+        parts.append(f"total;dur={(perf_counter_ns() - self.start) / 1e6:.3f}")
+        return ", ".join(parts)
+
+    def timed_receive(self, receive: Callable[[], Awaitable[Dict[str, Any]]]) -> Callable[[], Awaitable[Dict[str, Any]]]:
+        async def receive_timed() -> Dict[str, Any]:
+            start = perf_counter_ns()
+            try:
+                return await receive()
+            finally:
+                self.since("read", start)
+        return receive_timed
+
+    def timed_send(self, send: Callable[[Dict[str, Any]], Awaitable[None]]) -> Callable[[Dict[str, Any]], Awaitable[None]]:
+        async def send_timed(msg: Dict[str, Any]) -> None:
+            start = perf_counter_ns()
+            try:
+                await send(msg)
+            finally:
+                self.since("send", start)
+        return send_timed
+
+
+def middleware_name(mw: Any) -> str:
+    """Short name for a middleware in timings (`cors_middleware_factory(...)` -> `cors`)."""
+    name = getattr(mw, "__qualname__", None) or type(mw).__qualname__
+    name = name.split(".<locals>")[0]
+    for suffix in ("_factory", "_middleware", ".middleware"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    return name.lower() or "middleware"
+
+
+def timed_layer(name: str, app: App) -> App:
+    """Wrap one layer of the middleware stack so its time is recorded."""
+    async def layer(scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        timings: Optional[Timings] = scope.get(TIMINGS_KEY)
+        if timings is None:
+            await app(scope, receive, send)
+            return
+        entry = timings.enter(name)
+        try:
+            await app(scope, receive, send)
+        finally:
+            timings.leave(entry)
+    return layer
@@ -2,16 +2,38 @@
 
 Provides a minimal `validate_body` decorator to validate JSON request bodies
 into a Pydantic model instance. Validation is lazy and works with both Pydantic
-v1 and v2 by detecting the available API.
+v1 and v2 by detecting the available API. The decorators only mark handlers;
+the validation itself runs in the per-route call plan (see `params.py`).
 """
-from typing import Any, Callable
-from functools import wraps
+from typing import Any, AsyncIterator, Callable, Dict, List, get_type_hints
+from functools import lru_cache
+
+from ._core import HTTPError
+from .openapi_pydantic import referenced_models, sequence_item_model
 
 try:
     from pydantic import BaseModel  # type: ignore
 except Exception:  # pragma: no cover - runtime import
     BaseModel = None  # type: ignore
 
+try:
+    from pydantic import TypeAdapter  # type: ignore
+except Exception:  # pragma: no cover - Pydantic v1 or missing
+    TypeAdapter = None  # type: ignore
+
+
+class RequestValidationError(HTTPError):
+    """Raised when a request payload does not validate against its model.
+
+    `errors` is a list of `{"loc", "msg", "type"}` dicts. Errors raised for
+    bulk (list) payloads also carry the zero-based `index` of the failing
+    item. The errors are used as the `detail` of the 422 response.
+    """
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(422, "Validation error")
+        self.errors = errors
+        self.detail = errors  # type: ignore[assignment]
+
 
 def validate_data(model: type, data: Any):
     """Validate `data` against `model` (Pydantic BaseModel subclass).
@@ -33,11 +55,214 @@ def validate_data(model: type, data: Any):
     return model(**(data or {}))
 
 
-def validate_body(model: type) -> Callable:
+def _format_errors(exc: Exception, bulk: bool, offset: int = 0) -> List[Dict[str, Any]]:
+    """Convert a Pydantic ValidationError into JSON-serializable dicts."""
+    errors: List[Dict[str, Any]] = []
+    for err in exc.errors():  # type: ignore[attr-defined]
+        loc = list(err.get("loc", ()))
+        # Pydantic v1 prefixes errors of custom root types with `__root__`
+        if loc and loc[0] == "__root__":
+            loc = loc[1:]
+        entry: Dict[str, Any] = {"loc": loc, "msg": err.get("msg", ""), "type": err.get("type", "")}
+        if bulk and loc and isinstance(loc[0], int):
+            entry["index"] = loc[0] + offset
+            entry["loc"] = loc[1:]
+        errors.append(entry)
+    return errors
+
+
+@lru_cache(maxsize=None)
+def body_validator(model: Any) -> Callable[[bytes], Any]:
+    """Return a callable validating raw JSON bytes against `model`.
+
+    `model` is a Pydantic model or a `list[Model]` / `Sequence[Model]` /
+    `tuple[Model, ...]` form. Bulk bodies are validated in a single call into
+    Pydantic's core (`TypeAdapter.validate_json` on v2) instead of one
+    `validate_data` call per item. Validators are built once per model and
+    cached. An empty body or JSON `null` is validated as `{}` (or `[]`).
+    The callable raises `RequestValidationError` on invalid input.
+    """
+    if BaseModel is None:
+        raise RuntimeError("pydantic is not installed")
+    from pydantic import ValidationError  # type: ignore
+
+    item = sequence_item_model(model)
+    bulk = item is not None
+    if not bulk and not (isinstance(model, type) and issubclass(model, BaseModel)):
+        raise RuntimeError("model must be a Pydantic BaseModel subclass or a sequence of one")
+    empty = b"[]" if bulk else b"{}"
+
+    if TypeAdapter is not None:
+        parse = model.model_validate_json if not bulk else TypeAdapter(model).validate_json
+    elif bulk:
+        from pydantic import parse_raw_as  # type: ignore
+
+        def parse(raw: bytes) -> Any:
+            return parse_raw_as(model, raw)
+    else:
+        parse = model.parse_raw
+
+    def validate(raw: bytes) -> Any:
+        if len(raw) <= 8 and raw.strip() in (b"", b"null"):
+            raw = empty  # no body, or JSON null: validate an empty object/list
+        try:
+            return parse(raw)
+        except ValidationError as exc:
+            raise RequestValidationError(_format_errors(exc, bulk)) from None
+
+    return validate
+
+
+async def iter_ndjson(
+    req: Any,
+    model: type,
+    chunk_size: int = 1000,
+) -> AsyncIterator[List[Any]]:
+    """Validate an NDJSON request body into lists of `model` instances.
+
+    The body is consumed incrementally via `Request.stream()` and validated
+    in batches of up to `chunk_size` lines, so memory stays bounded by the
+    batch size rather than the body size. Raises `RequestValidationError`
+    with indices relative to the whole stream on the first invalid batch.
+    """
+    validate = body_validator(List[model])  # type: ignore[valid-type]
+    pending = bytearray()
+    lines: List[bytes] = []
+    offset = 0
+
+    def flush() -> List[Any]:
+        nonlocal offset
+        try:
+            items = validate(b"[" + b",".join(lines) + b"]")
+            if len(items) != len(lines):
+                # a line held more than one JSON value; validate one by one
+                raise RequestValidationError([])
+        except RequestValidationError as exc:
+            errors = [e for e in exc.errors if "index" in e]
+            if not errors:
+                # malformed JSON has no item location: pinpoint the bad lines
+                single = body_validator(model)
+                for i, line in enumerate(lines):
+                    try:
+                        single(line)
+                    except RequestValidationError as line_exc:
+                        errors.extend(dict(e, index=i) for e in line_exc.errors)
+            for e in errors:
+                e["index"] += offset
+            raise RequestValidationError(errors) from None
+        offset += len(lines)
+        lines.clear()
+        return items
+
+    async for chunk in req.stream():
+        pending.extend(chunk)
+        end = pending.rfind(b"\n")
+        if end < 0:
+            continue
+        complete = bytes(pending[:end])
+        del pending[:end + 1]
+        for line in complete.split(b"\n"):
+            line = line.strip()
+            if line:
+                lines.append(line)
+                if len(lines) >= chunk_size:
+                    yield flush()
+
+    tail = bytes(pending).strip()
+    if tail:
+        lines.append(tail)
+    if lines:
+        yield flush()
+
+
+@lru_cache(maxsize=None)
+def query_validator(model: type) -> Callable[[Dict[str, str]], Any]:
+    """Return a callable validating a query parameter dict against `model`.
+
+    The callable raises `RequestValidationError` with `query`-prefixed
+    locations on invalid input.
+    """
+    if BaseModel is None:
+        raise RuntimeError("pydantic is not installed")
+    from pydantic import ValidationError  # type: ignore
+
+    def validate(params: Dict[str, str]) -> Any:
+        try:
+            return validate_data(model, params)
+        except ValidationError as exc:
+            errors = _format_errors(exc, bulk=False)
+            for e in errors:
+                e["loc"] = ["query"] + e["loc"]
+            raise RequestValidationError(errors) from None
+
+    return validate
+
+
+def warm_validators(handler: Callable) -> int:
+    """Build and cache every validator `handler` uses; returns how many.
+
+    Covers the `validate_body` / `validate_query` markers, Pydantic model
+    annotations injected as the body and the `response_model` marker.
+    """
+    if BaseModel is None:
+        return 0
+    bodies: List[Any] = []
+    queries: List[Any] = []
+    body = getattr(handler, "__validated_model__", None)
+    if body is not None:
+        if getattr(handler, "__validated_media_type__", None) == "application/x-ndjson":
+            bodies.append(List[body])  # type: ignore[valid-type]
+        bodies.append(body)
+    query = getattr(handler, "__validated_query_model__", None)
+    if query is not None:
+        queries.append(query)
+    try:
+        hints = get_type_hints(handler)
+    except Exception:
+        hints = getattr(handler, "__annotations__", {})
+    resp = getattr(handler, "__response_model__", None)
+    for name, typ in list(hints.items()) + [("return", resp)]:
+        if typ is not query and referenced_models(typ):
+            bodies.append(typ)
+    built = 0
+    for model in bodies:
+        try:
+            body_validator(model)
+            built += 1
+        except (RuntimeError, TypeError):
+            pass
+    for model in queries:
+        query_validator(model)
+        built += 1
+    return built
+
+
+def _recompile_routes(func: Callable) -> None:
+    # Support decorators stacked above `@app.get(...)`: routes already
+    # registered for `func` recompile their call plan with the new markers.
+    for route in getattr(func, "__pathium_routes__", ()):
+        route.prepare()
+
+
+def validate_body(model: Any, ndjson: bool = False, chunk_size: int = 1000) -> Callable:
     """Decorator to validate request JSON body into `model`.
 
-    The decorated handler will receive the validated model instance as the
-    second positional argument after `req`.
+    The decorated handler will receive the validated model instance in the
+    parameter annotated with `model`, or else the first parameter after `req`.
+    The decorator only marks the handler; validation happens in the call plan
+    `Pathium.route()` compiles, so it may be stacked above or below the route
+    decorator.
+
+    `model` may also be `list[Model]`, `Sequence[Model]` or `tuple[Model, ...]`
+    for bulk endpoints: the whole array is validated from the raw body bytes
+    in one call and invalid payloads produce a 422 response whose `detail`
+    lists the failing item `index` for every error.
+
+    With `ndjson=True` the body is read as newline-delimited JSON objects of
+    `model` and the handler receives an async iterator yielding lists of up
+    to `chunk_size` validated items, keeping memory bounded for large
+    uploads. Items from earlier chunks may already have been processed when
+    a later chunk fails validation.
 
     Example:
 
@@ -46,18 +271,22 @@ def validate_body(model: type) -> Callable:
         async def create(req, item: ItemModel):
             return Response.json(item.model_dump())
 
+        @app.post('/items/bulk')
+        @validate_body(list[ItemModel])
+        async def create_many(req, items: list[ItemModel]):
+            return Response.json({"created": len(items)})
+
     """
     def decorator(func: Callable):
-        @wraps(func)
-        async def wrapper(req, *args, **kwargs):
-            data = await req.json()
-            obj = validate_data(model, data or {})
-            return await func(req, obj, *args, **kwargs)
-
-        # expose the validated model on the wrapper so tooling (e.g., OpenAPI)
-        # can detect the request body model for schema generation
-        setattr(wrapper, "__validated_model__", model)
-        return wrapper
+        # `Pathium.route()` reads these markers when it compiles the handler's
+        # call plan, so no wrapper coroutine is needed; tooling (e.g. OpenAPI)
+        # reads them to document the request body.
+        setattr(func, "__validated_model__", model)
+        if ndjson:
+            setattr(func, "__validated_media_type__", "application/x-ndjson")
+            setattr(func, "__validated_chunk_size__", chunk_size)
+        _recompile_routes(func)
+        return func
 
     return decorator
 
@@ -78,19 +307,13 @@ def response_model(model: type) -> Callable:
 def validate_query(model: type) -> Callable:
     """Decorator to validate query parameters into a Pydantic model instance.
 
-    The decorated handler will receive the validated model instance as a
-    positional argument after `req`. The wrapper will also expose
-    `__validated_query_model__` for tooling.
+    The decorated handler will receive the validated model instance in the
+    parameter annotated with `model` (or the first parameter after `req`).
+    The handler also exposes `__validated_query_model__` for tooling.
     """
     def decorator(func: Callable):
-        @wraps(func)
-        async def wrapper(req, *args, **kwargs):
-            # query_params is a dict[str,str]
-            data = req.query_params
-            obj = validate_data(model, data or {})
-            return await func(req, obj, *args, **kwargs)
-
-        setattr(wrapper, "__validated_query_model__", model)
-        return wrapper
+        setattr(func, "__validated_query_model__", model)
+        _recompile_routes(func)
+        return func
 
     return decorator
@@ -0,0 +1,123 @@
+"""WebSocket connections for `@app.websocket(...)` routes.
+
+WebSocket routes share the HTTP router and path syntax:
+
+    @app.websocket("/ws/{room}")
+    async def chat(ws: WebSocket, room: str):
+        await ws.accept()
+        async for text in ws.iter_text():
+            await ws.send_text(f"{room}: {text}")
+
+Handlers receive the `WebSocket` (annotated, or as the first parameter) plus
+path, query and header parameters like HTTP handlers do.
+"""
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from ._core import HTTPConnection, Receive, Scope, Send
+
+
+class WebSocketDisconnect(Exception):
+    """Raised by `WebSocket.receive*()` when the client has disconnected."""
+    def __init__(self, code: int = 1000, reason: str = ""):
+        self.code = code
+        self.reason = reason
+        super().__init__(f"WebSocket disconnected with code {code}")
+
+
+class WebSocket(HTTPConnection):
+    """A server-side WebSocket connection (ASGI `websocket` scope).
+
+    Call `accept()` before sending or receiving. `receive_*()` raise
+    `WebSocketDisconnect` once the client goes away; the framework closes the
+    socket when the handler returns.
+    """
+    def __init__(self, scope: Scope, receive: Receive, send: Send):
+        assert scope["type"] == "websocket"
+        super().__init__(scope)
+        self._receive = receive
+        self._send = send
+        self.connected = False
+        self.closed = False
+
+    async def accept(
+        self,
+        subprotocol: Optional[str] = None,
+        headers: Optional[List[Tuple[str, str]]] = None,
+    ) -> None:
+        msg = await self._receive()
+        if msg["type"] != "websocket.connect":
+            raise RuntimeError(f"Expected websocket.connect, got {msg['type']}")
+        accept: Dict[str, Any] = {"type": "websocket.accept", "subprotocol": subprotocol}
+        if headers:
+            accept["headers"] = [(k.lower().encode(), v.encode()) for k, v in headers]
+        await self._send(accept)
+        self.connected = True
+
+    async def receive(self) -> Dict[str, Any]:
+        """Return the next raw `websocket.receive` message."""
+        if self.closed:
+            raise WebSocketDisconnect(1006)
+        msg = await self._receive()
+        if msg["type"] == "websocket.disconnect":
+            self.closed = True
+            raise WebSocketDisconnect(msg.get("code", 1000), msg.get("reason") or "")
+        return msg
+
+    async def receive_text(self) -> str:
+        msg = await self.receive()
+        if msg.get("text") is not None:
+            return msg["text"]
+        return (msg.get("bytes") or b"").decode()
+
+    async def receive_bytes(self) -> bytes:
+        msg = await self.receive()
+        if msg.get("bytes") is not None:
+            return msg["bytes"]
+        return (msg.get("text") or "").encode()
+
+    async def receive_json(self) -> Any:
+        msg = await self.receive()
+        data = msg["text"] if msg.get("text") is not None else msg.get("bytes") or b""
+        return json.loads(data)
+
+    async def iter_text(self) -> AsyncIterator[str]:
+        """Yield text messages until the client disconnects."""
+        try:
+            while True:
+                yield await self.receive_text()
+        except WebSocketDisconnect:
+            return
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                yield await self.receive_bytes()
+        except WebSocketDisconnect:
+            return
+
+    async def iter_json(self) -> AsyncIterator[Any]:
+        try:
+            while True:
+                yield await self.receive_json()
+        except WebSocketDisconnect:
+            return
+
+    async def send_text(self, data: str) -> None:
+        await self._send({"type": "websocket.send", "text": data})
+
+    async def send_bytes(self, data: bytes) -> None:
+        await self._send({"type": "websocket.send", "bytes": data})
+
+    async def send_json(self, data: Any, binary: bool = False) -> None:
+        text = json.dumps(data)
+        if binary:
+            await self.send_bytes(text.encode())
+        else:
+            await self.send_text(text)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        if self.closed:
+            return
+        self.closed = True
+        await self._send({"type": "websocket.close", "code": code, "reason": reason})
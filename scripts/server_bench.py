@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Requests/sec of the built-in server against a reference ASGI server.
+
+Usage:
+  python scripts/server_bench.py [--connections 50] [--duration 10] [--servers builtin,uvicorn]
+
+Each server runs the same small Pathium app in its own process; the load
+generator opens `--connections` keep-alive connections and sends requests
+back to back (one in flight per connection) for `--duration` seconds per
+endpoint. Servers that are not installed are skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+ENDPOINTS = {
+    "plaintext": b"GET /plaintext HTTP/1.1\r\nhost: bench\r\n\r\n",
+    "json": b"GET /json HTTP/1.1\r\nhost: bench\r\n\r\n",
+    "echo": b"POST /echo HTTP/1.1\r\nhost: bench\r\ncontent-length: 64\r\n\r\n" + b"x" * 64,
+}
+
+
+def make_app():
+    from pathiumapi import Pathium, Response
+
+    app = Pathium()
+
+    @app.get("/plaintext")
+    async def plaintext(req):
+        return Response("Hello, World!")
+
+    @app.get("/json")
+    async def json_(req):
+        return Response.json({"message": "Hello, World!"})
+
+    @app.post("/echo")
+    async def echo(req):
+        return Response(await req.body())
+
+    return app
+
+
+def _serve(server: str, port: int) -> None:
+    import logging
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    if server == "builtin":
+        from pathiumapi.server import run
+        run(app, port=port)
+    elif server == "uvicorn":
+        import uvicorn
+        uvicorn.run(app, port=port, log_level="error", access_log=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), 0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+async def _read_response(reader: asyncio.StreamReader) -> None:
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line[:15].lower() == b"content-length:":
+            length = int(line[15:])
+    if length:
+        await reader.readexactly(length)
+
+
+async def _connection(port: int, request: bytes, deadline: float, counts: List[int]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.monotonic() < deadline:
+            writer.write(request)
+            await _read_response(reader)
+            counts[0] += 1
+    finally:
+        writer.close()
+
+
+async def _load(port: int, request: bytes, connections: int, duration: float) -> float:
+    counts = [0]
+    deadline = time.monotonic() + duration
+    start = time.monotonic()
+    await asyncio.gather(*(_connection(port, request, deadline, counts) for _ in range(connections)))
+    return counts[0] / (time.monotonic() - start)
+
+
+def _available(server: str) -> bool:
+    if server == "builtin":
+        return True
+    try:
+        __import__(server)
+        return True
+    except ImportError:
+        return False
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--servers", default="builtin,uvicorn")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for server in args.servers.split(","):
+        if not _available(server):
+            print(f"skipping {server}: not installed")
+            continue
+        port = _free_port()
+        proc = multiprocessing.Process(target=_serve, args=(server, port), daemon=True)
+        proc.start()
+        try:
+            _wait_for(port)
+            results[server] = {}
+            for name, request in ENDPOINTS.items():
+                asyncio.run(_load(port, request, args.connections, 1.0))  # warm up
+                rps = asyncio.run(_load(port, request, args.connections, args.duration))
+                results[server][name] = rps
+        finally:
+            proc.terminate()
+            proc.join()
+
+    width = max(len(s) for s in results) if results else 8
+    print(f"{'server':<{width}}  " + "  ".join(f"{n:>12}" for n in ENDPOINTS))
+    for server, row in results.items():
+        print(f"{server:<{width}}  " + "  ".join(f"{row[n]:>10.0f}/s" for n in ENDPOINTS))
+
+
+if __name__ == "__main__":
+    main()
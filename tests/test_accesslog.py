@@ -0,0 +1,79 @@
+import io
+import json
+import threading
+
+from pathiumapi import Pathium
+from pathiumapi.accesslog import AccessLog, add_access_log
+from pathiumapi.testing import TestClient
+
+
+def _app(**options):
+    app = Pathium()
+    log = add_access_log(app, **options)
+
+    @app.get("/items/{id:int}")
+    async def item(req, id: int):
+        return {"id": id}
+
+    return app, log
+
+
+def test_json_lines_written_in_batches():
+    out = io.StringIO()
+    app, log = _app(sink=out, batch_size=2, flush_interval=10)
+    with TestClient(app, client=("10.0.0.1", 5000)) as client:  # shutdown flushes the log
+        client.get("/items/1?x=1")
+        client.get("/missing")
+    first, second = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert first["route"] == "/items/{id:int}" and first["status"] == 200
+    assert first["query"] == "x=1" and first["bytes"] == len(b'{"id": 1}')
+    assert first["client"] == "10.0.0.1" and first["latency_ms"] >= 0
+    assert second["route"] is None and second["status"] == 404
+    assert log.written == 2 and log.dropped == 0
+
+
+def test_common_log_format(tmp_path):
+    path = tmp_path / "access.log"
+    app, log = _app(sink=str(path), format="common")
+    with TestClient(app, client=("10.0.0.1", 5000)) as client:
+        client.get("/items/7?page=2")
+    line = path.read_text()
+    assert line.startswith("10.0.0.1 - - [")
+    assert line.endswith('] "GET /items/7?page=2 HTTP/1.1" 200 9\n')
+
+
+def test_common_log_format_escapes_request_fields():
+    out = io.StringIO()
+    app, log = _app(sink=out, format="common")
+    with TestClient(app) as client:
+        # the path reaches the log percent-decoded: a newline, quotes, a backslash
+        client.get('/x%0a1.2.3.4%20-%20-%20%22GET%20/%5C?q="1"')
+    (line,) = out.getvalue().splitlines()
+    assert line.endswith('] "GET /x\\x0a1.2.3.4 - - \\"GET /\\\\?q=\\"1\\" HTTP/1.1" 404 9')
+
+
+class _StalledSink(io.StringIO):
+    """A sink whose writes block until `release` is set."""
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.writing.set()
+        assert self.release.wait(5)
+        return super().write(text)
+
+
+def test_full_queue_drops_entries():
+    sink = _StalledSink()
+    log = AccessLog(sink=sink, max_queue=2, flush_interval=0.01)
+    entry = (0.0, "", "GET", "/", b"", "1.1", None, 200, 0, 0.0)
+    log.record(entry)
+    assert sink.writing.wait(5)  # the writer took it and is now stuck
+    for _ in range(5):
+        log.record(entry)
+    assert log.dropped == 3
+    sink.release.set()
+    log.close()
+    assert log.written == 3 and len(sink.getvalue().splitlines()) == 3
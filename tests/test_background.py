@@ -0,0 +1,100 @@
+import asyncio
+
+from pathiumapi import BackgroundQueue, BackgroundTasks, Pathium, Response
+from pathiumapi.testing import AsyncClient, TestClient
+
+
+def _record_sends(sent):
+    def middleware(app):
+        async def inner(scope, receive, send):
+            async def recording(msg):
+                sent.append(msg["type"])
+                await send(msg)
+            await app(scope, receive, recording)
+        return inner
+    return middleware
+
+
+def test_tasks_run_after_response_body_is_sent():
+    app = Pathium()
+    sent = []
+    app.use(_record_sends(sent))
+
+    def audit(name):
+        sent.append(f"audit:{name}")
+
+    async def warm(name):
+        sent.append(f"warm:{name}")
+
+    @app.get("/injected")
+    async def injected(req, tasks: BackgroundTasks):
+        tasks.add_task(audit, "a")
+        return "ok"
+
+    @app.get("/attached")
+    async def attached(req):
+        tasks = BackgroundTasks()
+        tasks.add_task(warm, "b")
+        return Response("ok", background=tasks)
+
+    with TestClient(app) as client:
+        client.get("/injected")
+        client.get("/attached")
+    assert sent == [
+        "http.response.start", "http.response.body", "audit:a",
+        "http.response.start", "http.response.body", "warm:b",
+    ]
+
+
+def test_background_queue_bounds_and_drains():
+    app = Pathium(background_queue=BackgroundQueue(max_size=2, workers=1))
+    done = []
+
+    async def job(i):
+        await asyncio.sleep(0.01)
+        done.append(i)
+
+    @app.get("/jobs/{i:int}")
+    async def create(req, i: int, tasks: BackgroundTasks):
+        tasks.add_task(job, i)
+        return "queued"
+
+    async def _test():
+        client = AsyncClient(app)
+        await asyncio.gather(*[client.get(f"/jobs/{i}") for i in range(5)])
+        assert await app.drain_background(timeout=1)
+
+    asyncio.run(_test())
+    assert sorted(done) == [0, 1, 2, 3, 4]
+
+
+def test_background_tasks_do_not_inherit_the_request_deadline():
+    from pathiumapi.deadlines import time_remaining
+
+    seen = []
+
+    async def record(label):
+        seen.append((label, time_remaining()))
+
+    for queue in (None, BackgroundQueue(workers=1)):
+        app = Pathium(background_queue=queue)
+
+        @app.get("/timed", timeout=0.01)
+        async def timed(req, tasks: BackgroundTasks):
+            tasks.add_task(record, "timed")
+            return "ok"
+
+        @app.get("/untimed")
+        async def untimed(req, tasks: BackgroundTasks):
+            tasks.add_task(record, "untimed")
+            return "ok"
+
+        async def _test():
+            client = AsyncClient(app)
+            await client.get("/timed")
+            await asyncio.sleep(0.02)
+            await client.get("/untimed")
+            await app.drain_background(1)
+
+        asyncio.run(_test())
+    assert seen == [("timed", None), ("untimed", None)] * 2
@@ -0,0 +1,44 @@
+import json
+
+from pathiumapi import bench, cli
+
+
+def test_run_benchmarks_reports_ops_and_percentiles():
+    report = bench.run_benchmarks(filter="router/10/", min_time=0.01)
+    assert set(report["results"]) == {"router/10/static_hit", "router/10/dynamic_hit", "router/10/miss"}
+    for result in report["results"].values():
+        assert result["ops_per_sec"] > 0 and result["batches"] >= 5
+        assert 0 < result["batch_p50_ns"] <= result["batch_p99_ns"]
+    assert report["meta"]["python"]
+
+
+def test_every_suite_runs():
+    names = [name for suite in bench.SUITES for name, _ in suite()]
+    assert "middleware/all" in names and "validate/100" in names and "openapi/50_routes" in names
+    report = bench.run_benchmarks(filter="middleware/all", min_time=0.01)
+    assert report["results"]["middleware/all"]["ops"] > 0
+
+
+def test_compare_flags_regressions():
+    old = {"results": {"a": {"ops_per_sec": 100.0, "batch_p99_ns": 10}, "b": {"ops_per_sec": 100.0, "batch_p99_ns": 10}}}
+    new = {"results": {
+        "a": {"ops_per_sec": 95.0, "batch_p99_ns": 10}, "b": {"ops_per_sec": 80.0, "batch_p99_ns": 20}, "c": {},
+    }}
+    rows, regressions = bench.compare(old, new, threshold=0.1)
+    assert [r["name"] for r in rows] == ["a", "b"]
+    assert regressions == ["b"]
+    assert rows[1]["batch_p99_change"] == 1.0
+
+
+def test_cli_bench_writes_report_and_compares(tmp_path, capsys):
+    out = tmp_path / "now.json"
+    baseline = tmp_path / "base.json"
+    baseline.write_text(json.dumps({"meta": {}, "results": {"router/10/miss": {"ops_per_sec": 1e12, "batch_p99_ns": 1}}}))
+    try:
+        cli.main(["bench", "--filter", "router/10/miss", "--min-time", "0.01", "-o", str(out), "--compare", str(baseline)])
+    except SystemExit as exc:
+        assert exc.code == 1
+    else:
+        raise AssertionError("expected a regression exit")
+    assert "router/10/miss" in json.loads(out.read_text())["results"]
+    assert "REGRESSION" in capsys.readouterr().err
@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+from pathiumapi import Broadcast
+from pathiumapi.broadcast import BroadcastBackend, LocalBrokerBackend, SubscriptionClosed, serve_broker
+
+
+def test_publish_fans_out_one_encoded_message():
+    async def main():
+        hub = Broadcast()
+        async with hub.subscribe("room") as a, hub.subscribe("room") as b, hub.subscribe("other") as c:
+            await hub.publish("room", {"n": 1})
+            ma, mb = await a.get(), await b.get()
+            assert ma is mb
+            assert ma.text == '{"n": 1}' and ma.bytes is mb.bytes
+            assert not c._items
+        assert hub.stats()["topics"] == {}
+
+    asyncio.run(main())
+
+
+def test_overflow_policies():
+    async def main():
+        hub = Broadcast(max_queue=2)
+        async with hub.subscribe("t") as oldest, \
+                hub.subscribe("t", policy="drop_newest") as newest, \
+                hub.subscribe("t", policy="disconnect") as slow:
+            for i in range(3):
+                await hub.publish("t", i)
+            assert [m.data for m in (await oldest.get(), await oldest.get())] == [1, 2]
+            assert [m.data for m in (await newest.get(), await newest.get())] == [0, 1]
+            assert oldest.dropped == newest.dropped == 1
+            with pytest.raises(SubscriptionClosed) as exc:
+                await slow.get()
+            assert exc.value.slow_consumer
+            assert hub.stats()["topics"]["t"]["subscribers"] == 2
+
+    asyncio.run(main())
+
+
+def test_local_broker_relays_between_hubs():
+    async def main():
+        server = await serve_broker("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        one = Broadcast(LocalBrokerBackend(port=port))
+        two = Broadcast(LocalBrokerBackend(port=port))
+        await one.connect()
+        await two.connect()
+        async with two.subscribe("news") as sub:
+            await asyncio.sleep(0.05)  # let the broker register the subscription
+            await one.publish("news", "hello\nworld")
+            msg = await asyncio.wait_for(sub.get(), 2)
+            assert msg.text == "hello\nworld"
+        await one.disconnect()
+        await two.disconnect()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(main())
+
+
+def test_local_broker_resubscribe_and_data():
+    async def main():
+        server = await serve_broker("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        one = Broadcast(LocalBrokerBackend(port=port))
+        two = Broadcast(LocalBrokerBackend(port=port), policy="disconnect", max_queue=1)
+        await one.connect()
+        await two.connect()
+        async with two.subscribe("news"):
+            pass
+        # re-subscribing at once must not be undone by the previous UNSUB
+        async with two.subscribe("news") as sub:
+            await asyncio.sleep(0.05)
+            await one.publish("news", {"id": 1})
+            msg = await asyncio.wait_for(sub.get(), 2)
+            assert msg.data == {"id": 1} and msg.text == '{"id": 1}'
+            await one.publish("news", "plain text")
+            assert (await asyncio.wait_for(sub.get(), 2)).data == "plain text"
+            # a slow consumer is dropped from delivery...
+            await one.publish("news", 1)
+            await one.publish("news", 2)
+            await asyncio.sleep(0.05)
+        assert sub.slow_consumer
+        # ...and the topic can be subscribed again right away
+        async with two.subscribe("news") as again:
+            await asyncio.sleep(0.05)
+            await one.publish("news", 3)
+            assert (await asyncio.wait_for(again.get(), 2)).data == 3
+        await one.disconnect()
+        await two.disconnect()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(main())
+
+
+def test_backends_must_implement_the_interface():
+    class Partial(BroadcastBackend):
+        async def connect(self, deliver):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_local_broker_reconnects_after_a_malformed_frame(caplog):
+    async def main():
+        server = await serve_broker("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        hub = Broadcast(LocalBrokerBackend(port=port, reconnect_delay=0.01))
+        await hub.connect()
+        async with hub.subscribe("news") as sub:
+            await asyncio.sleep(0.05)
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"PUB news 2\n\xff\xfe")  # relayed as is: not UTF-8
+            await writer.drain()
+            await asyncio.sleep(0.1)
+            await hub.publish("news", {"id": 1})
+            assert (await asyncio.wait_for(sub.get(), 2)).data == {"id": 1}
+            writer.close()
+        await hub.disconnect()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(main())
+    assert "malformed frame" in caplog.text
+
+
+def test_broker_disconnects_subscribers_that_stop_reading():
+    async def main():
+        server = await serve_broker("127.0.0.1", 0, max_buffer=64 * 1024)
+        port = server.sockets[0].getsockname()[1]
+        reader, stalled = await asyncio.open_connection("127.0.0.1", port)
+        stalled.write(b"SUB news 0\n")
+        _, publisher = await asyncio.open_connection("127.0.0.1", port)
+        publisher.write(b"SUB other 0\n")
+        payload = b"x" * 65536
+        for _ in range(200):  # ~13 MB, more than the socket buffers hold
+            publisher.write(b"PUB news %d\n" % len(payload) + payload)
+            await publisher.drain()
+        received = 0
+        try:
+            while chunk := await asyncio.wait_for(reader.read(1 << 20), 2):
+                received += len(chunk)
+        except ConnectionError:
+            pass
+        publisher.close()
+        stalled.close()
+        server.close()
+        await server.wait_closed()
+        return received
+
+    assert asyncio.run(main()) < 200 * 65536
@@ -0,0 +1,110 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from pathiumapi import HTTPError, Pathium, Request, Response
+from pathiumapi.concurrency import ProcessPool, ThreadPool
+from pathiumapi.testing import AsyncClient, TestClient
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def test_sync_handler_runs_on_thread_pool_with_context():
+    app = Pathium()
+    loop_thread = threading.get_ident()
+
+    @app.get("/items/{id:int}")
+    def get_item(req, id: int):
+        return {"id": id, "off_loop": threading.get_ident() != loop_thread, "rid": request_id.get()}
+
+    async def _test():
+        request_id.set("abc")
+        return await AsyncClient(app).get("/items/5")
+
+    r = asyncio.run(_test())
+    assert r.status_code == 200
+    assert r.content == b'{"id": 5, "off_loop": true, "rid": "abc"}'
+    assert app.thread_pool.stats()["completed"] == 1
+
+
+def test_bounded_pool_rejects_when_queue_full():
+    app = Pathium()
+    pool = ThreadPool(max_workers=1, queue_limit=1)
+
+    @app.get("/slow", executor=pool)
+    def slow(req):
+        time.sleep(0.05)
+        return "done"
+
+    async def _test():
+        client = AsyncClient(app)
+        return await asyncio.gather(*[client.get("/slow") for _ in range(3)])
+
+    statuses = sorted(r.status_code for r in asyncio.run(_test()))
+    assert statuses == [200, 200, 503]
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["wait_max_seconds"] > 0
+    pool.shutdown()
+
+
+def _render(size: int, blob: bytes):
+    # module-level so it can be pickled into the worker process
+    return Response(blob.upper() * size, media_type="application/octet-stream")
+
+
+def test_process_executor_runs_handler_and_returns_large_body():
+    pool = ProcessPool(max_workers=1, shm_threshold=1024, timeout=10)
+    app = Pathium(process_pool=pool)
+    app.post("/render/{size:int}", executor="process")(_render)
+    pool.warm()
+    try:
+        with TestClient(app) as client:
+            r = client.post("/render/2", content=b"ab" * 1024)
+        assert r.status_code == 200
+        assert r.content == b"AB" * 2048
+    finally:
+        pool.shutdown()
+
+
+def test_process_executor_rejects_request_parameter():
+    app = Pathium()
+
+    async def handler(req: Request):
+        return "nope"
+
+    with pytest.raises(TypeError):
+        app.get("/bad", executor="process")(handler)
+
+
+def _sleep(seconds: float, blob: bytes):
+    time.sleep(seconds)
+    return len(blob)
+
+
+def test_process_timeouts_keep_their_slot_until_the_worker_finishes():
+    pool = ProcessPool(max_workers=1, queue_limit=0, shm_threshold=16, timeout=0.05)
+    pool.warm()
+
+    async def _test():
+        with pytest.raises(HTTPError) as exc:
+            await pool.run(_sleep, 0.5, b"x" * 64)
+        assert exc.value.status == 504
+        # the abandoned call still occupies the only worker
+        assert pool.stats()["pending"] == 1
+        with pytest.raises(HTTPError) as exc:
+            await pool.run(_sleep, 0, b"")
+        assert exc.value.status == 503
+        deadline = time.monotonic() + 5
+        while pool.pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        # the slot (and the argument's shared memory) is released only now
+        assert pool.stats()["completed"] == 1
+        assert await pool.run(_sleep, 0, b"y" * 64) == 64
+
+    try:
+        asyncio.run(_test())
+    finally:
+        pool.shutdown()
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+from pathiumapi import Pathium
+from pathiumapi.deadlines import deadline_from_headers, deadline_headers, parse_grpc_timeout, time_remaining
+from pathiumapi.testing import TestClient
+
+
+def _app(**options):
+    app = Pathium(**options)
+    cancelled = []
+
+    @app.get("/sleep/{seconds:float}")
+    async def sleep(req, seconds: float):
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            cancelled.append(seconds)
+            raise
+        return {"remaining": time_remaining()}
+
+    @app.get("/fast", timeout=5.0)
+    async def fast(req):
+        return {"remaining": time_remaining(), "headers": deadline_headers()}
+
+    @app.get("/timeout-error")
+    async def timeout_error(req):
+        raise TimeoutError  # the handler's own, not the deadline
+
+    return app, cancelled
+
+
+def test_app_and_route_timeouts():
+    app, cancelled = _app(timeout=0.05)
+    with TestClient(app) as client:
+        r = client.get("/sleep/1")
+        assert (r.status_code, r.json()) == (504, {"detail": "Request timed out"})
+        assert cancelled == [1.0]
+        r = client.get("/fast")
+        assert r.status_code == 200 and 4 < r.json()["remaining"] <= 5
+        assert r.json()["headers"]["grpc-timeout"].endswith("m")
+        assert client.get("/timeout-error").status_code == 500
+
+
+def test_incoming_deadline_headers():
+    app, _ = _app()
+    with TestClient(app) as client:
+        r = client.get("/sleep/0", headers={"grpc-timeout": "200m"})
+        assert r.status_code == 200 and 0 < r.json()["remaining"] <= 0.2
+        r = client.get("/sleep/0", headers={"x-request-deadline": str(time.time() - 1)})
+        assert (r.status_code, r.json()) == (504, {"detail": "Deadline exceeded"})
+        assert client.get("/sleep/0").json() == {"remaining": None}
+        for bad in ("nan", "inf", "-inf", "1e400", "soon"):
+            assert deadline_from_headers([(b"x-request-deadline", bad.encode())]) is None
+            r = client.get("/sleep/0", headers={"x-request-deadline": bad})
+            assert (r.status_code, r.json()) == (200, {"remaining": None})
+
+
+def test_parse_grpc_timeout():
+    assert parse_grpc_timeout("2S") == 2.0
+    assert parse_grpc_timeout("1500u") == 0.0015
+    assert parse_grpc_timeout("10x") is None
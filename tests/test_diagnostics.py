@@ -0,0 +1,37 @@
+import asyncio
+import time
+
+from pathiumapi import Pathium
+from pathiumapi.diagnostics import add_loop_monitor
+from pathiumapi.metrics import add_metrics
+from pathiumapi.testing import TestClient
+
+
+def test_blocking_handler_is_caught_with_route_and_stack():
+    app = Pathium()
+    metrics = add_metrics(app)
+    seen = []
+    monitor = add_loop_monitor(app, metrics=metrics, interval=0.01, threshold=0.05, on_block=seen.append)
+
+    @app.get("/block/{n:int}")
+    async def block(req, n: int):
+        time.sleep(0.2)
+        return {"n": n}
+
+    @app.get("/fine")
+    async def fine(req):
+        await asyncio.sleep(0.05)
+        return {}
+
+    with TestClient(app) as client:
+        client.get("/fine")
+        client.get("/block/1")
+        time.sleep(0.05)
+        exposition = client.get("/metrics").text
+    (event,) = seen
+    assert event.route == "/block/{n:int}" and event.path == "/block/1"
+    assert 0.15 <= event.duration < 1.0
+    assert "time.sleep(0.2)" in event.stack
+    assert monitor.stats()["blocks"] == 1 and monitor.max_lag >= 0.15
+    assert 'pathium_event_loop_blocks_total{route="/block/{n:int}"} 1' in exposition
+    assert "pathium_event_loop_lag_seconds_count" in exposition
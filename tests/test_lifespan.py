@@ -0,0 +1,54 @@
+import asyncio
+
+from pathiumapi import Pathium
+
+
+async def _lifespan(app, messages):
+    sent = []
+    incoming = [{"type": m} for m in messages]
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(msg):
+        sent.append(msg)
+
+    await app({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, send)
+    return [m["type"] for m in sent]
+
+
+def test_startup_and_shutdown_hooks_run_once():
+    app = Pathium()
+    calls = []
+
+    @app.on_startup
+    async def open_pool():
+        app.state.pool = "pool"
+        calls.append("startup")
+
+    @app.on_shutdown
+    def close_pool():
+        calls.append("shutdown")
+
+    @app.get("/")
+    async def index(req):
+        return req.state.pool
+
+    async def _test():
+        sent = await _lifespan(app, ["lifespan.startup", "lifespan.shutdown"])
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+    asyncio.run(_test())
+    assert calls == ["startup", "shutdown"]
+    assert app.state.pool == "pool"
+
+
+def test_startup_failure_is_reported():
+    app = Pathium()
+
+    @app.on_startup
+    def boom():
+        raise RuntimeError("db down")
+
+    sent = asyncio.run(_lifespan(app, ["lifespan.startup"]))
+    assert sent == ["lifespan.startup.failed"]
@@ -0,0 +1,94 @@
+import tracemalloc
+
+from pathiumapi import Pathium
+from pathiumapi.memory import add_memory_profiler
+from pathiumapi.testing import TestClient
+
+AUTH = {"x-memory-profile": "s3cret"}
+
+
+def _app():
+    app = Pathium()
+    profiler = add_memory_profiler(app, secret="s3cret")
+    cache = []
+
+    @app.get("/leak")
+    async def leak(req):
+        cache.append(bytearray(200_000))
+        return {}
+
+    @app.get("/tidy")
+    async def tidy(req):
+        scratch = bytearray(200_000)
+        return {"size": len(scratch)}
+
+    return app, profiler
+
+
+def test_routes_are_charged_for_retained_memory():
+    app, profiler = _app()
+    try:
+        with TestClient(app, headers=AUTH) as client:
+            client.get("/leak")  # not tracing yet: not recorded
+            assert profiler.routes == {}
+            client.post("/_memory/start")
+            for _ in range(3):
+                client.get("/leak")
+                client.get("/tidy")
+            report = client.get("/_memory").json()
+            client.post("/_memory/stop")
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    rows = {r["route"]: r for r in report["routes"]}
+    assert report["routes"][0]["route"] == "/leak"
+    assert rows["/leak"]["requests"] == 3 and rows["/leak"]["net_bytes"] >= 600_000
+    assert rows["/tidy"]["net_bytes"] < 50_000
+    assert rows["/tidy"]["peak_bytes"] >= 200_000 and rows["/tidy"]["solo_requests"] == 3
+    assert not tracemalloc.is_tracing()
+
+
+def test_snapshot_diff_points_at_allocation_site():
+    app, profiler = _app()
+    try:
+        with TestClient(app, headers=AUTH) as client:
+            assert client.post("/_memory/snapshots").status_code == 409
+            client.post("/_memory/start", params={"frames": 2})
+            first = client.post("/_memory/snapshots").json()["id"]
+            for _ in range(5):
+                client.get("/leak")
+            second = client.post("/_memory/snapshots").json()["id"]
+            top = client.get(f"/_memory/snapshots/{second}/top").json()
+            diff = client.get(f"/_memory/snapshots/{first}/diff/{second}", params={"limit": 3}).json()
+            assert client.get("/_memory/snapshots/99/top").status_code == 404
+            profiler.stop()
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    assert diff[0]["file"].endswith("test_memory.py") and diff[0]["size_diff"] >= 1_000_000
+    assert len(diff[0]["traceback"]) <= 2
+    assert any(site["file"].endswith("test_memory.py") for site in top)
+
+
+def test_admin_routes_require_the_secret_and_valid_frames():
+    app, _ = _app()
+    try:
+        with TestClient(app) as client:
+            assert client.post("/_memory/start").status_code == 403
+            assert client.post("/_memory/start", headers={"x-memory-profile": "guess"}).status_code == 403
+            assert client.get("/_memory").status_code == 403
+            assert not tracemalloc.is_tracing()
+            assert client.post("/_memory/start", headers=AUTH, params={"frames": 100000}).status_code == 400
+            assert client.post("/_memory/start", headers=AUTH, params={"frames": 0}).status_code == 400
+            assert client.get("/_memory", headers=AUTH).status_code == 200
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def test_admin_routes_are_not_mounted_without_a_secret():
+    app = Pathium()
+    add_memory_profiler(app)
+    with TestClient(app) as client:
+        assert client.post("/_memory/start").status_code == 404
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,39 @@
+from pathiumapi import HTTPError, Pathium
+from pathiumapi.metrics import Histogram, add_metrics
+from pathiumapi.testing import TestClient
+
+
+def test_metrics_label_by_route_template():
+    app = Pathium()
+    metrics = add_metrics(app)
+
+    @app.get("/items/{id:int}")
+    async def item(req, id: int):
+        if id == 0:
+            raise HTTPError(404, "missing")
+        return {"id": id}
+
+    with TestClient(app) as client:
+        for path in ("/items/1", "/items/2", "/items/0", "/nope"):
+            client.get(path)
+        for method in ("FOO", "BAR1", "PROPFIND"):
+            client.request(method, "/nope")
+        text = client.get("/metrics").text
+
+    assert metrics.routes[("GET", "/items/{id:int}")].statuses == [0, 2, 0, 1, 0]
+    assert metrics.routes[("GET", "<unmatched>")].histogram.count == 1
+    # client-chosen methods share one label
+    assert metrics.routes[("OTHER", "<unmatched>")].histogram.count == 3
+
+    assert 'pathium_requests_total{method="GET",route="/items/{id:int}",status="2xx"} 2' in text
+    assert 'pathium_request_duration_seconds_bucket{method="GET",route="/items/{id:int}",le="+Inf"} 3' in text
+    assert 'pathium_request_duration_seconds_count{method="GET",route="<unmatched>"} 1' in text
+    assert "pathium_requests_in_flight 1" in text  # the scrape itself
+
+
+def test_histogram_buckets():
+    h = Histogram((0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 3.0):
+        h.observe(v)
+    assert h.cumulative() == [2, 3, 4]
+    assert h.quantile(0.5) == 0.1 and h.quantile(1.0) == float("inf")
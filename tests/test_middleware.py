@@ -86,3 +86,75 @@ def test_rate_limiter_blocks_after_limit():
         assert exc.value.status == 429
 
     asyncio.run(_test())
+
+
+def _slow_app(gate: asyncio.Event):
+    async def app(scope, receive, send):
+        await gate.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return app
+
+
+def test_concurrency_limit_queues_then_sheds():
+    async def _test():
+        gate = asyncio.Event()
+        mw = middleware.concurrency_limit_middleware_factory(max_concurrency=1, queue_size=1, max_wait=0.05, retry_after=2)
+        wrapped = mw(_slow_app(gate))
+        running = asyncio.ensure_future(_call_app(wrapped, _make_scope(), []))
+        queued = asyncio.ensure_future(_call_app(wrapped, _make_scope(), []))
+        await asyncio.sleep(0)
+        shed = await _call_app(wrapped, _make_scope(), [])  # queue full
+        assert shed[0]["status"] == 503
+        assert (b"retry-after", b"2") in shed[0]["headers"]
+        assert (await queued)[0]["status"] == 503  # waited longer than max_wait
+        gate.set()
+        assert (await running)[0]["status"] == 200
+        assert mw.limiters["*"].stats() == {"limit": 1, "active": 0, "queued": 0, "admitted": 1, "shed": 2}
+
+    asyncio.run(_test())
+
+
+def test_concurrency_limit_groups_are_isolated():
+    async def _test():
+        gate = asyncio.Event()
+        mw = middleware.concurrency_limit_middleware_factory(
+            max_concurrency=10, queue_size=0, groups={"/reports": 1},
+        )
+        wrapped = mw(_slow_app(gate))
+        report = dict(_make_scope(), path="/reports/1")
+        first = asyncio.ensure_future(_call_app(wrapped, report, []))
+        other = asyncio.ensure_future(_call_app(wrapped, _make_scope(), []))
+        await asyncio.sleep(0)
+        assert (await _call_app(wrapped, dict(report), []))[0]["status"] == 503
+        gate.set()
+        assert [(await t)[0]["status"] for t in (first, other)] == [200, 200]
+
+    asyncio.run(_test())
+
+
+def test_adaptive_limiter_shrinks_when_latency_rises():
+    limiter = middleware.ConcurrencyLimiter(10, adaptive=True, interval=0.0)
+    limiter.active = 2
+    limiter.release(0.01)
+    limiter.release(0.5)
+    assert limiter.limit == 9
+
+
+def test_adaptive_limiter_recovers_under_mixed_latency():
+    limiter = middleware.ConcurrencyLimiter(100, adaptive=True, interval=0.0)
+
+    async def _test():
+        # one fast request, then steady slower traffic that never queues
+        for latency in [0.001] + [0.010] * 60:
+            assert await limiter.acquire()
+            limiter.release(latency)
+        low = limiter.limit
+        assert low >= limiter.min_limit and limiter.queued == 0
+        for _ in range(60):
+            assert await limiter.acquire()
+            limiter.release(0.010)
+        assert limiter.limit > low + 40  # the baseline moved on and the limit grows again
+
+    asyncio.run(_test())
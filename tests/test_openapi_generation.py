@@ -1,4 +1,5 @@
 import asyncio
+import json
 
 try:
     from pydantic import BaseModel
@@ -45,3 +46,26 @@ def test_openapi_includes_request_and_response_models():
     body = spec.body_bytes
     assert b"/items" in body
     assert b"components" in body
+
+
+def test_openapi_documents_bulk_request_body_as_array():
+    if BaseModel is None:
+        assert True
+        return
+
+    class Row(BaseModel):
+        id: int
+
+    app = Pathium()
+
+    @app.post("/rows")
+    @validate_body(list[Row])
+    async def create_rows(req, rows):
+        return {"n": len(rows)}
+
+    add_openapi(app)
+    handler = next(r.handler for r in app.router.routes if r.path == "/openapi.json")
+    spec = json.loads(asyncio.run(handler(None)).body_bytes)
+    schema = spec["paths"]["/rows"]["post"]["requestBody"]["content"]["application/json"]["schema"]
+    assert schema == {"type": "array", "items": {"$ref": "#/components/schemas/Row"}}
+    assert "Row" in spec["components"]["schemas"]
@@ -0,0 +1,62 @@
+from typing import Optional
+
+import pytest
+
+try:
+    from pydantic import BaseModel
+except Exception:
+    BaseModel = None  # type: ignore
+
+from pathiumapi import Pathium, Request, Header, Query
+from pathiumapi.testing import TestClient
+from pathiumapi.validation import validate_body
+
+
+def test_injects_path_query_and_header_params():
+    app = Pathium()
+
+    @app.get("/users/{id:int}")
+    async def get_user(req: Request, id: int, page: int = Query(1), verbose: bool = False,
+                       x_trace: Optional[str] = Header(None)):
+        return {"id": id, "page": page, "verbose": verbose, "trace": x_trace, "path": req.path}
+
+    with TestClient(app) as client:
+        r = client.get("/users/7?page=3&verbose=true", headers={"x-trace": "abc"})
+        assert r.status_code == 200
+        assert r.json() == {"id": 7, "page": 3, "verbose": True, "trace": "abc", "path": "/users/7"}
+
+        r = client.get("/users/7?page=two")
+        assert r.status_code == 422
+        assert r.json()["detail"][0]["loc"] == ["query", "page"]
+
+
+def test_handler_without_request_parameter():
+    app = Pathium()
+
+    @app.get("/hello/{name}")
+    async def hello(name: str):
+        return {"hello": name}
+
+    with TestClient(app) as client:
+        r = client.get("/hello/bob")
+    assert (r.status_code, r.json()) == (200, {"hello": "bob"})
+
+
+def test_validate_body_order_independent():
+    if BaseModel is None:
+        pytest.skip("pydantic not installed")
+
+    class Item(BaseModel):
+        name: str
+
+    app = Pathium()
+
+    @validate_body(Item)
+    @app.post("/items")
+    async def create(req, item: Item):
+        return {"name": item.name}
+
+    with TestClient(app) as client:
+        r = client.post("/items", json={"name": "x"})
+        assert (r.status_code, r.json()) == (200, {"name": "x"})
+        assert client.post("/items", json={}).status_code == 422
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from pathiumapi import bench
+from pathiumapi.testing import BudgetExceeded, MissingBaseline, PerfBudget
+
+
+def _case(suite, name):
+    return dict(suite())[name]
+
+
+# shared CI runners are noisy: only catch large regressions here
+TOLERANCE = 0.3
+
+
+def test_router_dynamic_hit_budget(perf_budget):
+    perf_budget(_case(bench.router_cases, "router/100/dynamic_hit"), tolerance=TOLERANCE)
+
+
+def test_request_through_app_budget(perf_budget):
+    perf_budget(_case(bench.middleware_cases, "middleware/none"), tolerance=TOLERANCE)
+
+
+def test_budget_records_then_flags_regressions(tmp_path):
+    path = tmp_path / "baseline.json"
+    budget = PerfBudget(path, tolerance=0.2, min_time=0.01)
+    with pytest.raises(MissingBaseline, match="--perf-update"):
+        budget.check("noop", lambda: None)
+    assert not path.exists()
+    assert PerfBudget(path, update=True, min_time=0.01).check("noop", lambda: None)["status"] == "recorded"
+    assert budget.check("noop", lambda: None, tolerance=0.9)["status"] == "ok"
+
+    data = json.loads(path.read_text())
+    data["noop"]["normalized"] *= 100
+    path.write_text(json.dumps(data))
+    with pytest.raises(BudgetExceeded, match="below its baseline"):
+        budget.check("noop", lambda: None)
+
+    data["noop"]["python"] = "2.7"
+    path.write_text(json.dumps(data))
+    assert budget.check("noop", lambda: None)["status"] == "skipped"
+    assert PerfBudget(path, update=True, min_time=0.01).check("noop", lambda: None)["status"] == "recorded"
+
+
+def test_coroutine_scenarios_need_a_sync_test(tmp_path):
+    import asyncio
+
+    async def noop():
+        pass
+
+    async def main():
+        PerfBudget(tmp_path / "baseline.json", update=True, min_time=0.01).check("noop", noop)
+
+    with pytest.raises(RuntimeError, match="synchronous test"):
+        asyncio.run(main())
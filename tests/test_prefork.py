@@ -0,0 +1,75 @@
+import http.client
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+from pathiumapi import Pathium, Response
+from pathiumapi.prefork import Supervisor
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="prefork needs os.fork")
+
+
+def _app():
+    app = Pathium()
+
+    @app.get("/pid")
+    async def pid(req):
+        return Response(str(os.getpid()))
+
+    return app
+
+
+def _master(port, reuse_port):
+    Supervisor(_app(), port=port, workers=2, reuse_port=reuse_port, graceful_timeout=5).run()
+
+
+def _pids(port, attempts=40):
+    seen = set()
+    for _ in range(attempts):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("GET", "/pid")
+        seen.add(int(conn.getresponse().read()))
+        conn.close()
+    return seen
+
+
+def _wait(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = predicate()
+            if result:
+                return result
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise AssertionError("timed out")
+
+
+@pytest.mark.parametrize("reuse_port", [False, True])
+def test_workers_restart_and_roll(reuse_port):
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    ctx = multiprocessing.get_context("fork")
+    master = ctx.Process(target=_master, args=(port, reuse_port))
+    master.start()
+    try:
+        first = _wait(lambda: _pids(port))
+        crashed = next(iter(first))
+        os.kill(crashed, signal.SIGKILL)
+        replaced = _wait(lambda: (lambda p: p if crashed not in p and len(p) >= 1 else None)(_pids(port)))
+        assert crashed not in replaced
+
+        before = _pids(port)
+        os.kill(master.pid, signal.SIGHUP)
+        _wait(lambda: not (_pids(port) & before))
+    finally:
+        os.kill(master.pid, signal.SIGTERM)
+        master.join(15)
+    assert master.exitcode == 0
@@ -0,0 +1,68 @@
+import marshal
+import time
+
+from pathiumapi import Pathium
+from pathiumapi.profiling import add_profiler
+from pathiumapi.testing import TestClient
+
+
+def busy_work(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _app(**options):
+    app = Pathium()
+    profiler = add_profiler(app, secret="s3cret", **options)
+
+    @app.get("/work")
+    async def work(req):
+        busy_work(0.05)
+        return {"ok": True}
+
+    return app, profiler
+
+
+def test_header_triggers_cprofile():
+    app, profiler = _app()
+    auth = {"x-profile": "s3cret"}
+    with TestClient(app) as client:
+        r = client.get("/work")
+        assert r.status_code == 200 and "x-profile-id" not in r.headers
+        assert "x-profile-id" not in client.get("/work", headers={"x-profile": "wrong"}).headers
+        assert client.get("/work", headers=auth).headers["x-profile-id"] == "1"
+
+        assert client.get("/_profiles").status_code == 403
+        (summary,) = client.get("/_profiles", headers=auth).json()
+        assert summary["route"] == "/work" and summary["status"] == 200 and summary["duration"] >= 0.05
+
+        assert b"busy_work" in client.get("/_profiles/1", headers=auth).content
+        r = client.get("/_profiles/1", headers=auth, params={"format": "prof"})
+        assert any(func[2] == "busy_work" for func in marshal.loads(r.content))
+        assert client.get("/_profiles/1", headers=auth, params={"format": "collapsed"}).status_code == 400
+
+
+def test_sampling_profile_and_ring_buffer():
+    app, profiler = _app(mode="sampling", interval=0.001, sample_rate=1.0, max_profiles=2)
+    with TestClient(app) as client:
+        for _ in range(3):
+            client.get("/work")
+    assert [p.id for p in profiler.profiles] == [2, 3]
+    collapsed = profiler.get(3).collapsed()
+    assert "work (" in collapsed and "busy_work (" in collapsed
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in collapsed.splitlines()) >= 3
+
+
+def test_sampled_profiles_are_not_served_without_a_secret():
+    app = Pathium()
+    profiler = add_profiler(app, sample_rate=1.0)
+
+    @app.get("/work")
+    async def work(req):
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        client.get("/work")
+        assert len(profiler.profiles) == 1
+        assert client.get("/_profiles").status_code == 404
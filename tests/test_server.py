@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+
+from pathiumapi import Pathium, Response, StreamingResponse
+from pathiumapi.server import ParserError, PyHttpParser, Server
+
+
+def _app():
+    app = Pathium()
+
+    @app.get("/hello")
+    async def hello(req):
+        return Response("hi")
+
+    @app.post("/echo")
+    async def echo(req):
+        return Response(await req.body())
+
+    @app.get("/stream")
+    async def stream(req):
+        return StreamingResponse(iter([b"ab", b"cd"]))
+
+    return app
+
+
+async def _serve(app, test, **options):
+    server = Server(app, port=0, **options)
+    await server.startup()
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        await asyncio.wait_for(test(reader, writer), 5)
+    finally:
+        writer.close()
+        await server.shutdown()
+
+
+async def _response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:] if line)
+    if "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = b""
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            chunk = await reader.readexactly(size + 2)
+            if not size:
+                break
+            body += chunk[:-2]
+    return lines[0], headers, body
+
+
+def test_keep_alive_and_pipelining():
+    async def test(reader, writer):
+        writer.write(b"GET /hello HTTP/1.1\r\nhost: x\r\n\r\n")
+        status, headers, body = await _response(reader)
+        assert (status, body) == ("HTTP/1.1 200 OK", b"hi")
+        assert headers["content-length"] == "2" and "connection" not in headers
+        writer.write(
+            b"POST /echo HTTP/1.1\r\ncontent-length: 3\r\n\r\nabc"
+            b"POST /echo HTTP/1.1\r\ntransfer-encoding: chunked\r\n\r\n2\r\nxy\r\n1\r\nz\r\n0\r\n\r\n"
+            b"GET /stream HTTP/1.1\r\n\r\n"
+        )
+        assert (await _response(reader))[2] == b"abc"
+        assert (await _response(reader))[2] == b"xyz"
+        status, headers, body = await _response(reader)
+        assert headers["transfer-encoding"] == "chunked" and body == b"abcd"
+
+    asyncio.run(_serve(_app(), test))
+
+
+def test_limits_and_bad_requests():
+    async def too_large(reader, writer):
+        writer.write(b"POST /echo HTTP/1.1\r\ncontent-length: 100\r\n\r\n")
+        status, headers, _ = await _response(reader)
+        assert status == "HTTP/1.1 413 Request Entity Too Large"
+        assert headers["connection"] == "close"
+
+    async def malformed(reader, writer):
+        writer.write(b"NONSENSE\r\n\r\n")
+        assert (await _response(reader))[0] == "HTTP/1.1 400 Bad Request"
+        assert await reader.read() == b""
+
+    asyncio.run(_serve(_app(), too_large, max_body_size=10))
+    asyncio.run(_serve(_app(), malformed))
+
+
+def test_lifespan_runs_hooks():
+    app = _app()
+    events = []
+    app.on_startup(lambda: events.append("up"))
+    app.on_shutdown(lambda: events.append("down"))
+
+    async def test(reader, writer):
+        writer.write(b"GET /hello HTTP/1.0\r\n\r\n")
+        status, headers, body = await _response(reader)
+        assert body == b"hi" and headers["connection"] == "close"
+
+    asyncio.run(_serve(app, test))
+    assert events == ["up", "down"]
+
+
+def test_httptools_parser_keeps_the_431_status():
+    pytest.importorskip("httptools")
+
+    async def test(reader, writer):
+        writer.write(b"GET /hello HTTP/1.1\r\nhost: x\r\nx-big: " + b"a" * 2048 + b"\r\n\r\n")
+        status = await reader.readline()
+        assert status == b"HTTP/1.1 431 Request Header Fields Too Large\r\n"
+
+    asyncio.run(_serve(_app(), test, http="httptools", max_header_size=1024))
+
+
+class _Recorder:
+    def __init__(self):
+        self.body = b""
+        self.complete = 0
+
+    def on_message_begin(self): pass
+    def on_url(self, url): pass
+    def on_header(self, name, value): pass
+    def on_headers_complete(self): pass
+
+    def on_body(self, chunk):
+        self.body += chunk
+
+    def on_message_complete(self):
+        self.complete += 1
+
+
+@pytest.mark.parametrize("size", [b"-3", b"+3", b"0x3", b"1_0", b" 3", b"3 ", b"", b"11111111111111111"])
+def test_chunk_size_must_be_bare_hex(size):
+    proto = _Recorder()
+    parser = PyHttpParser(proto)
+    head = b"POST /echo HTTP/1.1\r\ntransfer-encoding: chunked\r\n\r\n"
+    with pytest.raises(ParserError) as exc:
+        parser.feed_data(head + size + b"\r\nabc\r\n0\r\n\r\nGET /admin HTTP/1.1\r\n\r\n")
+    assert exc.value.status == 400
+    assert proto.body == b"" and proto.complete == 0
+
+
+def test_chunk_extensions_are_ignored():
+    proto = _Recorder()
+    parser = PyHttpParser(proto)
+    parser.feed_data(b"POST /echo HTTP/1.1\r\ntransfer-encoding: chunked\r\n\r\n"
+                     b"3;name=value\r\nabc\r\nA ;x\r\n0123456789\r\n0\r\n\r\n")
+    assert proto.body == b"abc0123456789" and proto.complete == 1
@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+from pathiumapi import Pathium, Response, add_health
+from pathiumapi.server import Server
+
+from tests.test_server import _response
+
+
+def _app(events):
+    app = Pathium()
+    add_health(app)
+    app.on_shutdown(lambda: events.append("hooks"))
+
+    @app.get("/slow/{seconds:float}")
+    async def slow(req, seconds: float):
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        return Response("done")
+
+    return app
+
+
+async def _connect(server):
+    port = server.sockets[0].getsockname()[1]
+    return await asyncio.open_connection("127.0.0.1", port)
+
+
+def test_shutdown_drains_in_flight_requests():
+    events = []
+    app = _app(events)
+
+    async def main():
+        server = Server(app, port=0)
+        await server.startup()
+        idle_r, idle_w = await _connect(server)
+        idle_w.write(b"GET /health HTTP/1.1\r\n\r\n")
+        status, _, body = await _response(idle_r)
+        assert status == "HTTP/1.1 200 OK"
+        assert json.loads(body) == {"status": "ok", "in_flight": 0, "background": 0}
+
+        busy_r, busy_w = await _connect(server)
+        busy_w.write(b"GET /slow/0.2 HTTP/1.1\r\n\r\n")
+        await asyncio.sleep(0.05)
+        assert app.in_flight == 1
+        shutdown = asyncio.ensure_future(server.shutdown())
+        await asyncio.sleep(0.05)
+        assert app.health()["status"] == "draining"
+        assert await idle_r.read() == b""  # idle keep-alive connection closed
+        status, headers, body = await _response(busy_r)
+        assert (status, body, headers["connection"]) == ("HTTP/1.1 200 OK", b"done", "close")
+        await shutdown
+        assert app.in_flight == 0
+
+    asyncio.run(main())
+    assert events == ["hooks"]
+
+
+def test_shutdown_cancels_requests_after_deadline():
+    events = []
+    app = _app(events)
+
+    async def main():
+        server = Server(app, port=0, graceful_timeout=0.1)
+        await server.startup()
+        reader, writer = await _connect(server)
+        writer.write(b"GET /slow/30 HTTP/1.1\r\n\r\n")
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(server.shutdown(), 2)
+        assert await reader.read() == b""
+
+    asyncio.run(main())
+    assert events == ["cancelled", "hooks"]
@@ -0,0 +1,51 @@
+import asyncio
+
+from pathiumapi import Pathium
+from pathiumapi.slowlog import add_slow_log
+from pathiumapi.testing import TestClient
+
+
+async def wait_for_upstream(seconds):
+    await asyncio.sleep(seconds)
+
+
+def test_slow_requests_are_recorded_with_stack_and_timings():
+    app = Pathium(on_timing=lambda scope, timings: None)
+    log = add_slow_log(app, threshold=0.05, secret="s3cret")
+
+    @app.get("/orders/{id:int}")
+    async def order(req, id: int):
+        await wait_for_upstream(0.15)
+        return {"id": id}
+
+    with TestClient(app) as client:
+        client.get("/orders/1?v=1")
+        client.get("/orders/2?v=1")
+        assert client.get("/_slow").status_code == 403
+        entries = client.get("/_slow", headers={"x-slow-log": "s3cret"}).json()
+    assert [e["params"] for e in entries] == [{"id": 2}, {"id": 1}]
+    entry = entries[0]
+    assert entry["route"] == "/orders/{id:int}" and entry["status"] == 200
+    assert entry["query"] == "v=1" and entry["duration"] >= 0.15
+    assert entry["timings"]["handler"] >= 140
+    assert "wait_for_upstream" in entry["stack"] and "order" in entry["stack"]
+
+
+def test_fast_requests_are_not_recorded():
+    app = Pathium()
+    log = add_slow_log(app, threshold=1.0, capture_stack=False)
+
+    @app.get("/fast")
+    async def fast(req):
+        return {}
+
+    with TestClient(app) as client:
+        client.get("/fast")
+    assert not log.entries
+
+
+def test_entries_are_not_served_without_a_secret():
+    app = Pathium()
+    add_slow_log(app, threshold=0.0, capture_stack=False)
+    with TestClient(app) as client:
+        assert client.get("/_slow").status_code == 404
@@ -0,0 +1,127 @@
+import asyncio
+
+from pathiumapi import EventSourceResponse, Pathium, StreamingResponse
+from pathiumapi.sse import ReplayBuffer
+
+
+async def _stream(app, path, headers=(), disconnect_after=None):
+    sent = []
+    gone = asyncio.Event()
+
+    async def receive():
+        if not sent:
+            return {"type": "http.request", "body": b""}
+        await gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(msg):
+        sent.append(msg)
+        if disconnect_after is not None and len(sent) > disconnect_after:
+            gone.set()
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": list(headers)}
+    await asyncio.wait_for(app(scope, receive, send), 2)
+    return sent
+
+
+def test_streaming_response_sends_chunks():
+    app = Pathium()
+
+    @app.get("/rows")
+    async def rows(req):
+        return StreamingResponse(iter(["a\n", b"b\n"]), media_type="text/plain")
+
+    sent = asyncio.run(_stream(app, "/rows"))
+    assert [m.get("body") for m in sent[1:]] == [b"a\n", b"b\n", b""]
+    assert sent[-1]["more_body"] is False
+
+
+def test_stream_stops_on_disconnect():
+    app = Pathium()
+    closed = []
+
+    @app.get("/forever")
+    async def forever(req):
+        async def gen():
+            try:
+                while True:
+                    yield "tick"
+                    await asyncio.sleep(0)
+            finally:
+                closed.append(True)
+        return StreamingResponse(gen())
+
+    sent = asyncio.run(_stream(app, "/forever", disconnect_after=3))
+    assert closed == [True]
+    assert all(m.get("more_body", True) for m in sent[1:])
+
+
+def test_event_source_pings_and_resumes():
+    app = Pathium()
+    buf = ReplayBuffer(max_events=2)
+    for n in range(3):
+        buf.append({"n": n})
+
+    @app.get("/events")
+    async def events(req):
+        async def live():
+            await asyncio.sleep(0.05)
+            yield buf._events[-1]  # already replayed, skipped
+            yield buf.append({"n": 3}, event="update")
+        return EventSourceResponse(live(), ping=0.01, replay=buf, last_event_id=req.headers.get("last-event-id"))
+
+    sent = asyncio.run(_stream(app, "/events", headers=[(b"last-event-id", b"1")]))
+    start, *body = sent
+    assert (b"content-type", b"text/event-stream") in start["headers"]
+    frames = [m["body"] for m in body if m["body"] != b": ping\n\n"]
+    assert frames == [
+        b'id: 2\ndata: {"n": 1}\n\n',
+        b'id: 3\ndata: {"n": 2}\n\n',
+        b'id: 4\nevent: update\ndata: {"n": 3}\n\n',
+        b"",
+    ]
+    assert b": ping\n\n" in [m["body"] for m in body]
+
+
+def test_docstring_example_over_local_broker():
+    from typing import Optional
+
+    from pathiumapi import Broadcast, Header
+    from pathiumapi.broadcast import LocalBrokerBackend, serve_broker
+    from pathiumapi.testing import AsyncClient
+
+    async def main():
+        server = await serve_broker("127.0.0.1", 0)
+        hub = Broadcast(LocalBrokerBackend(port=server.sockets[0].getsockname()[1]))
+        events = ReplayBuffer(max_events=500)
+        app = Pathium()
+        app.on_startup(hub.connect)
+        app.on_shutdown(hub.disconnect)
+
+        async def publish(data):
+            event = events.append(data, event="update")
+            await hub.publish("dashboard", event.encode().decode())
+
+        @app.get("/dashboard/stream")
+        async def stream(last_event_id: Optional[str] = Header(None)):
+            async def live():
+                async with hub.subscribe("dashboard") as sub:
+                    async for msg in sub:
+                        yield msg.bytes
+            return EventSourceResponse(live(), replay=events, last_event_id=last_event_id)
+
+        async with AsyncClient(app) as client:
+            await publish({"n": 1})
+            await publish({"n": 2})
+            async with client.stream("GET", "/dashboard/stream", headers={"last-event-id": "1"}) as r:
+                chunks = r.iter_bytes()
+                assert await chunks.__anext__() == b'id: 2\nevent: update\ndata: {"n": 2}\n\n'
+                await asyncio.sleep(0.05)  # let the subscription reach the broker
+                await hub.publish("dashboard", events._events[-1].encode().decode())  # replayed: skipped
+                await publish({"n": 3})
+                frame = await asyncio.wait_for(chunks.__anext__(), 2)
+                assert frame == b'id: 3\nevent: update\ndata: {"n": 3}\n\n'
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(main())
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+
+import pytest
+
+from pathiumapi import HTTPError, Pathium, Response, StreamingResponse, WebSocket, WebSocketDisconnect
+from pathiumapi.loadtest import run_loadtest
+from pathiumapi.server import Server
+from pathiumapi.testing import AsyncClient, TestClient
+
+
+def _app(events=None, produced=None):
+    app = Pathium()
+    if events is not None:
+        app.on_startup(lambda: events.append("startup"))
+        app.on_shutdown(lambda: events.append("shutdown"))
+
+    @app.post("/items/{id:int}")
+    async def create(req, id: int, tag: str = ""):
+        data = await req.json()
+        return Response.json({"id": id, "tag": tag, "name": data["name"], "ua": req.headers.get("x-test")}, status=201)
+
+    @app.post("/echo")
+    async def echo(req):
+        return Response(await req.body())
+
+    @app.get("/boom")
+    async def boom(req):
+        raise RuntimeError("boom")
+
+    @app.get("/missing")
+    async def missing(req):
+        raise HTTPError(404, "nope")
+
+    @app.get("/rows")
+    async def rows(req):
+        async def gen():
+            for i in range(1000):
+                if produced is not None:
+                    produced.append(i)
+                yield f"row {i}\n"
+                await asyncio.sleep(0)
+        return StreamingResponse(gen(), media_type="text/plain")
+
+    @app.websocket("/ws/{room}")
+    async def chat(ws: WebSocket, room: str):
+        await ws.accept()
+        async for text in ws.iter_text():
+            if text == "bye":
+                await ws.close(4000)
+                return
+            await ws.send_json({"room": room, "text": text})
+
+    return app
+
+
+def test_sync_client_requests_and_lifespan():
+    events = []
+    app = _app(events)
+    with TestClient(app) as client:
+        assert events == ["startup"]
+        r = client.post("/items/7", params={"tag": "new"}, json={"name": "pen"}, headers={"x-test": "yes"})
+        assert r.status_code == 201
+        assert r.headers["content-type"].startswith("application/json")
+        assert r.json() == {"id": 7, "tag": "new", "name": "pen", "ua": "yes"}
+        assert client.post("/echo", content=[b"ab", b"cd"]).content == b"abcd"
+        assert client.get("/missing").status_code == 404
+        assert client.get("/boom").status_code == 500
+    assert events == ["startup", "shutdown"]
+
+
+def test_errors_escaping_the_app():
+    async def broken(scope, receive, send):
+        raise RuntimeError("boom")
+
+    client = TestClient(broken)
+    with pytest.raises(RuntimeError, match="boom"):
+        client.get("/")
+    client.close()
+    quiet = TestClient(broken, raise_server_exceptions=False)
+    with quiet:  # no lifespan support is fine
+        assert quiet.get("/").status_code == 500
+
+
+def test_stream_reads_incrementally_and_disconnects_early():
+    produced = []
+    with TestClient(_app(produced=produced)) as client:
+        with client.stream("GET", "/rows") as r:
+            assert r.status_code == 200
+            lines = r.iter_lines()
+            assert [next(lines), next(lines)] == ["row 0", "row 1"]
+        # leaving early cancelled the generator instead of buffering 1000 rows
+        assert len(produced) < 10
+        with client.stream("GET", "/rows") as r:
+            assert r.read().count(b"\n") == 1000
+
+
+def test_websocket_session():
+    with TestClient(_app()) as client:
+        with client.websocket_connect("/ws/lobby") as ws:
+            ws.send_text("hi")
+            assert ws.receive_json() == {"room": "lobby", "text": "hi"}
+            ws.send_text("bye")
+            with pytest.raises(WebSocketDisconnect) as exc:
+                ws.receive_text()
+            assert exc.value.code == 4000
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/nowhere"):
+                pass
+
+
+def test_async_client():
+    async def main():
+        async with AsyncClient(_app()) as client:
+            r = await client.post("/items/1", json={"name": "cup"})
+            assert r.json()["name"] == "cup"
+            async with client.stream("GET", "/rows") as r:
+                chunks = [chunk async for chunk in r.iter_bytes()]
+            assert len(chunks) == 1000
+            async with client.websocket_connect("/ws/a") as ws:
+                await ws.send_text("x")
+                assert (await ws.receive_json())["text"] == "x"
+
+    asyncio.run(main())
+
+
+def test_loadtest_in_process():
+    app = Pathium()
+
+    @app.get("/ping")
+    async def ping(req):
+        await asyncio.sleep(0)
+        return Response("pong")
+
+    @app.get("/fail")
+    async def fail(req):
+        raise RuntimeError("fail")
+
+    report = run_loadtest(app, path="/ping", requests=200, concurrency=8)
+    assert report["requests"] == 200 and report["errors"] == 0
+    assert report["status"] == {"200": 200}
+    assert report["throughput"] > 0
+    latency = report["latency_ms"]
+    assert latency["min"] <= latency["p50"] <= latency["p90"] <= latency["p99"] <= latency["max"]
+
+    report = run_loadtest(app, path="/fail", requests=10, concurrency=2)
+    assert report["status"] == {"500": 10}
+
+
+def test_loadtest_against_a_server():
+    app = Pathium()
+
+    @app.get("/ping")
+    async def ping(req):
+        return Response("pong")
+
+    @app.get("/rows")
+    async def rows(req):
+        return StreamingResponse(iter([b"a", b"b"]))
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = Server(app, port=0)
+    asyncio.run_coroutine_threadsafe(server.startup(), loop).result()
+    port = server.sockets[0].getsockname()[1]
+    try:
+        report = run_loadtest(f"http://127.0.0.1:{port}/ping", requests=100, concurrency=4)
+        assert report["status"] == {"200": 100} and report["errors"] == 0
+        report = run_loadtest(f"http://127.0.0.1:{port}/rows", requests=20, concurrency=2)
+        assert report["status"] == {"200": 20}
+    finally:
+        asyncio.run_coroutine_threadsafe(server.shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import pytest
+
+try:
+    from pydantic import BaseModel
+except Exception:
+    BaseModel = None
+
+from pathiumapi import Pathium
+from pathiumapi.middleware import cors_middleware_factory
+from pathiumapi.testing import TestClient
+from pathiumapi.timing import middleware_name
+
+
+needs_pydantic = pytest.mark.skipif(BaseModel is None, reason="pydantic is not installed")
+
+if BaseModel is not None:
+    class Item(BaseModel):
+        name: str
+
+
+def slow_middleware(app):
+    async def inner(scope, receive, send):
+        time.sleep(0.01)
+        await app(scope, receive, send)
+    return inner
+
+
+def _app(**options):
+    app = Pathium(**options)
+    app.use(slow_middleware)
+    app.use(cors_middleware_factory())
+
+    @app.post("/items")
+    async def create(item: Item):
+        await asyncio.sleep(0.02)
+        return {"name": item.name}
+
+    return app
+
+
+@needs_pydantic
+def test_server_timing_header_and_hook():
+    seen = []
+    app = _app(server_timing=True, on_timing=lambda scope, timings: seen.append(timings))
+    with TestClient(app) as client:
+        header = client.post("/items", json={"name": "a"}).headers["server-timing"]
+    names = [part.split(";")[0] for part in header.split(", ")]
+    assert names == ["mw.slow", "mw.cors", "routing", "read", "validate", "handler", "serialize", "total"]
+
+    (timings,) = seen
+    ms = timings.milliseconds()
+    assert ms["handler"] >= 15
+    assert ms["mw.slow"] >= 8
+    assert "send" in ms
+    assert timings.total >= timings.phases["handler"]
+
+
+@needs_pydantic
+def test_timing_off_by_default():
+    with TestClient(_app()) as client:
+        assert "server-timing" not in client.post("/items", json={"name": "a"}).headers
+
+
+@needs_pydantic
+def test_hook_only_sends_no_header():
+    seen = []
+    app = _app(on_timing=lambda scope, timings: seen.append((scope["route"].path, list(timings.phases))))
+    with TestClient(app) as client:
+        r = client.post("/items", json={})
+    assert r.status_code == 422
+    assert "server-timing" not in r.headers
+    assert seen[0][0] == "/items"
+    assert "validate" in seen[0][1] and "handler" not in seen[0][1]
+
+
+def test_middleware_name():
+    assert middleware_name(cors_middleware_factory()) == "cors"
+    assert middleware_name(slow_middleware) == "slow"
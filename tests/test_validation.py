@@ -1,3 +1,6 @@
+import json
+from typing import List
+
 import pytest
 
 try:
@@ -5,7 +8,8 @@ try:
 except Exception:
     BaseModel = None  # type: ignore
 
-from pathiumapi.validation import validate_data
+from pathiumapi import Pathium
+from pathiumapi.validation import validate_body, validate_data
 
 
 def test_validate_data_skipped_if_no_pydantic():
@@ -24,3 +28,94 @@ def test_validate_data_basic():
     inst = validate_data(Item, {"name": "apple", "qty": 3})
     assert inst.name == "apple"
     assert inst.qty == 3
+
+
+def _post(app, path, chunks):
+    import asyncio
+
+    sent = []
+    msgs = [
+        {"type": "http.request", "body": c, "more_body": i < len(chunks) - 1}
+        for i, c in enumerate(chunks)
+    ]
+
+    async def receive():
+        return msgs.pop(0)
+
+    async def send(msg):
+        sent.append(msg)
+
+    scope = {"type": "http", "method": "POST", "path": path, "headers": []}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def test_validate_body_bulk_list_reports_indices():
+    if BaseModel is None:
+        pytest.skip("pydantic not installed")
+
+    class Item(BaseModel):
+        name: str
+        qty: int
+
+    app = Pathium()
+
+    @app.post("/items")
+    @validate_body(List[Item])
+    async def create_many(req, items):
+        assert all(isinstance(i, Item) for i in items)
+        return {"created": len(items)}
+
+    ok = json.dumps([{"name": "a", "qty": 1}, {"name": "b", "qty": 2}]).encode()
+    assert _post(app, "/items", [ok]) == (200, {"created": 2})
+
+    bad = json.dumps([{"name": "a", "qty": 1}, {"name": "b"}, {"name": "c", "qty": "x"}]).encode()
+    status, body = _post(app, "/items", [bad])
+    assert status == 422
+    assert sorted(e["index"] for e in body["detail"]) == [1, 2]
+
+
+def test_validate_body_null_or_empty_body_is_an_empty_object():
+    if BaseModel is None:
+        pytest.skip("pydantic not installed")
+
+    class Options(BaseModel):
+        verbose: bool = False
+
+    app = Pathium()
+
+    @app.post("/run")
+    @validate_body(Options)
+    async def run(req, options):
+        return {"verbose": options.verbose}
+
+    for body in (b"null", b" null\n", b""):
+        assert _post(app, "/run", [body]) == (200, {"verbose": False})
+    assert _post(app, "/run", [b"7"])[0] == 422
+
+
+def test_validate_body_ndjson_streams_in_chunks():
+    if BaseModel is None:
+        pytest.skip("pydantic not installed")
+
+    class Item(BaseModel):
+        name: str
+        qty: int
+
+    app = Pathium()
+    batches = []
+
+    @app.post("/import")
+    @validate_body(Item, ndjson=True, chunk_size=2)
+    async def import_items(req, chunks):
+        async for chunk in chunks:
+            batches.append(len(chunk))
+        return {"ok": True}
+
+    body = [b'{"name": "a", "qty": 1}\n{"name": "b", ', b'"qty": 2}\n{"name": "c", "qty": 3}\n']
+    assert _post(app, "/import", body) == (200, {"ok": True})
+    assert batches == [2, 1]
+
+    status, detail = _post(app, "/import", [b'{"name": "a", "qty": 1}\n{"name": "b", "qty": 2}\n{"name": 3\n'])
+    assert status == 422
+    assert detail["detail"][0]["index"] == 2
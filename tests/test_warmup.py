@@ -0,0 +1,67 @@
+import asyncio
+
+try:
+    from pydantic import BaseModel
+except Exception:
+    BaseModel = None  # type: ignore
+
+from pathiumapi import Pathium
+from pathiumapi._core import add_openapi
+
+
+def test_warmup_reports_steps_and_replays_requests():
+    app = Pathium()
+    hits = []
+
+    @app.get("/items/{id:int}")
+    async def get_item(req, id: int):
+        hits.append(id)
+        return {"id": id}
+
+    add_openapi(app)
+    report = asyncio.run(app.warmup(["/items/1", ("GET", "/missing")]))
+
+    assert {"imports", "routes", "validators", "openapi", "replay", "total"} <= set(report["steps"])
+    assert report["replayed"] == [("GET", "/items/1", 200), ("GET", "/missing", 404)]
+    assert hits == [1]
+
+
+def test_warmup_builds_validators_when_pydantic_available():
+    if BaseModel is None:
+        return
+    from pathiumapi.validation import body_validator, validate_body
+
+    class Row(BaseModel):
+        id: int
+
+    app = Pathium()
+
+    @app.post("/rows")
+    @validate_body(list[Row])
+    async def create(req, rows):
+        return {"n": len(rows)}
+
+    body_validator.cache_clear()
+    asyncio.run(app.warmup())
+    assert body_validator.cache_info().currsize >= 1
+
+
+def test_router_static_index_preserves_registration_order():
+    app = Pathium()
+
+    @app.get("/users/{name}")
+    async def by_name(req, name):
+        return name
+
+    @app.get("/users/me")
+    async def me(req):
+        return "me"
+
+    @app.get("/health")
+    async def health(req):
+        return "ok"
+
+    route, _ = app.router.find("GET", "/users/me")
+    assert route.handler is by_name
+    route, params = app.router.find("GET", "/health")
+    assert route.handler is health and params == {}
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from pathiumapi import BackgroundTasks, Pathium, WebSocket
+
+
+async def _session(app, path, incoming):
+    sent = []
+    queue = [{"type": "websocket.connect"}] + incoming + [{"type": "websocket.disconnect", "code": 1000}]
+
+    async def receive():
+        return queue.pop(0)
+
+    async def send(msg):
+        sent.append(msg)
+
+    scope = {"type": "websocket", "path": path, "headers": [], "query_string": b"user=ann"}
+    await app(scope, receive, send)
+    return sent
+
+
+def test_websocket_route_with_path_params_and_query():
+    app = Pathium()
+
+    @app.websocket("/ws/{room}")
+    async def chat(ws: WebSocket, room: str, user: str):
+        await ws.accept()
+        async for text in ws.iter_text():
+            await ws.send_json({"room": room, "user": user, "text": text})
+
+    sent = asyncio.run(_session(app, "/ws/lobby", [{"type": "websocket.receive", "text": "hi"}]))
+    assert sent[0]["type"] == "websocket.accept"
+    assert sent[1] == {"type": "websocket.send", "text": '{"room": "lobby", "user": "ann", "text": "hi"}'}
+    # the client disconnected first, so no close frame is sent back
+    assert len(sent) == 2
+
+
+def test_unknown_websocket_path_is_rejected_and_middleware_opts_in():
+    app = Pathium()
+    seen = []
+
+    def tracing(next_app):
+        async def inner(scope, receive, send):
+            seen.append(scope["type"])
+            await next_app(scope, receive, send)
+        return inner
+
+    def http_only(next_app):
+        async def inner(scope, receive, send):
+            seen.append("http-only")
+            await next_app(scope, receive, send)
+        return inner
+
+    app.use(tracing, websocket=True)
+    app.use(http_only)
+
+    sent = asyncio.run(_session(app, "/nope", []))
+    assert sent == [{"type": "websocket.close", "code": 1000}]
+    assert seen == ["websocket"]
+
+
+def test_invalid_params_close_with_policy_violation(caplog):
+    app = Pathium()
+
+    @app.websocket("/ws/{room}")
+    async def chat(ws: WebSocket, room: str, user: int):
+        await ws.accept()
+
+    sent = asyncio.run(_session(app, "/ws/lobby", []))
+    assert [(m["type"], m["code"]) for m in sent] == [("websocket.close", 1008)]
+    assert not caplog.records
+
+
+def test_websocket_handlers_cannot_take_background_tasks():
+    app = Pathium()
+    with pytest.raises(TypeError, match="BackgroundTasks"):
+        @app.websocket("/ws")
+        async def chat(ws: WebSocket, tasks: BackgroundTasks):
+            await ws.accept()